@@ -7,6 +7,13 @@ __version__ = "1.0.0"
 from .models import *
 from .data_loader import DataLoader
 from .backtest_engine import BacktestEngine
+from .event_log import EventLog, RingBufferSink, JsonlSink, VERBOSITY_SILENT, VERBOSITY_SUMMARY, VERBOSITY_EVENTS
+from .trade_log import TradeLog
+from .trade_stats import TradeAggregator, PnLStats, EquityCurve, DrawdownTracker
+from .equity_recorder import EquityRecorder, DOWNSAMPLE_LAST, DOWNSAMPLE_MINMAX
+from .indicator_cache import DayIndicators, IndicatorView, IndicatorCache, shared_indicator_cache
+from .parallel_runner import ParallelBacktestRunner
+from .parameter_sweep import ParameterSweep, StraddleGridSweep, SweepResult
 from .position_manager import PositionManager
 from .risk_manager import RiskManager
 from .market_regime_detector import MarketRegimeDetector
@@ -2,13 +2,20 @@
 Main backtesting engine orchestrator
 """
 
+import math
 from typing import List, Dict, Optional, Union
-from .models import TradingSetup, BacktestResults, DailyResults, MarketData, Trade, SetupResults, MultiSymbolTradingData
+from .models import TradingSetup, BacktestResults, DailyResults, MarketData, MarketSnapshot, Trade, SetupResults, MultiSymbolTradingData
+from .option_chain import StrikeIndex
+from .trade_log import TradeLog
+from .trade_stats import TradeAggregator
+from .equity_recorder import EquityRecorder
 from .data_loader import DataLoader
 from .position_manager import PositionManager
 from .risk_manager import RiskManager
 from .market_regime_detector import MarketRegimeDetector
+from .cross_symbol import CorrelationMatrix, regime_divergences
 from .dynamic_setup_manager import DynamicSetupManager
+from .event_log import EventLog, VERBOSITY_SUMMARY, VERBOSITY_EVENTS
 
 
 class BacktestEngine:
@@ -16,10 +23,18 @@ class BacktestEngine:
     
     def __init__(self, data_path: str, setups: List[TradingSetup], daily_max_loss: float = 1000.0, 
                  enable_dynamic_management: bool = True, enable_multi_symbol: bool = False,
-                 cross_symbol_risk_limit: float = 2000.0):
+                 cross_symbol_risk_limit: float = 2000.0, stream_data: bool = False,
+                 verbosity: int = VERBOSITY_EVENTS, event_sink=None, vectorized_book: bool = True,
+                 track_mtm_drawdown: bool = False, equity_recorder: Optional[EquityRecorder] = None,
+                 regime_lookback_periods: int = 60, correlation_window: int = 60):
         self.data_loader = DataLoader(data_path)
+        self.stream_data = stream_data  # Iterate ticks from the loader instead of materializing each day
+        self.event_log = EventLog(verbosity, event_sink)  # Console verbosity plus optional RingBufferSink/JsonlSink
         self.base_setups = setups
-        self.position_manager = PositionManager()
+        self.vectorized_book = vectorized_book  # Re-mark only positions whose quotes changed and schedule exits from trigger prices
+        self.position_manager = PositionManager(vectorized_book)
+        self.track_mtm_drawdown = track_mtm_drawdown  # Also track drawdowns of realized plus open P&L every tick
+        self.equity_recorder = equity_recorder  # Opt-in per-symbol tick equity, attached to the results
         self.risk_manager = RiskManager(daily_max_loss)
         
         # Multi-symbol support
@@ -32,15 +47,20 @@ class BacktestEngine:
         
         # Market regime detection and dynamic setup management
         self.enable_dynamic_management = enable_dynamic_management
-        self.market_regime_detector = MarketRegimeDetector() if enable_dynamic_management else None
-        self.dynamic_setup_manager = DynamicSetupManager(setups) if enable_dynamic_management else None
+        self.regime_lookback_periods = regime_lookback_periods  # 5-second ticks in each detector's rolling window
+        self.market_regime_detector = MarketRegimeDetector(regime_lookback_periods) if enable_dynamic_management else None
+        self.dynamic_setup_manager = DynamicSetupManager(setups, self.event_log) if enable_dynamic_management else None
         
         # Cross-symbol correlation tracking
-        self.correlation_matrix: Dict[str, Dict[str, float]] = {}
-        self.correlation_history: Dict[str, List[float]] = {}  # symbol_pair -> correlation_values
+        self.correlation_window = correlation_window  # 5-second spot log returns in each pair's rolling correlation
+        self.correlation_matrix: Dict[str, Dict[str, float]] = {}  # Both directions, as of the latest day's close
+        self.correlation_history: Dict[str, List[float]] = {}  # symbol_pair -> closing correlation of each day
+        self.return_correlations: Optional[CorrelationMatrix] = None  # Today's window over every symbol pair
+        self.previous_spot_prices: Dict[str, float] = {}  # symbol -> spot at its last tick today
         
         # Results tracking
-        self.all_trades: List[Trade] = []
+        self.all_trades = TradeLog()  # Columnar; Trade objects are built on iteration
+        self.trade_stats = TradeAggregator()  # Grouped by (setup, symbol, regime, date) as trades close
         self.daily_results: List[DailyResults] = []
         self.cumulative_pnl = 0.0
         self.symbol_performance: Dict[str, Dict] = {}  # symbol -> performance_metrics
@@ -63,36 +83,43 @@ class BacktestEngine:
         test_dates = [date for date in available_dates 
                      if start_date <= date <= end_date]
         
-        print(f"Running backtest for {symbol} from {start_date} to {end_date}")
-        print(f"Found {len(test_dates)} trading days: {test_dates}")
+        self.event_log.event(VERBOSITY_SUMMARY, "backtest_started",
+                             f"Running backtest for {symbol} from {start_date} to {end_date}\n"
+                             f"Found {len(test_dates)} trading days: {test_dates}",
+                             symbols=[symbol], start_date=start_date, end_date=end_date, dates=test_dates)
         
         for date in test_dates:
-            print(f"\nProcessing {date}...")
+            self.event_log.event(VERBOSITY_SUMMARY, "day_started", f"\nProcessing {date}...", date=date)
             daily_result = self.process_trading_day(symbol, date)
             if daily_result:
                 self.daily_results.append(daily_result)
                 self.cumulative_pnl += daily_result.daily_pnl
         
+        self.event_log.flush()
         return self._generate_final_results()
     
     def _run_multi_symbol_backtest(self, symbols: List[str], start_date: str, end_date: str) -> BacktestResults:
         """Run backtest across multiple symbols with coordination and correlation monitoring"""
-        print(f"Running multi-symbol backtest for {symbols} from {start_date} to {end_date}")
+        self.event_log.event(VERBOSITY_SUMMARY, "backtest_started",
+                             f"Running multi-symbol backtest for {symbols} from {start_date} to {end_date}",
+                             symbols=symbols, start_date=start_date, end_date=end_date)
         
         # Initialize symbol-specific components
         self._initialize_symbol_components(symbols)
         
         # Get common available dates across all symbols
         common_dates = self._get_common_dates(symbols, start_date, end_date)
-        print(f"Found {len(common_dates)} common trading days: {common_dates}")
+        self.event_log.event(VERBOSITY_SUMMARY, "trading_days",
+                             f"Found {len(common_dates)} common trading days: {common_dates}", dates=common_dates)
         
         for date in common_dates:
-            print(f"\nProcessing multi-symbol day {date}...")
+            self.event_log.event(VERBOSITY_SUMMARY, "day_started", f"\nProcessing multi-symbol day {date}...", date=date)
             daily_result = self._process_multi_symbol_trading_day(symbols, date)
             if daily_result:
                 self.daily_results.append(daily_result)
                 self.cumulative_pnl += daily_result.daily_pnl
         
+        self.event_log.flush()
         return self._generate_final_results()
     
     def _initialize_symbol_components(self, symbols: List[str]) -> None:
@@ -100,25 +127,25 @@ class BacktestEngine:
         for symbol in symbols:
             # Create symbol-specific regime detector and setup manager
             if self.enable_dynamic_management:
-                self.symbol_regime_detectors[symbol] = MarketRegimeDetector()
-                self.symbol_setup_managers[symbol] = DynamicSetupManager(self.base_setups)
+                self.symbol_regime_detectors[symbol] = MarketRegimeDetector(self.regime_lookback_periods)
+                self.symbol_setup_managers[symbol] = DynamicSetupManager(self.base_setups, self.event_log)
             
             # Create symbol-specific position and risk managers
-            self.symbol_position_managers[symbol] = PositionManager()
+            self.symbol_position_managers[symbol] = PositionManager(self.vectorized_book)
             self.symbol_risk_managers[symbol] = RiskManager(self.risk_manager.daily_max_loss)
             
             # Initialize performance tracking
             self.symbol_performance[symbol] = {
-                'trades': [],
+                'trades': TradeLog(),
                 'daily_pnls': [],
                 'regime_performance': {}
             }
-            
-            # Initialize correlation tracking
-            for other_symbol in symbols:
-                if symbol != other_symbol:
-                    pair_key = f"{symbol}_{other_symbol}"
-                    self.correlation_history[pair_key] = []
+        
+        # Initialize correlation tracking
+        self.return_correlations = CorrelationMatrix(symbols, self.correlation_window)
+        for i, symbol in enumerate(symbols):
+            for other_symbol in symbols[i+1:]:
+                self.correlation_history[f"{symbol}_{other_symbol}"] = []
     
     def _get_common_dates(self, symbols: List[str], start_date: str, end_date: str) -> List[str]:
         """Get dates that are available for all symbols"""
@@ -136,12 +163,31 @@ class BacktestEngine:
     
     def _process_multi_symbol_trading_day(self, symbols: List[str], date: str) -> Optional[DailyResults]:
         """Process a single trading day across multiple symbols with coordination"""
-        # Load data for all symbols
-        symbol_data = self.data_loader.load_multiple_symbols(symbols, date, concurrent=True)
-        
-        if not symbol_data:
-            print(f"Could not load data for any symbols on {date}")
-            return None
+        # Load data for all symbols, or open one tick stream per symbol
+        if self.stream_data:
+            symbol_streams = {}
+            job_end_idxs = {}
+            for symbol in symbols:
+                # Each .prop file is read once and handed to the stream
+                job_end_idx = self.data_loader.get_job_end_idx(symbol, date)
+                ticks = self.data_loader.iter_ticks(symbol, date, job_end_idx)
+                if ticks is not None:
+                    symbol_streams[symbol] = ticks
+                    job_end_idxs[symbol] = job_end_idx
+            
+            if not symbol_streams:
+                self.event_log.event(VERBOSITY_SUMMARY, "data_missing", f"Could not load data for any symbols on {date}",
+                                     date=date, symbols=symbols)
+                return None
+        else:
+            symbol_data = self.data_loader.load_multiple_symbols(symbols, date, concurrent=True)
+            
+            if not symbol_data:
+                self.event_log.event(VERBOSITY_SUMMARY, "data_missing", f"Could not load data for any symbols on {date}",
+                                     date=date, symbols=symbols)
+                return None
+            
+            job_end_idxs = {symbol: data.job_end_idx for symbol, data in symbol_data.items()}
         
         # Reset for new day across all symbols
         for symbol in symbols:
@@ -156,97 +202,126 @@ class BacktestEngine:
         for setup in self.base_setups:
             setup.reset_daily_state()
         
+        # Returns and correlation windows never span the overnight gap
+        self.previous_spot_prices = {}
+        if self.return_correlations is not None:
+            self.return_correlations.clear()
+        
         daily_trades = []
         symbol_daily_pnls = {}
         positions_forced_closed = 0
         
-        # Get all timestamps across all symbols and sort them
-        all_timestamps = set()
-        for data in symbol_data.values():
-            all_timestamps.update(data.option_data.keys())
-            all_timestamps.update(data.spot_data.keys())
-        sorted_timestamps = sorted(all_timestamps)
-        
-        print(f"Processing {len(sorted_timestamps)} time intervals across {len(symbols)} symbols...")
-        
-        for timestamp in sorted_timestamps:
-            # Create market data for each symbol at this timestamp
+        if self.stream_data:
+            timestamp_ticks = self.data_loader.merge_tick_streams(list(symbol_streams.values()))
+            self.event_log.event(VERBOSITY_SUMMARY, "day_intervals",
+                                 f"Streaming time intervals across {len(symbols)} symbols...", date=date)
+        else:
+            timestamp_ticks = self.data_loader.merge_tick_streams(
+                [self.data_loader.iter_day_ticks(data) for data in symbol_data.values()])
+            if self.event_log.is_enabled(VERBOSITY_SUMMARY):
+                # Count the distinct timestamps across all symbols only for the log line
+                all_timestamps = set()
+                for data in symbol_data.values():
+                    all_timestamps.update(data.option_data.keys())
+                    all_timestamps.update(data.spot_data.keys())
+                self.event_log.event(VERBOSITY_SUMMARY, "day_intervals",
+                                     f"Processing {len(all_timestamps)} time intervals across {len(symbols)} symbols...",
+                                     date=date, intervals=len(all_timestamps))
+        
+        # One reusable snapshot and strike index per symbol for the whole day
+        snapshots = {symbol: MarketSnapshot(symbol) for symbol in symbols}
+        if self.equity_recorder is not None:
+            self.equity_recorder.start_day(date)
+        strike_indexes = {symbol: StrikeIndex() for symbol in symbols}
+        
+        for timestamp, symbol_ticks in timestamp_ticks:
+            # Update market data for each symbol with both option and spot data at this timestamp
             symbol_market_data = {}
-            for symbol, data in symbol_data.items():
-                if (timestamp in data.option_data and timestamp in data.spot_data):
-                    market_data = MarketData(
-                        timestamp=timestamp,
-                        symbol=symbol,
-                        spot_price=data.spot_data[timestamp],
-                        option_prices=data.option_data[timestamp],
-                        available_strikes=list(set().union(*[
-                            strikes.keys() for strikes in data.option_data[timestamp].values()
-                        ]))
-                    )
-                    symbol_market_data[symbol] = market_data
+            for symbol, tick in symbol_ticks.items():
+                symbol_market_data[symbol] = snapshots[symbol].update(
+                    timestamp, tick.spot_price, tick.option_prices,
+                    strike_indexes[symbol].strikes_for(tick.option_prices))
             
             if not symbol_market_data:
                 continue
             
-            # Update regime detection and calculate cross-symbol correlations
+            # Update regime detection and cross-symbol correlations
             if self.enable_dynamic_management:
                 self._update_cross_symbol_regimes(symbol_market_data)
-                self._calculate_cross_symbol_correlations(symbol_market_data)
+            self._calculate_cross_symbol_correlations(symbol_market_data)
             
             # Process each symbol's time interval
             for symbol, market_data in symbol_market_data.items():
                 if symbol in self.symbol_position_managers:
                     interval_trades = self._process_symbol_time_interval(
                         symbol, market_data, date)
-                    daily_trades.extend(interval_trades)
+                    self._record_trades(daily_trades, interval_trades, market_data, date)
+            if self.track_mtm_drawdown:
+                self._mark_equity(self.symbol_position_managers, per_symbol=True)
+            if self.equity_recorder is not None:
+                for symbol in symbol_market_data:
+                    if symbol in self.symbol_position_managers:
+                        self.equity_recorder.record(
+                            symbol, timestamp,
+                            self.trade_stats.stats(symbol=symbol).total_pnl + self.symbol_position_managers[symbol].unrealized_pnl)
             
             # Check cross-symbol risk limits
             if self._check_cross_symbol_risk_limits():
-                print(f"Cross-symbol risk limit hit at timestamp {timestamp}. Closing all positions.")
+                self.event_log.event(VERBOSITY_EVENTS, "cross_symbol_limit",
+                                     f"Cross-symbol risk limit hit at timestamp {timestamp}. Closing all positions.",
+                                     date=date, timestamp=timestamp)
                 for symbol in symbols:
                     if symbol in symbol_market_data and symbol in self.symbol_position_managers:
                         emergency_trades = self.symbol_position_managers[symbol].close_all_positions(
                             symbol_market_data[symbol], "CROSS_SYMBOL_LIMIT", date)
-                        daily_trades.extend(emergency_trades)
+                        self._record_trades(daily_trades, emergency_trades, symbol_market_data[symbol], date)
                 break
             
             # Check if we've reached job end for any symbol
             job_end_reached = False
-            for symbol, data in symbol_data.items():
-                if timestamp >= data.job_end_idx:
-                    print(f"Reached job end index {data.job_end_idx} for {symbol}. Force closing positions.")
+            for symbol, job_end_idx in job_end_idxs.items():
+                if timestamp >= job_end_idx:
+                    self.event_log.event(VERBOSITY_EVENTS, "job_end",
+                                         f"Reached job end index {job_end_idx} for {symbol}. Force closing positions.",
+                                         date=date, timestamp=timestamp, symbol=symbol, job_end_idx=job_end_idx)
                     if symbol in symbol_market_data and symbol in self.symbol_position_managers:
                         job_end_trades = self.symbol_position_managers[symbol].force_close_at_job_end(
-                            data.job_end_idx, symbol_market_data[symbol], date)
-                        daily_trades.extend(job_end_trades)
+                            job_end_idx, symbol_market_data[symbol], date)
+                        self._record_trades(daily_trades, job_end_trades, symbol_market_data[symbol], date)
                         positions_forced_closed += len(job_end_trades)
                     job_end_reached = True
             
             if job_end_reached:
                 break
         
-        # Calculate daily results
-        daily_pnl = sum(trade.pnl for trade in daily_trades)
+        if self.track_mtm_drawdown:
+            self._mark_equity(self.symbol_position_managers, per_symbol=True)
+        if self.equity_recorder is not None:
+            self.equity_recorder.end_day()
+        self._record_cross_symbol_correlations()
+        
+        # Calculate daily results from this run's trades only, so reprocessing a date never double counts
+        day_stats = TradeAggregator.from_trades(daily_trades)
+        daily_pnl = day_stats.stats().total_pnl
         
         # Calculate symbol-specific P&Ls
+        symbol_trades = {symbol: [] for symbol in symbols}
+        for trade in daily_trades:
+            if trade.symbol in symbol_trades:
+                symbol_trades[trade.symbol].append(trade)
         for symbol in symbols:
-            symbol_pnl = sum(trade.pnl for trade in daily_trades 
-                           if hasattr(trade, 'symbol') and trade.symbol == symbol)
+            symbol_pnl = day_stats.stats(symbol=symbol).total_pnl
             symbol_daily_pnls[symbol] = symbol_pnl
             
             # Update symbol performance tracking
             if symbol in self.symbol_performance:
                 self.symbol_performance[symbol]['daily_pnls'].append(symbol_pnl)
-                self.symbol_performance[symbol]['trades'].extend([
-                    trade for trade in daily_trades 
-                    if hasattr(trade, 'symbol') and trade.symbol == symbol
-                ])
+                self.symbol_performance[symbol]['trades'].extend(symbol_trades[symbol])
         
         # Calculate setup P&Ls
         setup_pnls = {}
         for setup in self.base_setups:
-            setup_pnl = sum(trade.pnl for trade in daily_trades if trade.setup_id == setup.setup_id)
-            setup_pnls[setup.setup_id] = setup_pnl
+            setup_pnls[setup.setup_id] = day_stats.stats(setup_id=setup.setup_id).total_pnl
         
         # Collect regime transitions and parameter adjustments
         regime_transitions = []
@@ -266,7 +341,9 @@ class BacktestEngine:
             if regimes:
                 regime_info = f" [Regimes: {', '.join(regimes)}]"
         
-        print(f"Multi-symbol day {date} completed: {len(daily_trades)} trades, P&L: {daily_pnl:.2f}{regime_info}")
+        self.event_log.event(VERBOSITY_SUMMARY, "day_completed",
+                             f"Multi-symbol day {date} completed: {len(daily_trades)} trades, P&L: {daily_pnl:.2f}{regime_info}",
+                             date=date, trades=len(daily_trades), pnl=daily_pnl, symbol_pnls=symbol_daily_pnls)
         
         return DailyResults(
             date=date,
@@ -281,11 +358,20 @@ class BacktestEngine:
     
     def process_trading_day(self, symbol: str, date: str) -> Optional[DailyResults]:
         """Process a single trading day"""
-        # Load data for the day
-        trading_day_data = self.data_loader.load_trading_day(symbol, date)
-        if not trading_day_data:
-            print(f"Could not load data for {date}")
-            return None
+        # Load data for the day, or open a tick stream over it
+        if self.stream_data:
+            ticks = self.data_loader.iter_ticks(symbol, date)
+            if ticks is None:
+                self.event_log.event(VERBOSITY_SUMMARY, "data_missing", f"Could not load data for {date}",
+                                     date=date, symbols=[symbol])
+                return None
+        else:
+            trading_day_data = self.data_loader.load_trading_day(symbol, date)
+            if not trading_day_data:
+                self.event_log.event(VERBOSITY_SUMMARY, "data_missing", f"Could not load data for {date}",
+                                     date=date, symbols=[symbol])
+                return None
+            ticks = self.data_loader.iter_day_ticks(trading_day_data)
         
         # Reset for new day
         self.position_manager.reset_positions()
@@ -303,29 +389,27 @@ class BacktestEngine:
         daily_trades = []
         positions_forced_closed = 0
         
-        # Get all timestamps and sort them
-        all_timestamps = set(trading_day_data.option_data.keys())
-        all_timestamps.update(trading_day_data.spot_data.keys())
-        sorted_timestamps = sorted(all_timestamps)
-        
-        print(f"Processing {len(sorted_timestamps)} time intervals...")
-        
-        for timestamp in sorted_timestamps:
-            # Skip if we don't have both option and spot data
-            if (timestamp not in trading_day_data.option_data or 
-                timestamp not in trading_day_data.spot_data):
-                continue
+        if self.stream_data:
+            self.event_log.event(VERBOSITY_SUMMARY, "day_intervals", "Streaming time intervals...", date=date)
+        else:
+            all_timestamps = set(trading_day_data.option_data.keys())
+            all_timestamps.update(trading_day_data.spot_data.keys())
+            self.event_log.event(VERBOSITY_SUMMARY, "day_intervals",
+                                 f"Processing {len(all_timestamps)} time intervals...",
+                                 date=date, intervals=len(all_timestamps))
+        
+        snapshot = MarketSnapshot(symbol)
+        if self.equity_recorder is not None:
+            self.equity_recorder.start_day(date)
+        strike_index = StrikeIndex()
+        
+        # Ticks arrive sorted and only where both option and spot data exist
+        for tick in ticks:
+            timestamp = tick.timestamp
             
-            # Create market data
-            market_data = MarketData(
-                timestamp=timestamp,
-                symbol=getattr(trading_day_data, 'symbol', symbol),  # Use symbol from data if available
-                spot_price=trading_day_data.spot_data[timestamp],
-                option_prices=trading_day_data.option_data[timestamp],
-                available_strikes=list(set().union(*[
-                    strikes.keys() for strikes in trading_day_data.option_data[timestamp].values()
-                ]))
-            )
+            # Update market data in place
+            market_data = snapshot.update(timestamp, tick.spot_price, tick.option_prices,
+                                          strike_index.strikes_for(tick.option_prices))
             
             # Update market regime detection and dynamic setup management
             if self.enable_dynamic_management:
@@ -339,30 +423,44 @@ class BacktestEngine:
             
             # Process this time interval
             interval_trades = self.process_time_interval(market_data, date)
-            daily_trades.extend(interval_trades)
+            self._record_trades(daily_trades, interval_trades, market_data, date)
+            if self.track_mtm_drawdown:
+                self._mark_equity({symbol: self.position_manager}, per_symbol=False)
+            if self.equity_recorder is not None:
+                self.equity_recorder.record(symbol, timestamp,
+                                            self.trade_stats.stats().total_pnl + self.position_manager.unrealized_pnl)
             
             # Check daily risk limits
             if self.check_daily_risk_limits():
-                print(f"Daily risk limit hit at timestamp {timestamp}. Closing all positions.")
+                self.event_log.event(VERBOSITY_EVENTS, "daily_limit",
+                                     f"Daily risk limit hit at timestamp {timestamp}. Closing all positions.",
+                                     date=date, timestamp=timestamp)
                 emergency_trades = self.position_manager.close_all_positions(market_data, "DAILY_LIMIT", date)
-                daily_trades.extend(emergency_trades)
+                self._record_trades(daily_trades, emergency_trades, market_data, date)
                 break
             
             # Check if we've reached job end
-            if timestamp >= trading_day_data.job_end_idx:
-                print(f"Reached job end index {trading_day_data.job_end_idx}. Force closing positions.")
+            if timestamp >= tick.job_end_idx:
+                self.event_log.event(VERBOSITY_EVENTS, "job_end",
+                                     f"Reached job end index {tick.job_end_idx}. Force closing positions.",
+                                     date=date, timestamp=timestamp, symbol=tick.symbol, job_end_idx=tick.job_end_idx)
                 job_end_trades = self.position_manager.force_close_at_job_end(
-                    trading_day_data.job_end_idx, market_data, date)
-                daily_trades.extend(job_end_trades)
+                    tick.job_end_idx, market_data, date)
+                self._record_trades(daily_trades, job_end_trades, market_data, date)
                 positions_forced_closed = len(job_end_trades)
                 break
         
-        # Calculate daily results
-        daily_pnl = sum(trade.pnl for trade in daily_trades)
+        if self.track_mtm_drawdown:
+            self._mark_equity({symbol: self.position_manager}, per_symbol=False)
+        if self.equity_recorder is not None:
+            self.equity_recorder.end_day()
+        
+        # Calculate daily results from this run's trades only, so reprocessing a date never double counts
+        day_stats = TradeAggregator.from_trades(daily_trades)
+        daily_pnl = day_stats.stats().total_pnl
         setup_pnls = {}
         for setup in self.base_setups:
-            setup_pnl = sum(trade.pnl for trade in daily_trades if trade.setup_id == setup.setup_id)
-            setup_pnls[setup.setup_id] = setup_pnl
+            setup_pnls[setup.setup_id] = day_stats.stats(setup_id=setup.setup_id).total_pnl
         
         # Collect regime transitions and parameter adjustments if dynamic management enabled
         regime_transitions = []
@@ -385,7 +483,9 @@ class BacktestEngine:
         self.all_trades.extend(daily_trades)
         
         regime_info = f" [{self.dynamic_setup_manager.current_regime}]" if self.enable_dynamic_management else ""
-        print(f"Day {date} completed: {len(daily_trades)} trades, P&L: {daily_pnl:.2f}{regime_info}")
+        self.event_log.event(VERBOSITY_SUMMARY, "day_completed",
+                             f"Day {date} completed: {len(daily_trades)} trades, P&L: {daily_pnl:.2f}{regime_info}",
+                             date=date, trades=len(daily_trades), pnl=daily_pnl)
         
         return DailyResults(
             date=date,
@@ -397,6 +497,31 @@ class BacktestEngine:
             parameter_adjustments=parameter_adjustments
         )
     
+    def _record_trades(self, daily_trades: List[Trade], trades: List[Trade], market_data: MarketData, date: str) -> None:
+        """Add closed trades to the day's list and to the running aggregates, tagged with the current regime"""
+        daily_trades.extend(trades)
+        for trade in trades:
+            self.trade_stats.add(trade, market_data.regime_classification, date)
+    
+    def _mark_equity(self, position_managers: Dict[str, PositionManager], per_symbol: bool) -> None:
+        """Record realized-to-date plus open P&L overall, per setup and optionally per symbol"""
+        trade_stats = self.trade_stats
+        total_unrealized = 0.0
+        setup_unrealized: Dict[str, float] = {}
+        for symbol, position_manager in position_managers.items():
+            total_unrealized += position_manager.unrealized_pnl
+            for setup_id, pnl in position_manager.setup_unrealized_pnl.items():
+                setup_unrealized[setup_id] = setup_unrealized.get(setup_id, 0.0) + pnl
+            if per_symbol:
+                trade_stats.mark_equity(trade_stats.stats(symbol=symbol).total_pnl + position_manager.unrealized_pnl,
+                                        symbol=symbol)
+        
+        trade_stats.mark_equity(trade_stats.stats().total_pnl + total_unrealized)
+        for setup in self.base_setups:
+            setup_id = setup.setup_id
+            trade_stats.mark_equity(trade_stats.stats(setup_id=setup_id).total_pnl + setup_unrealized.get(setup_id, 0.0),
+                                    setup_id=setup_id)
+    
     def process_time_interval(self, market_data: MarketData, date: str = "") -> List[Trade]:
         """Process a single 5-second interval"""
         interval_trades = []
@@ -412,8 +537,13 @@ class BacktestEngine:
                 for position in new_positions:
                     position_id = self.position_manager.add_position(position)
                     # Reduced logging - only show key info
-                    regime_info = f" [{market_data.regime_classification}]" if hasattr(market_data, 'regime_classification') else ""
-                    print(f"📈 {setup.setup_id}: Opened at {market_data.timestamp}, Spot={market_data.spot_price:.2f}, Strikes={position.strikes}{regime_info}")
+                    if self.event_log.is_enabled(VERBOSITY_EVENTS):
+                        regime_info = f" [{market_data.regime_classification}]" if hasattr(market_data, 'regime_classification') else ""
+                        self.event_log.event(
+                            VERBOSITY_EVENTS, "position_opened",
+                            f"📈 {setup.setup_id}: Opened at {market_data.timestamp}, Spot={market_data.spot_price:.2f}, Strikes={position.strikes}{regime_info}",
+                            date=date, timestamp=market_data.timestamp, symbol=market_data.symbol, setup_id=setup.setup_id,
+                            spot_price=market_data.spot_price, strikes=position.strikes, regime=market_data.regime_classification)
         
         # 3. Update P&L for existing positions and check exit conditions
         closed_trades = self.position_manager.update_positions(market_data, date)
@@ -444,18 +574,17 @@ class BacktestEngine:
         return interval_trades
     
     def check_daily_risk_limits(self) -> bool:
-        """Check if daily risk limits are breached"""
-        total_pnl = self.position_manager.get_total_pnl()
-        return self.risk_manager.should_close_all_positions(total_pnl)
+        """Check if daily risk limits are breached by the day's realized and open P&L"""
+        return self.risk_manager.check_position_manager(self.position_manager)
     
     def _generate_final_results(self) -> BacktestResults:
         """Generate final backtest results with multi-symbol support"""
-        total_pnl = sum(trade.pnl for trade in self.all_trades)
+        overall = self.trade_stats.stats()
+        total_pnl = overall.total_pnl
         total_trades = len(self.all_trades)
         
         # Calculate win rate
-        winning_trades = [trade for trade in self.all_trades if trade.pnl > 0]
-        win_rate = len(winning_trades) / total_trades if total_trades > 0 else 0.0
+        win_rate = overall.win_rate
         
         # Calculate max drawdown
         max_drawdown = self._calculate_max_drawdown()
@@ -463,19 +592,15 @@ class BacktestEngine:
         # Calculate setup performance with symbol and regime breakdowns
         setup_performance = {}
         for setup in self.base_setups:
-            setup_trades = [trade for trade in self.all_trades if trade.setup_id == setup.setup_id]
-            setup_pnl = sum(trade.pnl for trade in setup_trades)
-            setup_wins = [trade for trade in setup_trades if trade.pnl > 0]
-            setup_losses = [trade for trade in setup_trades if trade.pnl < 0]
+            setup_stats = self.trade_stats.stats(setup_id=setup.setup_id)
             
             # Calculate symbol-specific performance for this setup
             symbol_performance = {}
             if self.enable_multi_symbol:
                 for symbol in self.symbol_performance.keys():
-                    symbol_setup_trades = [trade for trade in setup_trades 
-                                         if hasattr(trade, 'symbol') and trade.symbol == symbol]
-                    if symbol_setup_trades:
-                        symbol_performance[symbol] = sum(trade.pnl for trade in symbol_setup_trades)
+                    symbol_setup_stats = self.trade_stats.stats(setup_id=setup.setup_id, symbol=symbol)
+                    if symbol_setup_stats.trades:
+                        symbol_performance[symbol] = symbol_setup_stats.total_pnl
             
             # Calculate regime-specific performance for this setup
             regime_performance = {}
@@ -486,12 +611,13 @@ class BacktestEngine:
             
             setup_performance[setup.setup_id] = SetupResults(
                 setup_id=setup.setup_id,
-                total_pnl=setup_pnl,
-                total_trades=len(setup_trades),
-                win_rate=len(setup_wins) / len(setup_trades) if setup_trades else 0.0,
-                avg_win=sum(trade.pnl for trade in setup_wins) / len(setup_wins) if setup_wins else 0.0,
-                avg_loss=sum(trade.pnl for trade in setup_losses) / len(setup_losses) if setup_losses else 0.0,
-                max_drawdown=0.0,  # TODO: Calculate setup-specific drawdown
+                total_pnl=setup_stats.total_pnl,
+                total_trades=setup_stats.trades,
+                win_rate=setup_stats.win_rate,
+                avg_win=setup_stats.avg_win,
+                avg_loss=setup_stats.avg_loss,
+                max_drawdown=setup_stats.max_drawdown,
+                mtm_max_drawdown=self.trade_stats.mtm_max_drawdown(setup_id=setup.setup_id),
                 symbol_performance=symbol_performance,
                 regime_performance=regime_performance
             )
@@ -501,9 +627,7 @@ class BacktestEngine:
         if self.enable_multi_symbol:
             from .models import SymbolResults
             for symbol, perf_data in self.symbol_performance.items():
-                symbol_trades = perf_data['trades']
-                symbol_pnl = sum(trade.pnl for trade in symbol_trades)
-                symbol_wins = [trade for trade in symbol_trades if trade.pnl > 0]
+                symbol_stats = self.trade_stats.stats(symbol=symbol)
                 
                 # Calculate correlations with other symbols
                 correlations = {}
@@ -513,31 +637,34 @@ class BacktestEngine:
                 
                 symbol_performance_results[symbol] = SymbolResults(
                     symbol=symbol,
-                    total_pnl=symbol_pnl,
-                    total_trades=len(symbol_trades),
-                    win_rate=len(symbol_wins) / len(symbol_trades) if symbol_trades else 0.0,
+                    total_pnl=symbol_stats.total_pnl,
+                    total_trades=symbol_stats.trades,
+                    win_rate=symbol_stats.win_rate,
+                    max_drawdown=symbol_stats.max_drawdown,
+                    mtm_max_drawdown=self.trade_stats.mtm_max_drawdown(symbol=symbol),
                     correlation_with_other_symbols=correlations
                 )
         
         # Calculate regime performance
         regime_performance_results = {}
         if self.enable_dynamic_management:
-            # This would need more sophisticated tracking
-            # For now, we'll aggregate from symbol-specific regime detectors
+            # Regimes seen by the symbol-specific detectors or tagged on closed trades
             from .models import RegimeResults
             all_regimes = set()
             for detector in self.symbol_regime_detectors.values():
                 if hasattr(detector, 'regime_history'):
                     all_regimes.update(detector.regime_history)
+            all_regimes.update(self.trade_stats.values("regime"))
             
-            # Placeholder regime performance calculation
-            for regime in all_regimes:
+            # Trades are tagged with the regime in force when they closed
+            for regime in sorted(all_regimes):
+                regime_stats = self.trade_stats.stats(regime=regime)
                 regime_performance_results[regime] = RegimeResults(
                     regime=regime,
-                    total_pnl=0.0,  # Would need proper tracking
-                    total_trades=0,
-                    win_rate=0.0,
-                    avg_duration=0.0,
+                    total_pnl=regime_stats.total_pnl,
+                    total_trades=regime_stats.trades,
+                    win_rate=regime_stats.win_rate,
+                    avg_duration=regime_stats.avg_duration,
                     transition_performance=0.0
                 )
         
@@ -587,34 +714,21 @@ class BacktestEngine:
             total_pnl=total_pnl,
             daily_results=self.daily_results,
             trade_log=self.all_trades,
+            trade_stats=self.trade_stats,
+            intraday_equity=self.equity_recorder,
             setup_performance=setup_performance,
             symbol_performance=symbol_performance_results,
             regime_performance=regime_performance_results,
             dynamic_adjustment_performance=dynamic_adjustment_performance,
             win_rate=win_rate,
             max_drawdown=max_drawdown,
+            mtm_max_drawdown=self.trade_stats.mtm_max_drawdown(),
             total_trades=total_trades
         )
     
     def _calculate_max_drawdown(self) -> float:
-        """Calculate maximum drawdown"""
-        if not self.all_trades:
-            return 0.0
-        
-        cumulative_pnl = 0.0
-        peak = 0.0
-        max_drawdown = 0.0
-        
-        for trade in self.all_trades:
-            cumulative_pnl += trade.pnl
-            if cumulative_pnl > peak:
-                peak = cumulative_pnl
-            
-            drawdown = peak - cumulative_pnl
-            if drawdown > max_drawdown:
-                max_drawdown = drawdown
-        
-        return max_drawdown
+        """Calculate maximum drawdown of cumulative closed-trade P&L"""
+        return self.trade_stats.stats().max_drawdown
     
     def run_single_symbol_backtest(self, symbol: str, start_date: str, end_date: str) -> BacktestResults:
         """Convenience method for single symbol backtesting (backward compatibility)"""
@@ -662,8 +776,13 @@ class BacktestEngine:
                         position.symbol = symbol
                     position_id = position_manager.add_position(position)
                     
-                    regime_info = f" [{market_data.regime_classification}]" if hasattr(market_data, 'regime_classification') else ""
-                    print(f"📈 {symbol} {setup.setup_id}: Opened at {market_data.timestamp}, Spot={market_data.spot_price:.2f}, Strikes={position.strikes}{regime_info}")
+                    if self.event_log.is_enabled(VERBOSITY_EVENTS):
+                        regime_info = f" [{market_data.regime_classification}]" if hasattr(market_data, 'regime_classification') else ""
+                        self.event_log.event(
+                            VERBOSITY_EVENTS, "position_opened",
+                            f"📈 {symbol} {setup.setup_id}: Opened at {market_data.timestamp}, Spot={market_data.spot_price:.2f}, Strikes={position.strikes}{regime_info}",
+                            date=date, timestamp=market_data.timestamp, symbol=symbol, setup_id=setup.setup_id,
+                            spot_price=market_data.spot_price, strikes=position.strikes, regime=market_data.regime_classification)
         
         # 3. Update P&L for existing positions and check exit conditions
         closed_trades = position_manager.update_positions(market_data, date)
@@ -724,49 +843,45 @@ class BacktestEngine:
     
     def _detect_regime_divergences(self, symbol_market_data: Dict[str, MarketData]) -> None:
         """Detect when different symbols are in different regimes"""
-        symbols = list(symbol_market_data.keys())
-        regimes = {}
+        if not self.event_log.is_enabled(VERBOSITY_EVENTS):
+            return
+        detectors = {symbol: self.symbol_regime_detectors[symbol] for symbol in symbol_market_data
+                     if symbol in self.symbol_regime_detectors}
+        regimes = {symbol: detector.get_current_regime() for symbol, detector in detectors.items()}
         
-        for symbol in symbols:
-            if symbol in self.symbol_regime_detectors:
-                regimes[symbol] = self.symbol_regime_detectors[symbol].get_current_regime()
-        
-        # Check for divergences (simplified - could be more sophisticated)
+        # Score every pair in one batch once the symbols disagree
         if len(set(regimes.values())) > 1:
-            print(f"⚠️  Regime divergence detected: {regimes}")
+            divergences = {f"{symbol1}_{symbol2}": score
+                           for (symbol1, symbol2), score in regime_divergences(detectors).items()}
+            timestamp = next(iter(symbol_market_data.values())).timestamp
+            self.event_log.event(VERBOSITY_EVENTS, "regime_divergence", f"⚠️  Regime divergence detected: {regimes}",
+                                 timestamp=timestamp, regimes=regimes, divergences=divergences)
             
             # Potentially adjust risk limits or strategy selection based on divergence
             # This is a placeholder for more sophisticated divergence handling
     
     def _calculate_cross_symbol_correlations(self, symbol_market_data: Dict[str, MarketData]) -> None:
-        """Calculate and update cross-symbol correlations"""
-        symbols = list(symbol_market_data.keys())
-        
-        for i, symbol1 in enumerate(symbols):
-            for symbol2 in symbols[i+1:]:
-                pair_key = f"{symbol1}_{symbol2}"
-                
-                # Calculate correlation using price velocity (simplified)
-                if (symbol1 in self.symbol_regime_detectors and 
-                    symbol2 in self.symbol_regime_detectors):
-                    
-                    velocity1 = self.symbol_regime_detectors[symbol1].get_price_velocity()
-                    velocity2 = self.symbol_regime_detectors[symbol2].get_price_velocity()
-                    
-                    # Simple correlation approximation (would need more sophisticated calculation)
-                    correlation = min(abs(velocity1 * velocity2), 1.0) if velocity1 != 0 and velocity2 != 0 else 0.0
-                    
-                    if pair_key in self.correlation_history:
-                        self.correlation_history[pair_key].append(correlation)
-                        
-                        # Keep only recent correlations (last 60 periods = 5 minutes)
-                        if len(self.correlation_history[pair_key]) > 60:
-                            self.correlation_history[pair_key] = self.correlation_history[pair_key][-60:]
-                        
-                        # Update correlation matrix with average recent correlation
-                        if symbol1 not in self.correlation_matrix:
-                            self.correlation_matrix[symbol1] = {}
-                        self.correlation_matrix[symbol1][symbol2] = sum(self.correlation_history[pair_key]) / len(self.correlation_history[pair_key])
+        """Add this tick's spot log returns to the rolling correlation matrix"""
+        previous_spot_prices = self.previous_spot_prices
+        returns = {}
+        for symbol, market_data in symbol_market_data.items():
+            spot_price = market_data.spot_price
+            previous = previous_spot_prices.get(symbol, 0.0)
+            if previous > 0 and spot_price > 0:
+                returns[symbol] = math.log(spot_price / previous)
+            previous_spot_prices[symbol] = spot_price
+        
+        if returns and self.return_correlations is not None:
+            self.return_correlations.update(returns)
+    
+    def _record_cross_symbol_correlations(self) -> None:
+        """Publish each pair's closing correlation to the matrix and its daily history"""
+        if self.return_correlations is None:
+            return
+        for (symbol1, symbol2), value in self.return_correlations.pair_correlations().items():
+            self.correlation_matrix.setdefault(symbol1, {})[symbol2] = value
+            self.correlation_matrix.setdefault(symbol2, {})[symbol1] = value
+            self.correlation_history[f"{symbol1}_{symbol2}"].append(value)
     
     def _check_cross_symbol_risk_limits(self) -> bool:
         """Check if cross-symbol risk limits are breached"""
@@ -775,7 +890,7 @@ class BacktestEngine:
         
         total_cross_symbol_pnl = 0.0
         for symbol, position_manager in self.symbol_position_managers.items():
-            total_cross_symbol_pnl += position_manager.get_total_pnl()
+            total_cross_symbol_pnl += position_manager.get_day_pnl()
         
         return total_cross_symbol_pnl <= -self.cross_symbol_risk_limit
     
@@ -791,14 +906,8 @@ class BacktestEngine:
         if not self.enable_dynamic_management or symbol not in self.symbol_setup_managers:
             return False
         
-        # Check if there were any adjustments for this setup
-        for adjustment in self.symbol_setup_managers[symbol].adjustment_history:
-            if adjustment.setup_id == trade.setup_id:
-                # If adjustment was made before trade entry, consider it adjusted
-                if adjustment.timestamp <= trade.entry_timeindex:
-                    return True
-        
-        return False
+        # If an adjustment was made before trade entry, consider it adjusted
+        return self.symbol_setup_managers[symbol].was_adjusted_before(trade.setup_id, trade.entry_timeindex)
     
     def _was_trade_adjusted(self, trade: Trade) -> bool:
         """
@@ -817,11 +926,5 @@ class BacktestEngine:
         if self.enable_multi_symbol and hasattr(trade, 'symbol'):
             return self._was_symbol_trade_adjusted(trade.symbol, trade)
         
-        # Check if there were any adjustments for this setup
-        for adjustment in self.dynamic_setup_manager.adjustment_history:
-            if adjustment.setup_id == trade.setup_id:
-                # If adjustment was made before trade entry, consider it adjusted
-                if adjustment.timestamp <= trade.entry_timeindex:
-                    return True
-        
-        return False
\ No newline at end of file
+        # If an adjustment was made before trade entry, consider it adjusted
+        return self.dynamic_setup_manager.was_adjusted_before(trade.setup_id, trade.entry_timeindex)
\ No newline at end of file
@@ -0,0 +1,146 @@
+"""
+Batched cross-symbol statistics: rolling return correlations and regime divergences for N symbols
+"""
+
+import math
+from array import array
+from typing import Dict, List, Mapping, Tuple
+from .market_regime_detector import MarketRegimeDetector, divergence_score
+
+
+class CorrelationMatrix:
+    """
+    Rolling Pearson correlations between every pair of N symbols over the last window ticks.
+    
+    Each tick's returns are one row of a 2-D ring buffer (window rows by N symbols) with
+    a presence mask, since symbols do not all tick at every timestamp. A pair's
+    correlation uses the rows in the window where both symbols have a return. Flat N x N
+    arrays hold the pairwise counts and sums; a tick adds the outer product of its
+    present returns (a rank-1 update) and subtracts that of the row it overwrites, so
+    the cost per tick depends on the symbols present, not on the window. The sums are
+    rebuilt from the ring once per window of evictions to stop rounding drift.
+    """
+    
+    def __init__(self, symbols: List[str], window: int):
+        self.symbols = list(symbols)
+        self.positions = {symbol: index for index, symbol in enumerate(self.symbols)}
+        self.window = max(2, window)
+        self.clear()
+    
+    def clear(self) -> None:
+        """Empty the window"""
+        size = len(self.symbols)
+        self.values = array('d', bytes(8 * self.window * size))  # Row-major ring of returns
+        self.present = bytearray(self.window * size)
+        self.head = 0  # Row the next tick is written to
+        self.rows = 0
+        self.evictions = 0
+        
+        # [i * N + j] over rows where both i and j are present
+        self.counts = array('l', bytes(array('l').itemsize * size * size))
+        self.sums = array('d', bytes(8 * size * size))  # Of symbol i's returns
+        self.square_sums = array('d', bytes(8 * size * size))  # Of symbol i's squared returns
+        self.product_sums = array('d', bytes(8 * size * size))  # Of i's times j's returns, symmetric
+    
+    def _apply_row(self, row: int, sign: int) -> None:
+        """Add (sign 1) or subtract (sign -1) the outer product of a ring row's present returns"""
+        size = len(self.symbols)
+        base = row * size
+        present = [(index, self.values[base + index]) for index in range(size) if self.present[base + index]]
+        if len(present) < 2:
+            return
+        counts, sums, square_sums, product_sums = self.counts, self.sums, self.square_sums, self.product_sums
+        for i, x in present:
+            offset = i * size
+            signed_x = sign * x
+            signed_xx = signed_x * x
+            for j, y in present:
+                cell = offset + j
+                counts[cell] += sign
+                sums[cell] += signed_x
+                square_sums[cell] += signed_xx
+                product_sums[cell] += signed_x * y
+    
+    def update(self, returns: Mapping[str, float]) -> None:
+        """Add one tick of returns for the symbols that have one"""
+        size = len(self.symbols)
+        head = self.head
+        if self.rows == self.window:
+            self._apply_row(head, -1)
+            self.evictions += 1
+        else:
+            self.rows += 1
+        
+        base = head * size
+        positions = self.positions
+        for index in range(size):
+            self.present[base + index] = 0
+        for symbol, value in returns.items():
+            index = positions.get(symbol)
+            if index is not None:
+                self.values[base + index] = value
+                self.present[base + index] = 1
+        self.head = head + 1 if head + 1 < self.window else 0
+        
+        if self.evictions >= self.window:
+            self.resync()
+        else:
+            self._apply_row(head, 1)
+    
+    def resync(self) -> None:
+        """Rebuild the pairwise sums from the ring"""
+        size = len(self.symbols)
+        for index in range(size * size):
+            self.counts[index] = 0
+            self.sums[index] = self.square_sums[index] = self.product_sums[index] = 0.0
+        for row in range(self.rows):
+            self._apply_row(row, 1)
+        self.evictions = 0
+    
+    def count(self, symbol1: str, symbol2: str) -> int:
+        """Rows in the window where both symbols have a return"""
+        return self.counts[self.positions[symbol1] * len(self.symbols) + self.positions[symbol2]]
+    
+    def correlation(self, symbol1: str, symbol2: str) -> float:
+        """Correlation of a pair, 0.0 with fewer than two shared rows or a constant side"""
+        size = len(self.symbols)
+        i, j = self.positions[symbol1], self.positions[symbol2]
+        ij, ji = i * size + j, j * size + i
+        n = self.counts[ij]
+        if n < 2:
+            return 0.0
+        x_sum, y_sum = self.sums[ij], self.sums[ji]
+        x_var = n * self.square_sums[ij] - x_sum * x_sum
+        y_var = n * self.square_sums[ji] - y_sum * y_sum
+        if x_var <= 0.0 or y_var <= 0.0:
+            return 0.0
+        correlation = (n * self.product_sums[ij] - x_sum * y_sum) / math.sqrt(x_var * y_var)
+        return max(-1.0, min(1.0, correlation))
+    
+    def pair_correlations(self) -> Dict[Tuple[str, str], float]:
+        """Correlation of every pair (in symbol order) with at least two shared rows"""
+        correlations = {}
+        for i, symbol1 in enumerate(self.symbols):
+            for symbol2 in self.symbols[i+1:]:
+                if self.count(symbol1, symbol2) >= 2:
+                    correlations[(symbol1, symbol2)] = self.correlation(symbol1, symbol2)
+        return correlations
+
+
+def regime_divergences(detectors: Mapping[str, MarketRegimeDetector]) -> Dict[Tuple[str, str], float]:
+    """
+    Divergence score of every pair of detectors (in mapping order) in one pass.
+    
+    Each detector's regime, trend and volatility are read once rather than once per
+    pair. Pairs where either detector has fewer than two prices score 0.0.
+    """
+    symbols = [symbol for symbol, detector in detectors.items() if len(detector.price_history) >= 2]
+    states = [(detectors[symbol].current_regime, detectors[symbol].trend_strength,
+               detectors[symbol].estimated_volatility) for symbol in symbols]
+    
+    names = list(detectors)
+    divergences = {(symbol1, symbol2): 0.0 for i, symbol1 in enumerate(names) for symbol2 in names[i+1:]}
+    for i, (symbol1, state1) in enumerate(zip(symbols, states)):
+        for symbol2, state2 in zip(symbols[i+1:], states[i+1:]):
+            divergences[(symbol1, symbol2)] = divergence_score(*state1, *state2)
+    return divergences
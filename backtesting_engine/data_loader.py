@@ -4,17 +4,30 @@ DataLoader for parsing 5SecData files with multi-symbol support
 
 import os
 import csv
-from typing import Dict, List, Optional
+import heapq
+import hashlib
+from typing import Dict, Iterator, List, Optional, Tuple
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import threading
-from .models import TradingDayData, MultiSymbolTradingData
+from array import array
+from .models import TradingDayData, MultiSymbolTradingData, MarketTick
+from .option_chain import ColumnarOptionData
+from .day_cache import CACHE_EXTENSION, is_cache_fresh, read_day_cache, write_day_cache, shared_day_cache
+from .spot_index import get_spot_day_mtime_ns, read_spot_day
+from .indicator_cache import (DayIndicators, INDICATOR_EXTENSION, read_day_indicators, write_day_indicators,
+                              shared_indicator_cache)
 
 
 class DataLoader:
     """Multi-symbol data loading and parsing for option chains, spot prices, and trading session metadata"""
     
-    def __init__(self, data_path: str = "5SecData"):
+    def __init__(self, data_path: str = "5SecData", cache_dir: Optional[str] = None, use_cache: bool = True,
+                 use_memory_cache: bool = True):
         self.data_path = data_path
+        self.cache_dir = cache_dir if cache_dir is not None else os.path.join(data_path, ".cache")
+        self.shared_cache_dir = cache_dir is not None  # May hold caches of other data paths
+        self.use_cache = use_cache  # Read/write binary day files under cache_dir
+        self.use_memory_cache = use_memory_cache  # Share loaded days through the process-wide LRU
         self.supported_symbols = ["QQQ", "SPY", "QQQ 1DTE", "SPY 1DTE"]
         self.file_suffixes = {
             "QQQ": "",
@@ -62,6 +75,32 @@ class DataLoader:
             print(f"Unsupported symbol: {symbol}")
             return None
             
+        option_file, spot_file, prop_file = self._get_source_files(symbol, date)
+        
+        if not os.path.exists(option_file):
+            print(f"Option data file not found: {option_file}")
+            return None
+        
+        # Days already loaded by any DataLoader in this process are shared
+        memory_key = None
+        source_mtime_ns = None
+        if self.use_memory_cache:
+            source_mtime_ns = self._get_source_mtime_ns(date, option_file, spot_file, prop_file)
+            memory_key = shared_day_cache.make_key(self.data_path, symbol, date, source_mtime_ns)
+            cached_data = shared_day_cache.get(memory_key)
+            if cached_data is not None:
+                return cached_data
+        
+        trading_day_data, complete = self._read_trading_day(symbol, date, option_file, spot_file, prop_file,
+                                                            source_mtime_ns=source_mtime_ns)
+        
+        if memory_key is not None and complete:
+            shared_day_cache.put(memory_key, trading_day_data)
+        
+        return trading_day_data
+    
+    def _get_source_files(self, symbol: str, date: str) -> Tuple[str, str, str]:
+        """Get the option, spot and prop file paths for a symbol and date"""
         symbol_path = os.path.join(self.data_path, symbol)
         suffix = self._get_file_suffix(symbol)
         
@@ -69,21 +108,64 @@ class DataLoader:
         option_file = os.path.join(symbol_path, f"{date}{suffix}_BK.csv")
         prop_file = os.path.join(symbol_path, f"{date}{suffix}.prop")
         
-        if not os.path.exists(option_file):
-            print(f"Option data file not found: {option_file}")
-            return None
-        
-        option_data = self._parse_option_data(option_file)
-        
-        # Load spot data - use base symbol name for spot file
+        # Spot data uses base symbol name for spot file
         base_symbol = symbol.split()[0].lower()  # "QQQ 1DTE" -> "qqq"
         spot_file = os.path.join(symbol_path, "Spot", f"{base_symbol}.csv")
-        spot_data = self._parse_spot_data(spot_file, date)
+        
+        return option_file, spot_file, prop_file
+    
+    def _get_source_mtime_ns(self, date: str, option_file: str, spot_file: str, prop_file: str) -> int:
+        """Newest change to a day's sources, counting only the date's own rows of the shared spot file"""
+        mtime_ns = 0
+        for source_file in (option_file, prop_file):
+            try:
+                mtime_ns = max(mtime_ns, os.stat(source_file).st_mtime_ns)
+            except OSError:
+                pass
+        if os.path.exists(spot_file):
+            try:
+                mtime_ns = max(mtime_ns, get_spot_day_mtime_ns(spot_file, date))
+            except OSError as e:
+                print(f"Error indexing spot data {spot_file}: {e}")
+        return mtime_ns
+    
+    def _read_trading_day(self, symbol: str, date: str, option_file: str, spot_file: str,
+                          prop_file: str, use_cache: Optional[bool] = None,
+                          source_mtime_ns: Optional[int] = None) -> Tuple[MultiSymbolTradingData, bool]:
+        """
+        Read a trading day from the binary day cache or parse it from the source files
+        
+        Args:
+            use_cache: Whether to read and write the day cache; defaults to self.use_cache
+            source_mtime_ns: The day's _get_source_mtime_ns if the caller already has it
+        
+        Returns:
+            (trading day, complete); a day whose option or spot file failed to parse is
+            incomplete and is not written to the day cache
+        """
+        if use_cache is None:
+            use_cache = self.use_cache
+        
+        # Use the binary day cache when it is newer than every source file
+        cache_file = self.get_cache_file(symbol, date)
+        if use_cache and source_mtime_ns is None:
+            source_mtime_ns = self._get_source_mtime_ns(date, option_file, spot_file, prop_file)
+        if use_cache and is_cache_fresh(cache_file, source_mtime_ns):
+            try:
+                cached_data = read_day_cache(cache_file)
+                if cached_data:
+                    return cached_data, True
+            except Exception as e:
+                print(f"Error reading day cache {cache_file}: {e}")
+        
+        option_data, options_complete = self._parse_option_data(option_file)
+        spot_data, spot_complete = self._parse_spot_data(spot_file, date)
+        complete = options_complete and spot_complete
         
         # Load metadata
         metadata = self._parse_prop_file(prop_file)
         
-        return MultiSymbolTradingData(
+        trading_day_data = MultiSymbolTradingData(
             date=date,
             symbol=symbol,
             spot_data=spot_data,
@@ -91,6 +173,278 @@ class DataLoader:
             job_end_idx=metadata.get("jobEndIdx", 4660),
             metadata=metadata
         )
+        
+        if use_cache and complete:
+            try:
+                write_day_cache(cache_file, trading_day_data)
+            except Exception as e:
+                print(f"Error writing day cache {cache_file}: {e}")
+        
+        return trading_day_data, complete
+    
+    def _get_cache_symbol_dir(self, symbol: str) -> str:
+        """Get a symbol's cache directory, under a hash of data_path when cache_dir is shared"""
+        if not self.shared_cache_dir:
+            return os.path.join(self.cache_dir, symbol)
+        data_key = hashlib.sha1(os.path.abspath(self.data_path).encode()).hexdigest()[:16]
+        return os.path.join(self.cache_dir, data_key, symbol)
+    
+    def get_cache_file(self, symbol: str, date: str) -> str:
+        """Get the binary cache file path for a symbol and date"""
+        suffix = self._get_file_suffix(symbol)
+        return os.path.join(self._get_cache_symbol_dir(symbol), f"{date}{suffix}{CACHE_EXTENSION}")
+    
+    def get_memory_cache_stats(self) -> Dict[str, int]:
+        """Get hit/miss/eviction counters of the process-wide day cache"""
+        return shared_day_cache.get_stats()
+    
+    def get_indicator_file(self, symbol: str, date: str) -> str:
+        """Get the indicator file path for a symbol and date"""
+        suffix = self._get_file_suffix(symbol)
+        return os.path.join(self._get_cache_symbol_dir(symbol), f"{date}{suffix}{INDICATOR_EXTENSION}")
+    
+    def get_day_indicators(self, symbol: str, date: str) -> DayIndicators:
+        """Get the day's shared indicators, from memory or disk when available, otherwise empty ones to fill"""
+        source_mtime_ns = self._get_source_mtime_ns(date, *self._get_source_files(symbol, date))
+        memory_key = None
+        if self.use_memory_cache:
+            memory_key = shared_day_cache.make_key(self.data_path, symbol, date, source_mtime_ns)
+            indicators = shared_indicator_cache.get(memory_key)
+            if indicators is not None:
+                return indicators
+        
+        indicators = None
+        indicator_file = self.get_indicator_file(symbol, date)
+        if self.use_cache and is_cache_fresh(indicator_file, source_mtime_ns):
+            try:
+                indicators = read_day_indicators(indicator_file)
+            except Exception as e:
+                print(f"Error reading indicators {indicator_file}: {e}")
+        if indicators is None:
+            indicators = DayIndicators(symbol, date)
+        
+        if memory_key is not None:
+            shared_indicator_cache.put(memory_key, indicators)
+        return indicators
+    
+    def save_day_indicators(self, indicators: DayIndicators) -> None:
+        """Write a day's indicators to disk if ticks were added since they were last written"""
+        if not self.use_cache or len(indicators) == indicators.stored_ticks:
+            return
+        indicator_file = self.get_indicator_file(indicators.symbol, indicators.date)
+        try:
+            indicators.stored_ticks = len(indicators)
+            write_day_indicators(indicator_file, indicators)
+        except Exception as e:
+            print(f"Error writing indicators {indicator_file}: {e}")
+    
+    def iter_ticks(self, symbol: str, date: str, job_end_idx: Optional[int] = None) -> Optional[Iterator[MarketTick]]:
+        """Stream a trading day as MarketTicks in timestamp order without materializing the day
+        
+        Reads from the shared in-memory cache or the memory-mapped day file when
+        available, otherwise streams the option CSV. A CSV that is not sorted by
+        timestamp or has an unparsable timestamp, or a day whose spot data fails
+        to parse, is loaded whole instead. Only timestamps with both option and
+        spot data are yielded.
+        
+        Args:
+            symbol: Symbol to stream
+            date: Trading date
+            job_end_idx: The day's last valid timeindex if the caller already read
+                the .prop file, so it is not parsed again
+        
+        Returns:
+            Iterator of MarketTick, or None if the day cannot be loaded
+        """
+        if symbol not in self.supported_symbols:
+            print(f"Unsupported symbol: {symbol}")
+            return None
+        
+        option_file, spot_file, prop_file = self._get_source_files(symbol, date)
+        
+        if not os.path.exists(option_file):
+            print(f"Option data file not found: {option_file}")
+            return None
+        
+        source_mtime_ns = None
+        if self.use_memory_cache or self.use_cache:
+            source_mtime_ns = self._get_source_mtime_ns(date, option_file, spot_file, prop_file)
+        if self.use_memory_cache:
+            memory_key = shared_day_cache.make_key(self.data_path, symbol, date, source_mtime_ns)
+            cached_data = shared_day_cache.get(memory_key)
+            if cached_data is not None:
+                return self.iter_day_ticks(cached_data)
+        
+        cache_file = self.get_cache_file(symbol, date)
+        if self.use_cache and is_cache_fresh(cache_file, source_mtime_ns):
+            try:
+                cached_data = read_day_cache(cache_file)
+                if cached_data:
+                    return self.iter_day_ticks(cached_data)
+            except Exception as e:
+                print(f"Error reading day cache {cache_file}: {e}")
+        
+        if not self._can_stream_option_data(option_file):
+            print(f"Option data {option_file} is not sorted by timestamp or has unparsable rows; loading the whole day")
+            trading_day_data = self.load_trading_day(symbol, date)
+            return self.iter_day_ticks(trading_day_data) if trading_day_data else None
+        
+        spot_data, spot_complete = self._parse_spot_data(spot_file, date)
+        if not spot_complete:
+            # Incomplete days go through load_trading_day, which keeps them out of the caches
+            trading_day_data = self.load_trading_day(symbol, date)
+            return self.iter_day_ticks(trading_day_data) if trading_day_data else None
+        if job_end_idx is None:
+            job_end_idx = self._parse_prop_file(prop_file).get("jobEndIdx", 4660)
+        
+        return self._stream_ticks(symbol, option_file, spot_data, job_end_idx)
+    
+    def _can_stream_option_data(self, file_path: str) -> bool:
+        """Check that an option CSV's timestamps parse and never decrease, reading only the first column"""
+        previous = None
+        try:
+            with open(file_path, 'r') as file:
+                for line in file:
+                    field, _, rest = line.partition(',')
+                    field = field.strip()
+                    if not field.lstrip('-').isdigit():
+                        if rest.count(',') >= 2:
+                            return False  # A header or corrupt row, which the eager parser reports
+                        continue  # Short or blank rows are skipped by the parsers as well
+                    timestamp = int(field)
+                    if previous is not None and timestamp < previous:
+                        return False
+                    previous = timestamp
+        except Exception as e:
+            print(f"Error checking option data order {file_path}: {e}")
+            return False
+        return True
+    
+    def iter_day_ticks(self, data: MultiSymbolTradingData) -> Iterator[MarketTick]:
+        """Yield MarketTicks from an already loaded trading day"""
+        for timestamp in sorted(data.option_data.keys()):
+            if timestamp in data.spot_data:
+                yield MarketTick(
+                    timestamp=timestamp,
+                    symbol=data.symbol,
+                    spot_price=data.spot_data[timestamp],
+                    option_prices=data.option_data[timestamp],
+                    job_end_idx=data.job_end_idx
+                )
+    
+    def _stream_ticks(self, symbol: str, option_file: str, spot_data: Dict[int, float],
+                      job_end_idx: int) -> Iterator[MarketTick]:
+        """Yield MarketTicks while reading the option CSV one timestamp group at a time"""
+        for timestamp, option_prices in self._stream_option_data(option_file):
+            if timestamp in spot_data:
+                yield MarketTick(
+                    timestamp=timestamp,
+                    symbol=symbol,
+                    spot_price=spot_data[timestamp],
+                    option_prices=option_prices,
+                    job_end_idx=job_end_idx
+                )
+    
+    def _stream_option_data(self, file_path: str) -> Iterator[Tuple[int, Dict[str, Dict[float, float]]]]:
+        """Yield (timestamp, {CE/PE -> {strike -> price}}) groups from a timestamp-sorted option CSV
+        
+        iter_ticks checks the order before streaming; a file rewritten out of order
+        afterwards still raises ValueError here. Like _parse_option_data, a row that
+        fails to parse is reported and ends the day, keeping the rows before it.
+        """
+        current_timestamp = None
+        option_prices: Dict[str, Dict[float, float]] = {}
+        
+        with open(file_path, 'r') as file:
+            for row in csv.reader(file):
+                if len(row) < 4:
+                    continue
+                
+                try:
+                    timestamp = int(row[0])
+                    strike = float(row[2])
+                    price = float(row[3])
+                except ValueError as e:
+                    print(f"Error parsing option data {file_path}: {e}")
+                    break
+                
+                if timestamp != current_timestamp:
+                    if current_timestamp is not None:
+                        if timestamp < current_timestamp:
+                            raise ValueError(f"Option data {file_path} is not sorted by timestamp")
+                        yield current_timestamp, option_prices
+                    current_timestamp = timestamp
+                    option_prices = {}
+                
+                option_prices.setdefault(row[1], {})[strike] = price
+        
+        if current_timestamp is not None:
+            yield current_timestamp, option_prices
+    
+    def iter_multi_symbol_ticks(self, symbols: List[str], date: str) -> Iterator[Tuple[int, Dict[str, MarketTick]]]:
+        """Merge several symbols' tick streams into (timestamp, {symbol -> MarketTick}) in timestamp order
+        
+        Symbols whose day cannot be loaded are skipped.
+        """
+        streams = []
+        for symbol in symbols:
+            ticks = self.iter_ticks(symbol, date)
+            if ticks is not None:
+                streams.append(ticks)
+        
+        return self.merge_tick_streams(streams)
+    
+    def merge_tick_streams(self, streams: List[Iterator[MarketTick]]) -> Iterator[Tuple[int, Dict[str, MarketTick]]]:
+        """Merge timestamp-ordered tick streams, grouping ticks that share a timestamp"""
+        current_timestamp = None
+        symbol_ticks: Dict[str, MarketTick] = {}
+        
+        for tick in heapq.merge(*streams, key=lambda tick: tick.timestamp):
+            if tick.timestamp != current_timestamp:
+                if symbol_ticks:
+                    yield current_timestamp, symbol_ticks
+                current_timestamp = tick.timestamp
+                symbol_ticks = {}
+            symbol_ticks[tick.symbol] = tick
+        
+        if symbol_ticks:
+            yield current_timestamp, symbol_ticks
+    
+    def get_job_end_idx(self, symbol: str, date: str) -> int:
+        """Read the day's last valid timeindex from the .prop file"""
+        _, _, prop_file = self._get_source_files(symbol, date)
+        return self._parse_prop_file(prop_file).get("jobEndIdx", 4660)
+    
+    def build_cache(self, symbols: Optional[List[str]] = None, start_date: str = "", 
+                    end_date: str = "9999-12-31") -> Dict[str, List[str]]:
+        """Convert source CSV days into binary cache files ahead of time
+        
+        Days whose cache is already fresh are left alone.
+        
+        Returns:
+            Dict[symbol, List[date]] of days that were (re)converted
+        """
+        converted = {}
+        
+        for symbol in symbols or self.supported_symbols:
+            converted[symbol] = []
+            
+            for date in self.get_available_dates(symbol):
+                if not start_date <= date <= end_date:
+                    continue
+                
+                source_files = self._get_source_files(symbol, date)
+                source_mtime_ns = self._get_source_mtime_ns(date, *source_files)
+                if is_cache_fresh(self.get_cache_file(symbol, date), source_mtime_ns):
+                    continue
+                
+                # Write the day cache even if this loader does not read it
+                _, complete = self._read_trading_day(symbol, date, *source_files, use_cache=True,
+                                                     source_mtime_ns=source_mtime_ns)
+                if complete:
+                    converted[symbol].append(date)
+        
+        return converted
     
     def load_multiple_symbols(self, symbols: List[str], date: str, concurrent: bool = True) -> Dict[str, MultiSymbolTradingData]:
         """Load data for multiple symbols on the same date
@@ -311,9 +665,17 @@ class DataLoader:
             )
         return None
     
-    def _parse_option_data(self, file_path: str) -> Dict[int, Dict[str, Dict[float, float]]]:
-        """Parse option data CSV file"""
-        option_data = {}
+    def _parse_option_data(self, file_path: str) -> Tuple[ColumnarOptionData, bool]:
+        """Parse option data CSV file into a columnar day (timestamp x strike price matrices)
+        
+        Returns:
+            (day, complete); on a read or parse error, the rows before it and False
+        """
+        complete = True
+        timestamps = array('q')
+        option_types = []
+        strikes = array('d')
+        prices = array('d')
         
         try:
             with open(file_path, 'r') as file:
@@ -325,35 +687,31 @@ class DataLoader:
                         strike = float(row[2])
                         price = float(row[3])
                         
-                        if timestamp not in option_data:
-                            option_data[timestamp] = {}
-                        if option_type not in option_data[timestamp]:
-                            option_data[timestamp][option_type] = {}
-                        
-                        option_data[timestamp][option_type][strike] = price
+                        timestamps.append(timestamp)
+                        option_types.append(option_type)
+                        strikes.append(strike)
+                        prices.append(price)
         
         except Exception as e:
             print(f"Error parsing option data {file_path}: {e}")
+            complete = False
         
-        return option_data
+        return ColumnarOptionData.from_quotes(timestamps, option_types, strikes, prices), complete
     
-    def _parse_spot_data(self, file_path: str, target_date: str) -> Dict[int, float]:
-        """Parse spot price data CSV file for specific date"""
+    def _parse_spot_data(self, file_path: str, target_date: str) -> Tuple[Dict[int, float], bool]:
+        """Parse spot price data CSV file for specific date, returning (prices, complete)"""
         spot_data = {}
+        complete = True
         
         try:
-            with open(file_path, 'r') as file:
-                csv_reader = csv.reader(file)
-                for row in csv_reader:
-                    if len(row) >= 6 and row[0] == target_date:
-                        timestamp = int(row[1])
-                        close_price = float(row[5])  # Using close price
-                        spot_data[timestamp] = close_price
+            # Seeks to the date's rows via the persisted index; series are shared per process
+            spot_data = read_spot_day(file_path, target_date)
         
         except Exception as e:
             print(f"Error parsing spot data {file_path}: {e}")
+            complete = False
         
-        return spot_data
+        return spot_data, complete
     
     def _parse_prop_file(self, file_path: str) -> Dict:
         """Parse .prop file for metadata"""
@@ -396,6 +754,9 @@ class DataLoader:
     def get_option_price(self, option_data: Dict[int, Dict[str, Dict[float, float]]], 
                         timestamp: int, option_type: str, strike: float) -> Optional[float]:
         """Get option price for specific timestamp, type, and strike"""
+        if isinstance(option_data, ColumnarOptionData):
+            return option_data.get_price(timestamp, option_type, strike)
+        
         if (timestamp in option_data and 
             option_type in option_data[timestamp] and 
             strike in option_data[timestamp][option_type]):
@@ -0,0 +1,220 @@
+"""
+On-disk (binary) and in-process (LRU) caches for parsed trading days
+"""
+
+import os
+import sys
+import json
+import mmap
+import struct
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+from .models import MultiSymbolTradingData
+from .option_chain import ColumnarOptionData
+
+
+CACHE_MAGIC = b"OLODAY01"
+CACHE_EXTENSION = ".day"
+_HEADER_LENGTH = struct.Struct("<I")
+_ALIGNMENT = 8
+DEFAULT_MEMORY_CACHE_BYTES = 512 * 1024 * 1024
+_SPOT_ENTRY_BYTES = 100  # Rough per-entry cost of an int -> float dict item
+
+
+def _aligned(size: int) -> int:
+    """Round a byte count up to the column alignment"""
+    return (size + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+
+def is_cache_fresh(cache_file: str, source_mtime_ns: int) -> bool:
+    """Check that the cache exists and is at least as new as the day's newest source change"""
+    try:
+        return os.stat(cache_file).st_mtime_ns >= source_mtime_ns
+    except OSError:
+        return False
+
+
+def write_day_cache(cache_file: str, data: MultiSymbolTradingData) -> None:
+    """
+    Write a trading day to a single binary file.
+    
+    Layout: magic, little-endian uint32 header length, JSON header, then the
+    columns listed in the header as raw native-endian arrays, each padded to
+    8 bytes so they can be mapped straight back with memoryview.cast.
+    """
+    option_data = data.option_data
+    if not isinstance(option_data, ColumnarOptionData):
+        option_data = ColumnarOptionData.from_nested(option_data)
+    
+    spot_timestamps = array('q', sorted(data.spot_data))
+    spot_prices = array('d', (data.spot_data[timestamp] for timestamp in spot_timestamps))
+    
+    columns = [
+        ("timestamps", option_data.timestamps, 'q'),
+        ("strikes", option_data.strikes, 'd'),
+        ("type_mask", option_data.type_mask, 'B'),
+    ]
+    for option_type in option_data.option_types:
+        columns.append((f"prices:{option_type}", option_data.prices[option_type], 'd'))
+    columns.append(("spot_timestamps", spot_timestamps, 'q'))
+    columns.append(("spot_prices", spot_prices, 'd'))
+    
+    header = json.dumps({
+        "byteorder": sys.byteorder,
+        "date": data.date,
+        "symbol": data.symbol,
+        "job_end_idx": data.job_end_idx,
+        "metadata": data.metadata,
+        "option_types": option_data.option_types,
+        "columns": [{"name": name, "typecode": typecode, "length": len(values)}
+                    for name, values, typecode in columns]
+    }).encode("utf-8")
+    
+    os.makedirs(os.path.dirname(cache_file) or ".", exist_ok=True)
+    temp_file = f"{cache_file}.{os.getpid()}.{threading.get_ident()}.tmp"
+    
+    with open(temp_file, 'wb') as file:
+        preamble = CACHE_MAGIC + _HEADER_LENGTH.pack(len(header)) + header
+        file.write(preamble)
+        file.write(bytes(_aligned(len(preamble)) - len(preamble)))
+        
+        for name, values, typecode in columns:
+            payload = memoryview(values).cast('B')
+            file.write(payload)
+            file.write(bytes(_aligned(len(payload)) - len(payload)))
+    
+    os.replace(temp_file, cache_file)
+
+
+def read_day_cache(cache_file: str) -> Optional[MultiSymbolTradingData]:
+    """Memory-map a cached trading day; returns None if the file is not a usable cache"""
+    with open(cache_file, 'rb') as file:
+        buffer = memoryview(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ))
+    
+    if bytes(buffer[:len(CACHE_MAGIC)]) != CACHE_MAGIC:
+        return None
+    
+    header_start = len(CACHE_MAGIC) + _HEADER_LENGTH.size
+    (header_length,) = _HEADER_LENGTH.unpack(buffer[len(CACHE_MAGIC):header_start])
+    header = json.loads(bytes(buffer[header_start:header_start + header_length]).decode("utf-8"))
+    
+    if header.get("byteorder") != sys.byteorder:
+        return None
+    
+    columns: Dict[str, memoryview] = {}
+    offset = _aligned(header_start + header_length)
+    for column in header["columns"]:
+        size = column["length"] * array(column["typecode"]).itemsize
+        columns[column["name"]] = buffer[offset:offset + size].cast(column["typecode"])
+        offset += _aligned(size)
+    
+    option_data = ColumnarOptionData(
+        timestamps=columns["timestamps"],
+        strikes=columns["strikes"],
+        prices={option_type: columns[f"prices:{option_type}"] for option_type in header["option_types"]},
+        type_mask=columns["type_mask"]
+    )
+    
+    return MultiSymbolTradingData(
+        date=header["date"],
+        symbol=header["symbol"],
+        spot_data=dict(zip(columns["spot_timestamps"], columns["spot_prices"])),
+        option_data=option_data,
+        job_end_idx=header["job_end_idx"],
+        metadata=header["metadata"]
+    )
+
+
+def estimate_day_bytes(data: MultiSymbolTradingData) -> int:
+    """Approximate memory held by a loaded trading day"""
+    option_data = data.option_data
+    if isinstance(option_data, ColumnarOptionData):
+        option_bytes = option_data.nbytes
+    else:
+        option_bytes = sum(len(chain) for snapshot in option_data.values()
+                           for chain in snapshot.values()) * _SPOT_ENTRY_BYTES
+    return option_bytes + len(data.spot_data) * _SPOT_ENTRY_BYTES
+
+
+class SharedDayCache:
+    """
+    Byte-bounded LRU of loaded trading days, shared by every DataLoader in the process.
+    
+    Keys are (data_path, symbol, date, source mtime) so edited source files miss naturally.
+    Cached days are handed out as-is and must be treated as read-only.
+    """
+    
+    def __init__(self, max_bytes: int = DEFAULT_MEMORY_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.current_bytes = 0
+        self._entries: 'OrderedDict[Tuple, Tuple[MultiSymbolTradingData, int]]' = OrderedDict()
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def make_key(data_path: str, symbol: str, date: str, source_mtime_ns: int) -> Tuple:
+        """Build a cache key from the newest change to the day's source data"""
+        return (os.path.realpath(data_path), symbol, date, source_mtime_ns)
+    
+    def get(self, key: Tuple) -> Optional[MultiSymbolTradingData]:
+        """Return a cached day and mark it most recently used"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+    
+    def put(self, key: Tuple, data: MultiSymbolTradingData) -> None:
+        """Insert a day, evicting least recently used days beyond max_bytes"""
+        size = estimate_day_bytes(data)
+        with self._lock:
+            if size > self.max_bytes:
+                return
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.current_bytes -= previous[1]
+            self._entries[key] = (data, size)
+            self.current_bytes += size
+            self._evict()
+    
+    def set_max_bytes(self, max_bytes: int) -> None:
+        """Change the byte budget, evicting immediately if needed"""
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict()
+    
+    def _evict(self) -> None:
+        """Drop least recently used entries until within budget (lock held)"""
+        while self._entries and self.current_bytes > self.max_bytes:
+            _, (_, size) = self._entries.popitem(last=False)
+            self.current_bytes -= size
+            self.evictions += 1
+    
+    def clear(self) -> None:
+        """Drop all entries and reset the counters"""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+            self.hits = self.misses = self.evictions = 0
+    
+    def get_stats(self) -> Dict[str, int]:
+        """Get hit/miss/eviction counters and current usage"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes
+            }
+
+
+shared_day_cache = SharedDayCache()
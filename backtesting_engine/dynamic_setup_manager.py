@@ -5,6 +5,15 @@ Dynamic setup management system for adaptive parameter adjustment
 import copy
 from typing import Dict, List, Optional, Tuple
 from .models import TradingSetup, MarketData, Trade, ParameterAdjustment
+from .event_log import EventLog, VERBOSITY_EVENTS
+
+
+# Setup parameters scaled per regime, with the regime config key holding each multiplier
+REGIME_PARAMETERS = (
+    ('target_pct', 'target_pct_multiplier'),
+    ('stop_loss_pct', 'stop_loss_pct_multiplier'),
+    ('scalping_price', 'scalping_price_multiplier'),
+)
 
 
 class DynamicSetupManager:
@@ -13,17 +22,24 @@ class DynamicSetupManager:
     
     Monitors market regime changes from MarketRegimeDetector and dynamically adjusts setup parameters
     (target_pct, stop_loss_pct, scalping_price) to optimize performance for current market conditions.
+    
+    Each base setup has one working copy per day. Regime parameters are written onto it
+    only when its regime changes, so ticks in an unchanged regime cost a comparison and
+    the copy keeps its daily state (entry counts, re-entry timing) across adjustments.
     """
     
-    def __init__(self, base_setups: List[TradingSetup]):
+    def __init__(self, base_setups: List[TradingSetup], event_log: Optional[EventLog] = None):
         """
         Initialize dynamic setup manager
         
         Args:
             base_setups: List of base trading setups to manage
+            event_log: Destination for regime change events (prints by default)
         """
         self.base_setups = base_setups
+        self.event_log = event_log if event_log is not None else EventLog()
         self.adjusted_setups = [copy.deepcopy(setup) for setup in base_setups]
+        self.applied_regimes = ["UNKNOWN"] * len(base_setups)  # Regime whose parameters each adjusted setup carries
         
         # Current market regime tracking
         self.current_regime = "UNKNOWN"
@@ -32,9 +48,11 @@ class DynamicSetupManager:
         
         # Performance tracking
         self.adjustment_performance: Dict[str, float] = {}  # adjustment_type -> avg_pnl_impact
+        self.adjustment_trade_counts: Dict[str, int] = {}  # adjustment_type -> trades folded into the average
         self.static_performance: Dict[str, List[float]] = {}  # setup_id -> [pnl_values]
         self.dynamic_performance: Dict[str, List[float]] = {}  # setup_id -> [pnl_values]
         self.adjustment_history: List[ParameterAdjustment] = []
+        self.first_adjustment_times: Dict[str, int] = {}  # setup_id -> earliest timestamp in adjustment_history
         
         # Strategy activation tracking
         self.paused_strategies: set = set()
@@ -59,7 +77,12 @@ class DynamicSetupManager:
         regime_changed = regime != self.current_regime and self.current_regime != "UNKNOWN"
         
         if regime_changed:
-            print(f"🔄 Regime change detected: {self.current_regime} -> {regime} (confidence: {confidence:.2f})")
+            if self.event_log.is_enabled(VERBOSITY_EVENTS):
+                self.event_log.event(
+                    VERBOSITY_EVENTS, "regime_change",
+                    f"🔄 Regime change detected: {self.current_regime} -> {regime} (confidence: {confidence:.2f})",
+                    timestamp=market_data.timestamp, symbol=market_data.symbol,
+                    from_regime=self.current_regime, to_regime=regime, confidence=confidence)
             self.last_regime_change_time = market_data.timestamp
             
             # Track regime accuracy (simplified - assumes previous regime was correct if confidence was high)
@@ -96,6 +119,20 @@ class DynamicSetupManager:
         """
         return setup_id in self.paused_strategies
     
+    def was_adjusted_before(self, setup_id: str, timestamp: int) -> bool:
+        """
+        Check if a setup's parameters were adjusted at or before a timestamp today
+        
+        Args:
+            setup_id: Strategy setup ID to check
+            timestamp: Time to check against, usually a trade's entry time
+            
+        Returns:
+            True if any adjustment in the history for this setup is no later than timestamp
+        """
+        first_time = self.first_adjustment_times.get(setup_id)
+        return first_time is not None and first_time <= timestamp
+    
     def adjust_parameters_for_regime(self, setup: TradingSetup, regime: str) -> TradingSetup:
         """
         Adjust individual setup parameters for specific regime
@@ -108,19 +145,8 @@ class DynamicSetupManager:
             Adjusted setup
         """
         adjusted_setup = copy.deepcopy(setup)
-        
-        if regime in self.regime_configs:
-            config = self.regime_configs[regime]
-            
-            # Apply regime-specific multipliers
-            if 'target_pct_multiplier' in config:
-                adjusted_setup.target_pct *= config['target_pct_multiplier']
-            
-            if 'stop_loss_pct_multiplier' in config:
-                adjusted_setup.stop_loss_pct *= config['stop_loss_pct_multiplier']
-            
-            if 'scalping_price_multiplier' in config:
-                adjusted_setup.scalping_price *= config['scalping_price_multiplier']
+        for name, value in self._regime_parameters(setup, regime).items():
+            setattr(adjusted_setup, name, value)
         
         return adjusted_setup
     
@@ -153,6 +179,7 @@ class DynamicSetupManager:
         count = len(self.dynamic_performance.get(setup_id, []))
         if count > 0:
             self.adjustment_performance[adjustment_type] = (current_avg * (count - 1) + trade.pnl) / count
+            self.adjustment_trade_counts[adjustment_type] = self.adjustment_trade_counts.get(adjustment_type, 0) + 1
     
     def get_regime_specific_config(self, regime: str) -> Dict[str, Dict[str, float]]:
         """
@@ -170,12 +197,14 @@ class DynamicSetupManager:
         """Reset daily adjustment tracking"""
         # Clear daily adjustment history but keep performance tracking
         self.adjustment_history = []
+        self.first_adjustment_times = {}
         
         # Reset paused strategies for new day
         self.paused_strategies.clear()
         
         # Reset adjusted setups to base setups
         self.adjusted_setups = [copy.deepcopy(setup) for setup in self.base_setups]
+        self.applied_regimes = ["UNKNOWN"] * len(self.base_setups)
     
     def get_adjustment_statistics(self) -> Dict[str, float]:
         """
@@ -217,6 +246,45 @@ class DynamicSetupManager:
             'dynamic_trade_count': len(all_dynamic_pnls)
         }
     
+    def merge_statistics(self, other: 'DynamicSetupManager') -> None:
+        """
+        Fold another manager's performance tracking into this one
+        
+        Used to combine managers that ran on separate blocks of days. Adjustment
+        averages are weighted by their trade counts, so shards merge in any number.
+        Regime state is taken from the other manager, assumed to cover the later days.
+        
+        Args:
+            other: Manager whose statistics are merged in
+        """
+        self.total_adjustments += other.total_adjustments
+        self.regime_accuracy_history.extend(other.regime_accuracy_history)
+        
+        for setup_id, pnls in other.static_performance.items():
+            self.static_performance.setdefault(setup_id, []).extend(pnls)
+        for setup_id, pnls in other.dynamic_performance.items():
+            self.dynamic_performance.setdefault(setup_id, []).extend(pnls)
+        
+        for adjustment_type, performance in other.adjustment_performance.items():
+            other_count = other.adjustment_trade_counts.get(adjustment_type, 0)
+            if adjustment_type in self.adjustment_performance:
+                count = self.adjustment_trade_counts.get(adjustment_type, 0)
+                total = count + other_count
+                if total > 0:
+                    self.adjustment_performance[adjustment_type] = (
+                        self.adjustment_performance[adjustment_type] * count + performance * other_count) / total
+            else:
+                self.adjustment_performance[adjustment_type] = performance
+            self.adjustment_trade_counts[adjustment_type] = self.adjustment_trade_counts.get(adjustment_type, 0) + other_count
+        
+        self.adjustment_history.extend(other.adjustment_history)
+        for setup_id, first_time in other.first_adjustment_times.items():
+            self.first_adjustment_times[setup_id] = min(first_time, self.first_adjustment_times.get(setup_id, first_time))
+        
+        self.current_regime = other.current_regime
+        self.regime_confidence = other.regime_confidence
+        self.last_regime_change_time = other.last_regime_change_time
+    
     def _adjust_setups_for_regime(self, regime: str, market_data: MarketData) -> None:
         """
         Adjust all setups for the current market regime
@@ -228,8 +296,6 @@ class DynamicSetupManager:
         if regime not in self.regime_configs:
             return
         
-        config = self.regime_configs[regime]
-        
         for i, base_setup in enumerate(self.base_setups):
             # Check if strategy should be paused for this regime
             if self._should_pause_strategy_for_regime(base_setup.setup_id, regime):
@@ -238,12 +304,34 @@ class DynamicSetupManager:
             else:
                 self.paused_strategies.discard(base_setup.setup_id)
             
-            # Apply adjustments
-            old_setup = copy.deepcopy(self.adjusted_setups[i])
-            self.adjusted_setups[i] = self.adjust_parameters_for_regime(base_setup, regime)
+            # Parameters only change with the regime
+            if self.applied_regimes[i] == regime:
+                continue
+            
+            # Apply adjustments in place, keeping the setup's daily state
+            adjusted_setup = self.adjusted_setups[i]
+            old_values = {name: getattr(adjusted_setup, name) for name, _ in REGIME_PARAMETERS}
+            for name, value in self._regime_parameters(base_setup, regime).items():
+                setattr(adjusted_setup, name, value)
+            self.applied_regimes[i] = regime
             
             # Track parameter changes
-            self._track_parameter_changes(old_setup, self.adjusted_setups[i], regime, market_data.timestamp)
+            self._track_parameter_changes(old_values, adjusted_setup, regime, market_data.timestamp)
+    
+    def _regime_parameters(self, setup: TradingSetup, regime: str) -> Dict[str, float]:
+        """
+        Parameter values of a base setup under a regime's multipliers
+        
+        Args:
+            setup: Base setup
+            regime: Target regime
+            
+        Returns:
+            Dictionary of parameter name to adjusted value
+        """
+        config = self.regime_configs.get(regime, {})
+        return {name: getattr(setup, name) * config[multiplier] if multiplier in config else getattr(setup, name)
+                for name, multiplier in REGIME_PARAMETERS}
     
     def _should_pause_strategy_for_regime(self, setup_id: str, regime: str) -> bool:
         """
@@ -293,52 +381,34 @@ class DynamicSetupManager:
         # If we can't determine strategy type, don't pause
         return False
     
-    def _track_parameter_changes(self, old_setup: TradingSetup, new_setup: TradingSetup, 
+    def _track_parameter_changes(self, old_values: Dict[str, float], new_setup: TradingSetup, 
                                 regime: str, timestamp: int) -> None:
         """
         Track parameter changes for reporting
         
         Args:
-            old_setup: Setup before adjustment
+            old_values: Parameter values before adjustment
             new_setup: Setup after adjustment
             regime: Current regime that triggered adjustment
             timestamp: Current timestamp
         """
-        # Track target_pct changes
-        if abs(old_setup.target_pct - new_setup.target_pct) > 0.001:
-            self.adjustment_history.append(ParameterAdjustment(
-                timestamp=timestamp,
-                setup_id=new_setup.setup_id,
-                parameter_name='target_pct',
-                old_value=old_setup.target_pct,
-                new_value=new_setup.target_pct,
-                reason=f'regime_change_to_{regime}'
-            ))
-            self.total_adjustments += 1
-        
-        # Track stop_loss_pct changes
-        if abs(old_setup.stop_loss_pct - new_setup.stop_loss_pct) > 0.001:
-            self.adjustment_history.append(ParameterAdjustment(
-                timestamp=timestamp,
-                setup_id=new_setup.setup_id,
-                parameter_name='stop_loss_pct',
-                old_value=old_setup.stop_loss_pct,
-                new_value=new_setup.stop_loss_pct,
-                reason=f'regime_change_to_{regime}'
-            ))
-            self.total_adjustments += 1
-        
-        # Track scalping_price changes
-        if abs(old_setup.scalping_price - new_setup.scalping_price) > 0.001:
-            self.adjustment_history.append(ParameterAdjustment(
-                timestamp=timestamp,
-                setup_id=new_setup.setup_id,
-                parameter_name='scalping_price',
-                old_value=old_setup.scalping_price,
-                new_value=new_setup.scalping_price,
-                reason=f'regime_change_to_{regime}'
-            ))
-            self.total_adjustments += 1
+        for name, _ in REGIME_PARAMETERS:
+            old_value = old_values[name]
+            new_value = getattr(new_setup, name)
+            if abs(old_value - new_value) > 0.001:
+                self.adjustment_history.append(ParameterAdjustment(
+                    timestamp=timestamp,
+                    setup_id=new_setup.setup_id,
+                    parameter_name=name,
+                    old_value=old_value,
+                    new_value=new_value,
+                    reason=f'regime_change_to_{regime}'
+                ))
+                self.total_adjustments += 1
+                
+                first_time = self.first_adjustment_times.get(new_setup.setup_id)
+                if first_time is None or timestamp < first_time:
+                    self.first_adjustment_times[new_setup.setup_id] = timestamp
     
     def _initialize_regime_configs(self) -> Dict[str, Dict[str, float]]:
         """
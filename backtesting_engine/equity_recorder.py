@@ -0,0 +1,146 @@
+"""
+Opt-in tick-level mark-to-market equity recorder with downsampling
+"""
+
+from array import array
+from typing import Dict, List, Tuple
+
+
+DOWNSAMPLE_LAST = "last"  # Keep the last tick of each bucket
+DOWNSAMPLE_MINMAX = "minmax"  # Keep the lowest and highest tick of each bucket, in time order
+
+
+class EquitySeries:
+    """Downsampled (date, timestamp, equity) points for one symbol in growable preallocated arrays"""
+    
+    __slots__ = ("dates", "timestamps", "equity", "length", "bucket_ticks",
+                 "last_timestamp", "last_equity", "low_timestamp", "low_equity", "high_timestamp", "high_equity")
+    
+    def __init__(self, capacity: int):
+        self.dates = array('i', bytes(4 * capacity))  # Ids into EquityRecorder.dates
+        self.timestamps = array('q', bytes(8 * capacity))
+        self.equity = array('d', bytes(8 * capacity))
+        self.length = 0
+        
+        # Open bucket
+        self.bucket_ticks = 0
+        self.last_timestamp = 0
+        self.last_equity = 0.0
+        self.low_timestamp = 0
+        self.low_equity = 0.0
+        self.high_timestamp = 0
+        self.high_equity = 0.0
+    
+    def _write(self, date_id: int, timestamp: int, equity: float) -> None:
+        """Store one point, doubling the arrays when full"""
+        index = self.length
+        if index == len(self.equity):
+            grow = max(index, 1)
+            self.dates.frombytes(bytes(4 * grow))
+            self.timestamps.frombytes(bytes(8 * grow))
+            self.equity.frombytes(bytes(8 * grow))
+        self.dates[index] = date_id
+        self.timestamps[index] = timestamp
+        self.equity[index] = equity
+        self.length = index + 1
+    
+    def flush(self, date_id: int, mode: str) -> None:
+        """Close the open bucket, writing its downsampled points"""
+        if not self.bucket_ticks:
+            return
+        if mode == DOWNSAMPLE_MINMAX:
+            first, second = ((self.low_timestamp, self.low_equity), (self.high_timestamp, self.high_equity))
+            if second[0] < first[0]:
+                first, second = second, first
+            self._write(date_id, first[0], first[1])
+            if second[0] != first[0]:
+                self._write(date_id, second[0], second[1])
+        else:
+            self._write(date_id, self.last_timestamp, self.last_equity)
+        self.bucket_ticks = 0
+
+
+class EquityRecorder:
+    """
+    Record realized plus unrealized P&L per symbol at every tick.
+    
+    Ticks are grouped into buckets of every_n_ticks; each bucket is reduced to its
+    last point (DOWNSAMPLE_LAST) or its low and high points (DOWNSAMPLE_MINMAX)
+    and written into arrays preallocated for capacity points per symbol, which
+    double when full. Recording a tick only updates the open bucket in place, so
+    the recorder can stay on for long sweeps. Buckets never span trading days.
+    
+    Pass an instance to BacktestEngine(equity_recorder=...); the engine feeds it and
+    attaches it to BacktestResults.intraday_equity.
+    """
+    
+    def __init__(self, every_n_ticks: int = 1, mode: str = DOWNSAMPLE_LAST, capacity: int = 4096):
+        if mode not in (DOWNSAMPLE_LAST, DOWNSAMPLE_MINMAX):
+            raise ValueError(f"Unknown downsampling mode: {mode}")
+        self.every_n_ticks = max(1, every_n_ticks)
+        self.mode = mode
+        self.capacity = capacity
+        self.series: Dict[str, EquitySeries] = {}
+        self.dates: List[str] = []
+        self._date_id = -1
+    
+    def start_day(self, date: str) -> None:
+        """Begin recording a trading date"""
+        self.dates.append(date)
+        self._date_id = len(self.dates) - 1
+    
+    def record(self, symbol: str, timestamp: int, equity: float) -> None:
+        """Account for one tick of a symbol's total P&L"""
+        series = self.series.get(symbol)
+        if series is None:
+            series = self.series[symbol] = EquitySeries(self.capacity)
+        
+        if series.bucket_ticks == 0:
+            series.low_timestamp = series.high_timestamp = timestamp
+            series.low_equity = series.high_equity = equity
+        elif equity < series.low_equity:
+            series.low_timestamp = timestamp
+            series.low_equity = equity
+        elif equity > series.high_equity:
+            series.high_timestamp = timestamp
+            series.high_equity = equity
+        series.last_timestamp = timestamp
+        series.last_equity = equity
+        series.bucket_ticks += 1
+        
+        if series.bucket_ticks >= self.every_n_ticks:
+            series.flush(self._date_id, self.mode)
+    
+    def end_day(self) -> None:
+        """Close every open bucket at the end of a trading date"""
+        for series in self.series.values():
+            series.flush(self._date_id, self.mode)
+    
+    def extend(self, other: 'EquityRecorder', offsets: Dict[str, float]) -> None:
+        """Append a later run of days recorded separately, shifting each symbol's equity by its starting P&L"""
+        date_ids = []
+        for date in other.dates:
+            self.start_day(date)
+            date_ids.append(self._date_id)
+        
+        for symbol, other_series in other.series.items():
+            series = self.series.get(symbol)
+            if series is None:
+                series = self.series[symbol] = EquitySeries(self.capacity)
+            offset = offsets.get(symbol, 0.0)
+            for index in range(other_series.length):
+                series._write(date_ids[other_series.dates[index]], other_series.timestamps[index],
+                              other_series.equity[index] + offset)
+    
+    def get_points(self, symbol: str) -> List[Tuple[str, int, float]]:
+        """Recorded (date, timestamp, equity) points of a symbol"""
+        series = self.series.get(symbol)
+        if series is None:
+            return []
+        return [(self.dates[series.dates[index]], series.timestamps[index], series.equity[index])
+                for index in range(series.length)]
+    
+    def get_equity(self, symbol: str) -> array:
+        """Recorded equity values of a symbol"""
+        series = self.series.get(symbol)
+        return series.equity[:series.length] if series is not None else array('d')
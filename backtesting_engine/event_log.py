@@ -0,0 +1,119 @@
+"""
+Verbosity-gated console output and structured event sinks for the backtest loop
+"""
+
+import json
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+
+# Verbosity levels: each level includes everything below it
+VERBOSITY_SILENT = 0   # No console output
+VERBOSITY_SUMMARY = 1  # Per-run and per-day lines
+VERBOSITY_EVENTS = 2   # Per-tick events: opens, regime changes, divergences, limits
+
+
+class RingBufferSink:
+    """Keep the most recent events in memory"""
+    
+    def __init__(self, capacity: int = 10000):
+        self.events = deque(maxlen=capacity)
+    
+    def record(self, event: Dict) -> None:
+        """Store an event, dropping the oldest when full"""
+        self.events.append(event)
+    
+    def get_events(self, kind: Optional[str] = None) -> List[Dict]:
+        """Get buffered events, optionally filtered by kind"""
+        if kind is None:
+            return list(self.events)
+        return [event for event in self.events if event["kind"] == kind]
+    
+    def flush(self) -> None:
+        """Nothing to flush for an in-memory buffer"""
+        pass
+
+
+class JsonlSink:
+    """Append events to a JSON Lines file, one object per line"""
+    
+    def __init__(self, filename: str):
+        self.filename = filename
+        self._file = None
+    
+    def record(self, event: Dict) -> None:
+        """Write an event as one JSON line"""
+        if self._file is None:
+            self._file = open(self.filename, 'a')
+        self._file.write(json.dumps(event, default=str) + "\n")
+    
+    def flush(self) -> None:
+        """Flush buffered lines to disk"""
+        if self._file is not None:
+            self._file.flush()
+    
+    def close(self) -> None:
+        """Close the file; later events reopen it in append mode"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+    
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_file"] = None  # Worker processes reopen the file themselves
+        return state
+
+
+class EventLog:
+    """
+    Route engine events to the console by verbosity and to an optional structured sink.
+    
+    Hot-loop callers check is_enabled(level) before building messages, so a disabled
+    level costs one comparison per event site.
+    """
+    
+    def __init__(self, verbosity: int = VERBOSITY_EVENTS, sink=None, sink_verbosity: int = VERBOSITY_EVENTS):
+        self.verbosity = verbosity
+        self.sink = sink
+        self.sink_verbosity = sink_verbosity
+    
+    def is_enabled(self, level: int) -> bool:
+        """Check whether an event at this level would be printed or recorded"""
+        return level <= self.verbosity or (self.sink is not None and level <= self.sink_verbosity)
+    
+    def event(self, level: int, kind: str, message: str, **fields) -> None:
+        """Print the message and/or record {kind, level, **fields} depending on levels"""
+        if level <= self.verbosity:
+            print(message)
+        if self.sink is not None and level <= self.sink_verbosity:
+            record = {"kind": kind, "level": level}
+            record.update(fields)
+            self.sink.record(record)
+    
+    def flush(self) -> None:
+        """Flush the sink, if any"""
+        if self.sink is not None:
+            self.sink.flush()
+
+
+class EventRecorder(EventLog):
+    """
+    Keep events with their messages instead of printing or sinking them, to replay later.
+    
+    Worker processes record into one of these so the parent can replay every
+    shard's events in date order through its own EventLog.
+    """
+    
+    def __init__(self, verbosity: int = VERBOSITY_EVENTS):
+        super().__init__(verbosity)
+        self.events: List[Tuple[int, str, str, Dict]] = []  # (level, kind, message, fields)
+    
+    def event(self, level: int, kind: str, message: str, **fields) -> None:
+        """Keep the event if its level is enabled"""
+        if level <= self.verbosity:
+            self.events.append((level, kind, message, fields))
+    
+    def replay(self, event_log: EventLog) -> None:
+        """Send the kept events, in order, through another EventLog"""
+        for level, kind, message, fields in self.events:
+            event_log.event(level, kind, message, **fields)
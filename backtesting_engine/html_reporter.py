@@ -4,8 +4,9 @@ HTML report generator for backtesting results
 
 import os
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, List, Optional
 from .models import BacktestResults, Trade, DailyResults, SetupResults
+from .trade_stats import TradeAggregator
 
 
 class HTMLReporter:
@@ -14,6 +15,19 @@ class HTMLReporter:
     def __init__(self, results: BacktestResults):
         self.results = results
         self.report_dir = "backtest_reports"
+        self._trades: Optional[List[Trade]] = None
+    
+    def _get_trade_stats(self) -> TradeAggregator:
+        """Grouped trade statistics from the results, aggregated from the trade log if absent"""
+        if self.results.trade_stats is None:
+            self.results.trade_stats = TradeAggregator.from_trades(self._get_trades())
+        return self.results.trade_stats
+    
+    def _get_trades(self) -> List[Trade]:
+        """Trades of the results' columnar log, built once per reporter instead of on every pass"""
+        if self._trades is None or len(self._trades) != len(self.results.trade_log):
+            self._trades = list(self.results.trade_log)
+        return self._trades
     
     def generate_html_report(self, symbols: List[str], start_date: str, end_date: str) -> str:
         """Generate comprehensive HTML report"""
@@ -486,7 +500,7 @@ class HTMLReporter:
     def _generate_trades_table(self) -> str:
         """Generate the detailed trades table"""
         trade_rows = ""
-        for i, trade in enumerate(self.results.trade_log, 1):
+        for i, trade in enumerate(self._get_trades(), 1):
             pnl_class = "profit" if trade.pnl >= 0 else "loss"
             
             # Get exit reason badge
@@ -591,6 +605,20 @@ class HTMLReporter:
     
     def _generate_charts_section(self) -> str:
         """Generate the charts section"""
+        # The intraday tab only exists when the run recorded tick-level equity
+        intraday_tab = ""
+        intraday_content = ""
+        if self.results.intraday_equity is not None:
+            intraday_tab = """
+                    <div class="tab" onclick="showTab('intraday-equity')">Intraday Equity</div>"""
+            intraday_content = """
+                
+                <div id="intraday-equity" class="tab-content">
+                    <div class="chart-container">
+                        <canvas id="intradayChart"></canvas>
+                    </div>
+                </div>"""
+        
         return f"""
         <div class="section">
             <div class="section-header">
@@ -603,7 +631,7 @@ class HTMLReporter:
                     <div class="tab" onclick="showTab('setup-comparison')">Setup Comparison</div>
                     <div class="tab" onclick="showTab('symbol-performance')">Symbol Performance</div>
                     <div class="tab" onclick="showTab('regime-analysis')">Regime Analysis</div>
-                    <div class="tab" onclick="showTab('dynamic-adjustments')">Dynamic Adjustments</div>
+                    <div class="tab" onclick="showTab('dynamic-adjustments')">Dynamic Adjustments</div>{intraday_tab}
                 </div>
                 
                 <div id="equity-curve" class="tab-content active">
@@ -640,20 +668,18 @@ class HTMLReporter:
                     <div class="chart-container">
                         <canvas id="dynamicChart"></canvas>
                     </div>
-                </div>
+                </div>{intraday_content}
             </div>
         </div>
         """
     
     def _generate_statistics_section(self) -> str:
         """Generate the statistics section"""
-        winning_trades = [t for t in self.results.trade_log if t.pnl > 0]
-        losing_trades = [t for t in self.results.trade_log if t.pnl < 0]
+        trade_stats = self._get_trade_stats()
+        overall = trade_stats.stats()
         
         # Exit reason analysis
-        exit_reasons = {}
-        for trade in self.results.trade_log:
-            exit_reasons[trade.exit_reason] = exit_reasons.get(trade.exit_reason, 0) + 1
+        exit_reasons = trade_stats.exit_reasons
         
         reason_rows = ""
         for reason, count in sorted(exit_reasons.items()):
@@ -674,19 +700,19 @@ class HTMLReporter:
             <div class="section-content">
                 <div class="metrics-grid">
                     <div class="metric-card positive">
-                        <div class="metric-value">{len(winning_trades)}</div>
+                        <div class="metric-value">{overall.wins}</div>
                         <div class="metric-label">Winning Trades</div>
                     </div>
                     <div class="metric-card negative">
-                        <div class="metric-value">{len(losing_trades)}</div>
+                        <div class="metric-value">{overall.losses}</div>
                         <div class="metric-label">Losing Trades</div>
                     </div>
                     <div class="metric-card positive">
-                        <div class="metric-value">${sum(t.pnl for t in winning_trades) / len(winning_trades) if winning_trades else 0:,.2f}</div>
+                        <div class="metric-value">${overall.avg_win:,.2f}</div>
                         <div class="metric-label">Avg Win</div>
                     </div>
                     <div class="metric-card negative">
-                        <div class="metric-value">${sum(t.pnl for t in losing_trades) / len(losing_trades) if losing_trades else 0:,.2f}</div>
+                        <div class="metric-value">${overall.avg_loss:,.2f}</div>
                         <div class="metric-label">Avg Loss</div>
                     </div>
                 </div>
@@ -916,12 +942,8 @@ class HTMLReporter:
         daily_dates = [d.date for d in self.results.daily_results]
         daily_pnls = [d.daily_pnl for d in self.results.daily_results]
         
-        # Calculate cumulative P&L for equity curve
-        cumulative_pnl = []
-        running_total = 0
-        for trade in self.results.trade_log:
-            running_total += trade.pnl
-            cumulative_pnl.append(running_total)
+        # Cumulative closed P&L after each trade, tracked as trades closed
+        cumulative_pnl = list(self._get_trade_stats().equity_curve().equity)
         
         setup_names = list(self.results.setup_performance.keys())
         setup_pnls = [self.results.setup_performance[name].total_pnl for name in setup_names]
@@ -1175,5 +1197,56 @@ class HTMLReporter:
                     }}
                 }}
             }});
-        }}
-        """
\ No newline at end of file
+            
+{self._generate_intraday_chart_javascript()}        }}
+        """
+    
+    def _generate_intraday_chart_javascript(self) -> str:
+        """Generate the intraday equity chart script, empty when the run recorded no tick-level equity"""
+        recorder = self.results.intraday_equity
+        if recorder is None:
+            return ""
+        
+        # Each symbol's {x, y} points on one merged time axis, since symbols are recorded on different ticks
+        intraday_keys = set()
+        intraday_series = {}
+        for symbol in recorder.series:
+            points = recorder.get_points(symbol)
+            intraday_keys.update((date, timestamp) for date, timestamp, _ in points)
+            intraday_series[symbol] = [{'x': f"{date} {timestamp}", 'y': round(equity, 2)}
+                                       for date, timestamp, equity in points]
+        intraday_labels = [f"{date} {timestamp}" for date, timestamp in sorted(intraday_keys)]
+        
+        return f"""            // Intraday Mark-to-Market Equity Chart
+            const intradayLabels = {intraday_labels};
+            const intradaySeries = {intraday_series};
+            const intradaySymbols = Object.keys(intradaySeries);
+            if (intradaySymbols.length > 0) {{
+                const intradayCtx = document.getElementById('intradayChart').getContext('2d');
+                new Chart(intradayCtx, {{
+                    type: 'line',
+                    data: {{
+                        labels: intradayLabels,
+                        datasets: intradaySymbols.map(symbol => ({{
+                            label: symbol + ' Realized + Unrealized P&L',
+                            data: intradaySeries[symbol],
+                            pointRadius: 0,
+                            borderWidth: 1,
+                            tension: 0
+                        }}))
+                    }},
+                    options: {{
+                        responsive: true,
+                        maintainAspectRatio: false,
+                        scales: {{
+                            y: {{
+                                title: {{
+                                    display: true,
+                                    text: 'P&L ($)'
+                                }}
+                            }}
+                        }}
+                    }}
+                }});
+            }}
+"""
\ No newline at end of file
@@ -0,0 +1,249 @@
+"""
+Per-(symbol, date) indicator series computed once and shared by the setups bound to them
+
+BacktestEngine does not feed or bind these series, since the baseline engine never
+passes ticks to pattern setups. Callers that drive pattern setups themselves get a
+day's series from DataLoader.get_day_indicators, bind each setup with
+TradingSetup.bind_indicators and persist the day with DataLoader.save_day_indicators.
+"""
+
+import os
+import math
+import pickle
+import threading
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, Optional, Tuple
+from .models import MarketData
+from .market_regime_detector import MarketRegimeDetector, RegimeSeries, average_option_price
+
+
+INDICATOR_EXTENSION = ".ind"
+INDICATOR_FORMAT_VERSION = 2  # Bump when DayIndicators' stored attributes change
+DEFAULT_MAX_DAYS = 64
+
+
+class OptionSeries:
+    """Prices of one option contract on the ticks where it was quoted"""
+    
+    __slots__ = ("tick_indices", "prices")
+    
+    def __init__(self):
+        self.tick_indices = array('l')  # Positions in DayIndicators.timestamps
+        self.prices = array('d')
+    
+    def recent(self, tick_index: int, count: int) -> List[float]:
+        """Up to count prices quoted at or before a tick"""
+        end = bisect_right(self.tick_indices, tick_index)
+        return self.prices[max(0, end - count):end].tolist()
+
+
+class RecentOptionPrices(Mapping):
+    """Read-only {"CE_580.0": [recent prices]} view of a day's option series as of a view's current tick"""
+    
+    def __init__(self, view: 'IndicatorView', count: int):
+        self.view = view
+        self.count = count
+    
+    def __getitem__(self, key: str) -> List[float]:
+        return self.view.indicators.options[key].recent(self.view.cursor, self.count)
+    
+    def __contains__(self, key) -> bool:
+        series = self.view.indicators.options.get(key)
+        return series is not None and bool(series.tick_indices) and series.tick_indices[0] <= self.view.cursor
+    
+    def __iter__(self) -> Iterator[str]:
+        return (key for key in self.view.indicators.options if key in self)
+    
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+
+class DayIndicators:
+    """
+    Tick series for one symbol and trading day, shared by every consumer.
+    
+    The series are append-only: add() stores a tick once and never changes stored
+    ticks, so any number of setups (or a day reloaded from disk) share the work.
+    There is no read position here; each consumer reads through its own
+    IndicatorView, whose cursor never runs ahead of the tick it was last given.
+    Series with record_options off keep only the spot columns, for consumers
+    that never read option prices.
+    """
+    
+    def __init__(self, symbol: str, date: str = "", record_options: bool = True):
+        self.symbol = symbol
+        self.date = date
+        self.record_options = record_options
+        self.timestamps = array('q')
+        self.spot_prices = array('d')
+        self.spot_changes = array('d')  # (spot - previous) / previous, 0.0 on the first tick or a zero previous
+        self.avg_option_prices = array('d')  # average_option_price() per tick, NaN without option quotes or recording
+        self.options: Dict[str, OptionSeries] = {}  # "CE_580.0" -> prices
+        self.stored_ticks = 0  # Ticks already written to disk
+        self._regimes: Dict[int, RegimeSeries] = {}  # lookback -> classification of the stored ticks
+    
+    def __len__(self) -> int:
+        return len(self.timestamps)
+    
+    def add(self, market_data: MarketData) -> int:
+        """Index of market_data's tick, storing it if it is newer than every stored tick"""
+        timestamps = self.timestamps
+        timestamp = market_data.timestamp
+        if timestamps and timestamp <= timestamps[-1]:
+            # Already stored: the latest tick at or before this timestamp
+            return bisect_right(timestamps, timestamp) - 1
+        
+        index = len(timestamps)
+        spot_price = market_data.spot_price
+        previous = self.spot_prices[-1] if index else 0.0
+        timestamps.append(timestamp)
+        self.spot_prices.append(spot_price)
+        self.spot_changes.append((spot_price - previous) / previous if previous != 0 else 0.0)
+        
+        option_prices = market_data.option_prices
+        if not self.record_options:
+            self.avg_option_prices.append(math.nan)
+            return index
+        
+        self.avg_option_prices.append(average_option_price(option_prices) if option_prices else math.nan)
+        for option_type, prices in option_prices.items():
+            for strike, price in prices.items():
+                key = f"{option_type}_{strike}"
+                series = self.options.get(key)
+                if series is None:
+                    series = self.options[key] = OptionSeries()
+                series.tick_indices.append(index)
+                series.prices.append(price)
+        
+        return index
+    
+    def view(self) -> 'IndicatorView':
+        """A new read position over these series"""
+        return IndicatorView(self)
+    
+    def regime_series(self, lookback_periods: int = 60) -> RegimeSeries:
+        """Regime indicators for every stored tick, classified once per lookback and tick count"""
+        series = self._regimes.get(lookback_periods)
+        if series is None or len(series) != len(self.timestamps):
+            series = MarketRegimeDetector(lookback_periods).classify_day(self.spot_prices, self.avg_option_prices)
+            self._regimes[lookback_periods] = series
+        return series
+    
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_regimes"] = {}  # Cheap to rebuild, not worth storing
+        return state
+
+
+class IndicatorView:
+    """One consumer's read position in a shared DayIndicators"""
+    
+    __slots__ = ("indicators", "cursor")
+    
+    def __init__(self, indicators: DayIndicators):
+        self.indicators = indicators
+        self.cursor = -1  # Index of the tick most recently passed to update()
+    
+    @property
+    def symbol(self) -> str:
+        return self.indicators.symbol
+    
+    def __deepcopy__(self, memo) -> 'IndicatorView':
+        # Copies of a bound setup (e.g. regime-adjusted ones) keep reading the shared series at their own cursor
+        view = IndicatorView(self.indicators)
+        view.cursor = self.cursor
+        return view
+    
+    def update(self, market_data: MarketData) -> int:
+        """Make market_data's tick current, adding it to the shared series if it is new"""
+        self.cursor = self.indicators.add(market_data)
+        return self.cursor
+    
+    def rewind(self) -> None:
+        """Move back before the first tick, e.g. to replay the day"""
+        self.cursor = -1
+    
+    def recent_spot(self, count: int) -> List[float]:
+        """Up to count spot prices ending at the current tick"""
+        end = self.cursor + 1
+        return self.indicators.spot_prices[max(0, end - count):end].tolist()
+    
+    def recent_changes(self, count: int) -> List[float]:
+        """Up to count one-tick spot changes ending at the current tick"""
+        end = self.cursor + 1
+        return self.indicators.spot_changes[max(0, end - count):end].tolist()
+    
+    def recent_option_prices(self, count: int) -> RecentOptionPrices:
+        """Mapping of option key to up to count prices ending at the current tick"""
+        return RecentOptionPrices(self, count)
+
+
+def write_day_indicators(indicator_file: str, indicators: DayIndicators) -> None:
+    """Write a day's indicators atomically"""
+    os.makedirs(os.path.dirname(indicator_file) or ".", exist_ok=True)
+    temp_file = f"{indicator_file}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temp_file, 'wb') as file:
+        pickle.dump((INDICATOR_FORMAT_VERSION, indicators), file, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temp_file, indicator_file)
+
+
+def read_day_indicators(indicator_file: str) -> Optional[DayIndicators]:
+    """Read a day's indicators; returns None if the file holds another format version or no indicators"""
+    with open(indicator_file, 'rb') as file:
+        stored = pickle.load(file)
+    if not isinstance(stored, tuple) or len(stored) != 2 or stored[0] != INDICATOR_FORMAT_VERSION:
+        return None
+    return stored[1] if isinstance(stored[1], DayIndicators) else None
+
+
+class IndicatorCache:
+    """
+    LRU of DayIndicators shared by every DataLoader in the process.
+    
+    Keys are the same (data_path, symbol, date, mtime) tuples as the shared day cache,
+    so edited source files miss naturally.
+    """
+    
+    def __init__(self, max_days: int = DEFAULT_MAX_DAYS):
+        self.max_days = max_days
+        self.hits = 0
+        self.misses = 0
+        self._entries: 'OrderedDict[Tuple, DayIndicators]' = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: Tuple) -> Optional[DayIndicators]:
+        """Return a day's indicators and mark them most recently used"""
+        with self._lock:
+            indicators = self._entries.get(key)
+            if indicators is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return indicators
+    
+    def put(self, key: Tuple, indicators: DayIndicators) -> None:
+        """Insert a day's indicators, evicting the least recently used days beyond max_days"""
+        with self._lock:
+            self._entries[key] = indicators
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_days:
+                self._entries.popitem(last=False)
+    
+    def clear(self) -> None:
+        """Drop all entries and reset the counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+    
+    def get_stats(self) -> Dict[str, int]:
+        """Get hit/miss counters and current usage"""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries),
+                    "max_days": self.max_days}
+
+
+shared_indicator_cache = IndicatorCache()
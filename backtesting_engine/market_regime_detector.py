@@ -3,9 +3,57 @@ Market regime detection system for real-time market analysis
 """
 
 import math
-from typing import Dict, List, Optional, Tuple
+from array import array
+from typing import Dict, List, Optional, Sequence, Tuple
 from collections import deque
 from .models import MarketData
+from .rolling_stats import RollingSlope, RollingLogReturns
+
+
+def average_option_price(option_prices: Dict[str, Dict[float, float]]) -> float:
+    """Average positive option price across all strikes and types, 0.0 if there are none"""
+    all_prices = [price for prices in option_prices.values() for price in prices.values() if price > 0]
+    return sum(all_prices) / len(all_prices) if all_prices else 0.0
+
+
+def divergence_score(regime1: str, trend1: float, volatility1: float,
+                     regime2: str, trend2: float, volatility2: float) -> float:
+    """Divergence of two symbols' regime states (0-1, higher = more divergent)"""
+    # Compare regime classifications
+    regime_divergence = 0.0 if regime1 == regime2 else 1.0
+    
+    # Compare trend directions
+    trend_divergence = abs(trend1 - trend2) / 2.0
+    
+    # Compare volatility levels
+    vol_divergence = abs(volatility1 - volatility2) / max(volatility1 + volatility2, 0.01)
+    
+    # Weighted average
+    total_divergence = (regime_divergence * 0.5 + trend_divergence * 0.3 + vol_divergence * 0.2)
+    
+    return min(total_divergence, 1.0)
+
+
+class RegimeSeries:
+    """Per-tick regime indicators and labels for a day, as set on MarketData by the streaming detector"""
+    
+    def __init__(self):
+        self.price_velocity = array('d')
+        self.trend_strength = array('d')
+        self.estimated_volatility = array('d')
+        self.regime_confidence = array('d')
+        self.regimes: List[str] = []
+    
+    def append(self, detector: 'MarketRegimeDetector') -> None:
+        """Record a detector's indicators after its latest update"""
+        self.price_velocity.append(detector.price_velocity)
+        self.trend_strength.append(detector.trend_strength)
+        self.estimated_volatility.append(detector.estimated_volatility)
+        self.regime_confidence.append(detector.regime_confidence)
+        self.regimes.append(detector.current_regime)
+    
+    def __len__(self) -> int:
+        return len(self.regimes)
 
 
 class MarketRegimeDetector:
@@ -18,6 +66,9 @@ class MarketRegimeDetector:
     - RANGING: Sideways/choppy price action
     - HIGH_VOL: High volatility periods
     - LOW_VOL: Low volatility periods
+    
+    Trend and volatility indicators are kept in sliding-window accumulators, so each
+    update costs the same regardless of lookback_periods.
     """
     
     def __init__(self, lookback_periods: int = 60):
@@ -29,12 +80,15 @@ class MarketRegimeDetector:
         """
         self.lookback_periods = lookback_periods
         
-        # Price history for calculations
-        self.price_history: deque = deque(maxlen=lookback_periods)
+        # Price history for calculations, with rolling log-return variance and regression sums
+        self.price_returns = RollingLogReturns(lookback_periods)
+        self.price_history: deque = self.price_returns.values
+        self.price_trend = RollingSlope(self.price_history)
         self.timestamp_history: deque = deque(maxlen=lookback_periods)
         
         # Option price history for volatility estimation
-        self.option_price_history: deque = deque(maxlen=lookback_periods)
+        self.option_returns = RollingLogReturns(lookback_periods)
+        self.option_price_history: deque = self.option_returns.values
         
         # Calculated indicators
         self.current_regime = "UNKNOWN"
@@ -60,19 +114,73 @@ class MarketRegimeDetector:
         Args:
             market_data: Current market data snapshot
         """
-        # Store price and timestamp
-        self.price_history.append(market_data.spot_price)
+        # Store timestamp
         self.timestamp_history.append(market_data.timestamp)
         
+        # Calculate average option price change for volatility estimation
+        avg_option_price = average_option_price(market_data.option_prices) if market_data.option_prices else None
+        
+        if not self._update_indicators(market_data.spot_price, avg_option_price):
+            return
+        
+        # Update time-of-day effects
+        self._update_time_effects(market_data.timestamp)
+        
+        # Update market data with calculated indicators
+        market_data.price_velocity = self.price_velocity
+        market_data.estimated_volatility = self.estimated_volatility
+        market_data.trend_strength = self.trend_strength
+        market_data.regime_classification = self.current_regime
+    
+    def classify_day(self, spot_prices: Sequence[float],
+                     avg_option_prices: Optional[Sequence[Optional[float]]] = None) -> RegimeSeries:
+        """
+        Classify a whole series of ticks at once
+        
+        Runs a fresh detector with this detector's lookback over the series, so this
+        detector's own state is untouched. Each tick's values match what the streaming
+        path would set on that tick's MarketData, starting from an empty history.
+        
+        Args:
+            spot_prices: Spot price per tick
+            avg_option_prices: average_option_price() of each tick's option chain, with
+                None or NaN for ticks without option quotes; omit to use spot prices only
+            
+        Returns:
+            RegimeSeries with one entry per tick
+        """
+        detector = MarketRegimeDetector(self.lookback_periods)
+        series = RegimeSeries()
+        for index, spot_price in enumerate(spot_prices):
+            avg_option_price = avg_option_prices[index] if avg_option_prices is not None else None
+            if avg_option_price is not None and math.isnan(avg_option_price):
+                avg_option_price = None
+            detector._update_indicators(spot_price, avg_option_price)
+            series.append(detector)
+        return series
+    
+    def _update_indicators(self, spot_price: float, avg_option_price: Optional[float]) -> bool:
+        """
+        Add one tick to the rolling windows and reclassify
+        
+        Args:
+            spot_price: Current spot price
+            avg_option_price: Average option price, or None without option quotes
+            
+        Returns:
+            True if indicators were recalculated (at least 2 prices seen)
+        """
+        # Store price
+        evicted_price = self.price_returns.push(spot_price)
+        self.price_trend.update(spot_price, evicted_price)
+        
         # Store option prices for volatility estimation
-        if market_data.option_prices:
-            # Calculate average option price change for volatility estimation
-            avg_option_price = self._calculate_average_option_price(market_data.option_prices)
-            self.option_price_history.append(avg_option_price)
+        if avg_option_price is not None:
+            self.option_returns.push(avg_option_price)
         
         # Need at least 2 data points for calculations
         if len(self.price_history) < 2:
-            return
+            return False
         
         # Calculate all indicators
         self.price_velocity = self._calculate_price_velocity()
@@ -87,14 +195,7 @@ class MarketRegimeDetector:
         if self.current_regime != self.previous_regime and self.previous_regime != "UNKNOWN":
             self.regime_change_count += 1
         
-        # Update time-of-day effects
-        self._update_time_effects(market_data.timestamp)
-        
-        # Update market data with calculated indicators
-        market_data.price_velocity = self.price_velocity
-        market_data.estimated_volatility = self.estimated_volatility
-        market_data.trend_strength = self.trend_strength
-        market_data.regime_classification = self.current_regime
+        return True
     
     def get_current_regime(self) -> str:
         """Get current market regime classification"""
@@ -155,20 +256,9 @@ class MarketRegimeDetector:
         if not other_detector or len(other_detector.price_history) < 2:
             return 0.0
         
-        # Compare regime classifications
-        regime_divergence = 0.0 if self.current_regime == other_detector.current_regime else 1.0
-        
-        # Compare trend directions
-        trend_divergence = abs(self.trend_strength - other_detector.trend_strength) / 2.0
-        
-        # Compare volatility levels
-        vol_divergence = abs(self.estimated_volatility - other_detector.estimated_volatility) / max(
-            self.estimated_volatility + other_detector.estimated_volatility, 0.01)
-        
-        # Weighted average
-        total_divergence = (regime_divergence * 0.5 + trend_divergence * 0.3 + vol_divergence * 0.2)
-        
-        return min(total_divergence, 1.0)
+        return divergence_score(self.current_regime, self.trend_strength, self.estimated_volatility,
+                                other_detector.current_regime, other_detector.trend_strength,
+                                other_detector.estimated_volatility)
     
     def _calculate_price_velocity(self) -> float:
         """Calculate price velocity (rate of change per period)"""
@@ -192,19 +282,10 @@ class MarketRegimeDetector:
             return 0.0
         
         # Use linear regression slope over lookback period
-        prices = list(self.price_history)
-        n = len(prices)
-        
-        # Calculate slope using least squares
-        x_sum = sum(range(n))
-        y_sum = sum(prices)
-        xy_sum = sum(i * prices[i] for i in range(n))
-        x2_sum = sum(i * i for i in range(n))
-        
-        slope = (n * xy_sum - x_sum * y_sum) / (n * x2_sum - x_sum * x_sum)
+        slope = self.price_trend.slope()
         
         # Normalize slope relative to price level
-        avg_price = y_sum / n
+        avg_price = self.price_trend.mean()
         normalized_slope = slope / avg_price if avg_price > 0 else 0.0
         
         # Scale to -1 to 1 range
@@ -216,19 +297,11 @@ class MarketRegimeDetector:
             return 0.0
         
         # Calculate realized volatility from price changes
-        price_returns = []
-        for i in range(1, len(self.price_history)):
-            if self.price_history[i-1] > 0:
-                ret = math.log(self.price_history[i] / self.price_history[i-1])
-                price_returns.append(ret)
-        
-        if not price_returns:
+        if not self.price_returns.stats.count:
             return 0.0
         
-        # Calculate standard deviation of returns
-        mean_return = sum(price_returns) / len(price_returns)
-        variance = sum((ret - mean_return) ** 2 for ret in price_returns) / len(price_returns)
-        volatility = math.sqrt(variance)
+        # Standard deviation of returns
+        volatility = self.price_returns.std()
         
         # Annualize (assuming 252 trading days, 78 5-second periods per day)
         annualized_vol = volatility * math.sqrt(252 * 78)
@@ -247,18 +320,10 @@ class MarketRegimeDetector:
             return 0.0
         
         # Calculate volatility of option price changes as proxy for IV
-        option_returns = []
-        for i in range(1, len(self.option_price_history)):
-            if self.option_price_history[i-1] > 0:
-                ret = math.log(self.option_price_history[i] / self.option_price_history[i-1])
-                option_returns.append(ret)
-        
-        if not option_returns:
+        if not self.option_returns.stats.count:
             return 0.0
         
-        mean_return = sum(option_returns) / len(option_returns)
-        variance = sum((ret - mean_return) ** 2 for ret in option_returns) / len(option_returns)
-        option_vol = math.sqrt(variance)
+        option_vol = self.option_returns.std()
         
         # Convert to annualized estimate (rough approximation)
         # Option prices are more sensitive to volatility, so scale down
@@ -266,14 +331,7 @@ class MarketRegimeDetector:
     
     def _calculate_average_option_price(self, option_prices: Dict[str, Dict[float, float]]) -> float:
         """Calculate average option price across all strikes and types"""
-        all_prices = []
-        
-        for option_type in option_prices:
-            for strike, price in option_prices[option_type].items():
-                if price > 0:
-                    all_prices.append(price)
-        
-        return sum(all_prices) / len(all_prices) if all_prices else 0.0
+        return average_option_price(option_prices)
     
     def _classify_market_regime(self) -> Tuple[str, float]:
         """
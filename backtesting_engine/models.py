@@ -3,7 +3,7 @@ Core data models for the options backtesting engine
 """
 
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional
+from typing import Dict, List, NamedTuple, Optional
 from abc import ABC, abstractmethod
 
 
@@ -23,7 +23,7 @@ class MultiSymbolTradingData:
     date: str
     symbol: str  # "QQQ", "SPY", "QQQ 1DTE", "SPY 1DTE"
     spot_data: Dict[int, float]  # timestamp -> spot_price
-    option_data: Dict[int, Dict[str, Dict[float, float]]]  # timestamp -> {CE/PE -> {strike -> price}}
+    option_data: Dict[int, Dict[str, Dict[float, float]]]  # timestamp -> {CE/PE -> {strike -> price}}, ColumnarOptionData when loaded from disk
     job_end_idx: int  # from .prop file - last valid timeindex for the day
     metadata: Dict  # other data from .prop file
     
@@ -33,6 +33,16 @@ class MultiSymbolTradingData:
     regime_indicators: Dict[str, float] = field(default_factory=dict)
 
 
+@dataclass
+class MarketTick:
+    """One timestamp of a trading day as yielded by the streaming DataLoader API"""
+    timestamp: int
+    symbol: str
+    spot_price: float
+    option_prices: Dict[str, Dict[float, float]]  # {CE/PE -> {strike -> price}}
+    job_end_idx: int  # last valid timeindex for the day
+
+
 @dataclass
 class MarketData:
     """Market data at a specific timestamp with regime indicators"""
@@ -49,7 +59,47 @@ class MarketData:
     regime_classification: str = "UNKNOWN"  # TRENDING_UP, TRENDING_DOWN, RANGING, HIGH_VOL, LOW_VOL
 
 
-@dataclass
+class MarketSnapshot(MarketData):
+    """
+    MarketData that the engine loop updates in place once per tick instead of
+    allocating a new object. Holders must not keep a reference past the tick;
+    the snapshot is overwritten by the next update().
+    """
+    
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+        self.update(0, 0.0, {}, [])
+    
+    def update(self, timestamp: int, spot_price: float, option_prices: Dict[str, Dict[float, float]],
+               available_strikes: List[float]) -> 'MarketSnapshot':
+        """Point the snapshot at a new tick and reset the regime indicators"""
+        self.timestamp = timestamp
+        self.spot_price = spot_price
+        self.option_prices = option_prices
+        self.available_strikes = available_strikes
+        self.price_velocity = 0.0
+        self.estimated_volatility = 0.0
+        self.trend_strength = 0.0
+        self.regime_classification = "UNKNOWN"
+        return self
+
+
+class PositionLeg(NamedTuple):
+    """
+    One pre-parsed leg of a position, built once by PositionManager.add_position.
+    
+    Leg P&L is ((exit_price + exit_slippage) - entry_price) * signed_quantity * lot_size,
+    which equals the long/short formulas with slippage applied on both sides.
+    """
+    option_key: str  # Original entry_prices key, kept for Trade reporting
+    option_type: Optional[str]  # "CE"/"PE"; None if the key could not be parsed
+    strike: float
+    signed_quantity: int  # Negative for short legs
+    entry_price: float  # Entry price with slippage folded in
+    exit_slippage: float  # Added to the market price on exit (+slippage short, -slippage long)
+
+
+@dataclass(slots=True)
 class Position:
     """Represents a single options position (e.g., short straddle, iron condor, butterfly)"""
     setup_id: str
@@ -82,9 +132,12 @@ class Position:
     unlimited_risk: bool = False  # True for positions with unlimited risk (e.g., ratio spreads)
     requires_coordination: bool = False  # True if all legs must be closed together
     partial_closure_allowed: bool = True  # False if position cannot be partially closed
+    
+    # Pre-parsed legs in entry_prices order, built by PositionManager
+    legs: Optional[List[PositionLeg]] = field(default=None, repr=False, compare=False)
 
 
-@dataclass
+@dataclass(slots=True)
 class Trade:
     """Completed trade record"""
     setup_id: str
@@ -167,6 +220,8 @@ class SymbolResults:
     total_trades: int
     win_rate: float
     correlation_with_other_symbols: Dict[str, float]
+    max_drawdown: float = 0.0  # Of cumulative closed-trade P&L
+    mtm_max_drawdown: float = 0.0  # Of realized plus open P&L per tick, if tracked
 
 
 @dataclass
@@ -183,14 +238,17 @@ class BacktestResults:
     """Complete backtesting results"""
     total_pnl: float
     daily_results: List[DailyResults]
-    trade_log: List[Trade]
+    trade_log: 'TradeLog'  # Columnar; indexing and iteration build Trade objects
     setup_performance: Dict[str, 'SetupResults']
     symbol_performance: Dict[str, SymbolResults] = field(default_factory=dict)
     regime_performance: Dict[str, RegimeResults] = field(default_factory=dict)
     dynamic_adjustment_performance: Optional[DynamicAdjustmentResults] = None
     win_rate: float = 0.0
     max_drawdown: float = 0.0
+    mtm_max_drawdown: float = 0.0  # Of realized plus open P&L per tick, if tracked
     total_trades: int = 0
+    trade_stats: Optional['TradeAggregator'] = None  # Grouped P&L statistics, built as trades close
+    intraday_equity: Optional['EquityRecorder'] = None  # Tick-level equity per symbol, if recorded
 
 
 @dataclass
@@ -205,6 +263,7 @@ class SetupResults:
     max_drawdown: float
     regime_performance: Dict[str, float] = field(default_factory=dict)
     symbol_performance: Dict[str, float] = field(default_factory=dict)
+    mtm_max_drawdown: float = 0.0  # Of realized plus open P&L per tick, if tracked
 
 
 class TradingSetup(ABC):
@@ -222,6 +281,25 @@ class TradingSetup(ABC):
         self.strike_selection = strike_selection
         self.scalping_price = scalping_price
         self.strikes_away = strikes_away
+        self.indicators = None  # IndicatorView over series shared with other setups on the same symbol and day
+        self.indicators_bound = False  # Whether self.indicators came from bind_indicators rather than a private series
+    
+    def bind_indicators(self, indicators) -> None:
+        """
+        Keep history in a symbol's shared DayIndicators, read through this setup's own view.
+        
+        The binding survives reset_daily_state, which only rewinds the view; bind the
+        next day's indicators before feeding that day's ticks.
+        """
+        self.indicators = indicators.view()
+        self.indicators_bound = True
+    
+    def _reset_indicators(self) -> None:
+        """Rewind a bound view for the next binding or a replay, and drop a private series"""
+        if self.indicators_bound:
+            self.indicators.rewind()
+        else:
+            self.indicators = None
     
     @abstractmethod
     def check_entry_condition(self, current_timeindex: int) -> bool:
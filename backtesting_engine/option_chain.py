@@ -2,10 +2,311 @@
 Efficient option chain data structures and utilities
 """
 
-from typing import Dict, List, Optional, Tuple
+from array import array
+from collections.abc import Mapping
+from typing import Dict, Iterable, List, Optional, Tuple
 from .models import MarketData
 
 
+NAN = float("nan")
+
+
+def _as_array(values) -> array:
+    """Copy a typed memoryview into an array; arrays are returned unchanged"""
+    if isinstance(values, array):
+        return values
+    copied = array(values.format)
+    copied.frombytes(values.cast('B'))
+    return copied
+
+
+class StrikePriceView(Mapping):
+    """Read-only {strike -> price} view over one row of a columnar price matrix"""
+    
+    __slots__ = ("_prices", "_offset", "_strikes", "_strike_index")
+    
+    def __init__(self, prices: array, offset: int, strikes: array, strike_index: Dict[float, int]):
+        self._prices = prices
+        self._offset = offset
+        self._strikes = strikes
+        self._strike_index = strike_index
+    
+    def __getitem__(self, strike: float) -> float:
+        col = self._strike_index.get(strike)
+        if col is None:
+            raise KeyError(strike)
+        price = self._prices[self._offset + col]
+        if price != price:  # NaN marks a missing quote
+            raise KeyError(strike)
+        return price
+    
+    def __contains__(self, strike) -> bool:
+        col = self._strike_index.get(strike)
+        if col is None:
+            return False
+        price = self._prices[self._offset + col]
+        return price == price
+    
+    def __iter__(self):
+        prices = self._prices
+        offset = self._offset
+        for col, strike in enumerate(self._strikes):
+            price = prices[offset + col]
+            if price == price:
+                yield strike
+    
+    def __len__(self) -> int:
+        prices = self._prices
+        offset = self._offset
+        return sum(1 for col in range(len(self._strikes)) if prices[offset + col] == prices[offset + col])
+    
+    def copy(self) -> Dict[float, float]:
+        """Materialize the view as a plain dict"""
+        return dict(self.items())
+
+
+class OptionChainSnapshot(Mapping):
+    """Read-only {CE/PE -> {strike -> price}} view of a single timestamp in ColumnarOptionData"""
+    
+    __slots__ = ("_chain", "_row")
+    
+    def __init__(self, chain: 'ColumnarOptionData', row: int):
+        self._chain = chain
+        self._row = row
+    
+    def __getitem__(self, option_type: str) -> StrikePriceView:
+        chain = self._chain
+        code = chain.type_codes.get(option_type)
+        if code is None or not (chain.type_mask[self._row] >> code) & 1:
+            raise KeyError(option_type)
+        return StrikePriceView(chain.prices[option_type], self._row * len(chain.strikes),
+                               chain.strikes, chain.strike_index)
+    
+    def __contains__(self, option_type) -> bool:
+        chain = self._chain
+        code = chain.type_codes.get(option_type)
+        return code is not None and bool((chain.type_mask[self._row] >> code) & 1)
+    
+    def __iter__(self):
+        mask = self._chain.type_mask[self._row]
+        for code, option_type in enumerate(self._chain.option_types):
+            if (mask >> code) & 1:
+                yield option_type
+    
+    def __len__(self) -> int:
+        return bin(self._chain.type_mask[self._row]).count("1")
+    
+    @property
+    def row(self) -> int:
+        """Row of this snapshot in the underlying price matrices"""
+        return self._row
+    
+    @property
+    def chain(self) -> 'ColumnarOptionData':
+        """Day chain this snapshot reads from"""
+        return self._chain
+    
+    @property
+    def available_strikes(self) -> List[float]:
+        """Sorted strikes quoted at this timestamp, shared with other rows quoting the same set"""
+        return self._chain.get_row_strikes()[self._row]
+    
+    def copy(self) -> Dict[str, Dict[float, float]]:
+        """Materialize the snapshot as nested plain dicts"""
+        return {option_type: strikes.copy() for option_type, strikes in self.items()}
+
+
+class ColumnarOptionData(Mapping):
+    """
+    Columnar option chain for one trading day.
+    
+    Quotes are stored as a sorted timestamp axis, a sorted strike axis and one dense
+    price matrix per option type (row-major, NaN for a missing quote), so a lookup is
+    two dict probes and an array index. The object is also a read-only
+    {timestamp -> {CE/PE -> {strike -> price}}} mapping for code written against the
+    nested-dict layout.
+    """
+    
+    def __init__(self, timestamps: array, strikes: array, prices: Dict[str, array], type_mask: array):
+        self.timestamps = timestamps  # array('q'), sorted
+        self.strikes = strikes  # array('d'), sorted
+        self.prices = prices  # option_type -> array('d') of len(timestamps) * len(strikes)
+        self.type_mask = type_mask  # array('B'), bit per option type quoted in the row
+        self.option_types: List[str] = list(prices.keys())
+        self.type_codes: Dict[str, int] = {option_type: code for code, option_type in enumerate(self.option_types)}
+        self.row_index: Dict[int, int] = {timestamp: row for row, timestamp in enumerate(timestamps)}
+        self.strike_index: Dict[float, int] = {strike: col for col, strike in enumerate(strikes)}
+        self._row_strikes: Optional[List[List[float]]] = None
+    
+    @classmethod
+    def from_quotes(cls, timestamps: Iterable[int], option_types: Iterable[str],
+                    strikes: Iterable[float], prices: Iterable[float]) -> 'ColumnarOptionData':
+        """Build from parallel quote columns; a repeated (timestamp, type, strike) keeps the last price"""
+        timestamps = array('q', timestamps)
+        strikes = array('d', strikes)
+        prices = array('d', prices)
+        option_types = list(option_types)
+        
+        timestamp_axis = array('q', sorted(set(timestamps)))
+        strike_axis = array('d', sorted(set(strikes)))
+        row_index = {timestamp: row for row, timestamp in enumerate(timestamp_axis)}
+        strike_index = {strike: col for col, strike in enumerate(strike_axis)}
+        num_strikes = len(strike_axis)
+        matrix_size = len(timestamp_axis) * num_strikes
+        
+        type_codes: Dict[str, int] = {}
+        matrices: Dict[str, array] = {}
+        type_mask = array('B', bytes(len(timestamp_axis)))
+        
+        for i in range(len(prices)):
+            option_type = option_types[i]
+            code = type_codes.get(option_type)
+            if code is None:
+                code = type_codes[option_type] = len(type_codes)
+                matrices[option_type] = array('d', [NAN]) * matrix_size
+            row = row_index[timestamps[i]]
+            matrices[option_type][row * num_strikes + strike_index[strikes[i]]] = prices[i]
+            type_mask[row] |= 1 << code
+        
+        return cls(timestamp_axis, strike_axis, matrices, type_mask)
+    
+    @classmethod
+    def from_nested(cls, option_data: Dict[int, Dict[str, Dict[float, float]]]) -> 'ColumnarOptionData':
+        """Build from the nested {timestamp -> {CE/PE -> {strike -> price}}} layout"""
+        timestamps, option_types, strikes, prices = [], [], [], []
+        for timestamp, chain in option_data.items():
+            for option_type, strike_prices in chain.items():
+                for strike, price in strike_prices.items():
+                    timestamps.append(timestamp)
+                    option_types.append(option_type)
+                    strikes.append(strike)
+                    prices.append(price)
+        return cls.from_quotes(timestamps, option_types, strikes, prices)
+    
+    def __getitem__(self, timestamp: int) -> OptionChainSnapshot:
+        row = self.row_index.get(timestamp)
+        if row is None or not self.type_mask[row]:
+            raise KeyError(timestamp)
+        return OptionChainSnapshot(self, row)
+    
+    def __contains__(self, timestamp) -> bool:
+        row = self.row_index.get(timestamp)
+        return row is not None and self.type_mask[row] != 0
+    
+    def __iter__(self):
+        return iter(self.timestamps)
+    
+    def __len__(self) -> int:
+        return len(self.timestamps)
+    
+    def row_of(self, timestamp: int) -> Optional[int]:
+        """Row index for a timestamp, or None if the day has no quotes at that time"""
+        return self.row_index.get(timestamp)
+    
+    def column_of(self, strike: float) -> Optional[int]:
+        """Column index for a strike, or None if the strike never traded"""
+        return self.strike_index.get(strike)
+    
+    def get_price(self, timestamp: int, option_type: str, strike: float) -> Optional[float]:
+        """O(1) price lookup; None if the quote is missing"""
+        row = self.row_index.get(timestamp)
+        col = self.strike_index.get(strike)
+        matrix = self.prices.get(option_type)
+        if row is None or col is None or matrix is None:
+            return None
+        price = matrix[row * len(self.strikes) + col]
+        return price if price == price else None
+    
+    def strikes_at(self, timestamp: int) -> List[float]:
+        """Sorted strikes quoted for any option type at a timestamp"""
+        row = self.row_index.get(timestamp)
+        if row is None:
+            return []
+        offset = row * len(self.strikes)
+        matrices = list(self.prices.values())
+        return [strike for col, strike in enumerate(self.strikes)
+                if any(matrix[offset + col] == matrix[offset + col] for matrix in matrices)]
+    
+    def get_row_strikes(self) -> List[List[float]]:
+        """
+        Per-row strike index: the sorted strikes quoted at each row, built once per day.
+        
+        Rows quoting the same strike set share one list, so the index costs one list
+        per distinct strike set rather than one per timestamp. The lists are shared
+        and must be treated as read-only.
+        """
+        if self._row_strikes is None:
+            num_strikes = len(self.strikes)
+            matrices = list(self.prices.values())
+            interned: Dict[Tuple[int, ...], List[float]] = {}
+            row_strikes = []
+            
+            for offset in range(0, len(self.timestamps) * num_strikes, num_strikes):
+                columns = tuple(col for col in range(num_strikes)
+                                if any(matrix[offset + col] == matrix[offset + col] for matrix in matrices))
+                strikes = interned.get(columns)
+                if strikes is None:
+                    strikes = interned[columns] = [self.strikes[col] for col in columns]
+                row_strikes.append(strikes)
+            
+            self._row_strikes = row_strikes
+        return self._row_strikes
+    
+    def __getstate__(self) -> Dict:
+        # Columns may be memoryviews over a memory-mapped cache file; pickle them as arrays
+        state = self.__dict__.copy()
+        for name in ("timestamps", "strikes", "type_mask"):
+            state[name] = _as_array(state[name])
+        state["prices"] = {option_type: _as_array(matrix) for option_type, matrix in self.prices.items()}
+        return state
+    
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the column arrays"""
+        total = self.timestamps.itemsize * len(self.timestamps)
+        total += self.strikes.itemsize * len(self.strikes)
+        total += self.type_mask.itemsize * len(self.type_mask)
+        for matrix in self.prices.values():
+            total += matrix.itemsize * len(matrix)
+        return total
+    
+    def to_dict(self) -> Dict[int, Dict[str, Dict[float, float]]]:
+        """Materialize the nested-dict layout"""
+        return {timestamp: self[timestamp].copy() for timestamp in self.timestamps if timestamp in self}
+
+
+class StrikeIndex:
+    """
+    Strike list lookup for the engine loop over one symbol-day.
+    
+    Columnar snapshots use the day's precomputed per-row index; nested-dict chains
+    (streamed from CSV) reuse the previous list while the quoted strikes are unchanged,
+    which is almost every timestamp.
+    """
+    
+    def __init__(self):
+        self._last_keys: Dict[str, Iterable[float]] = {}
+        self._last_strikes: List[float] = []
+    
+    def strikes_for(self, option_prices: Dict[str, Dict[float, float]]) -> List[float]:
+        """Sorted strikes quoted for any option type; the returned list is shared and read-only"""
+        if isinstance(option_prices, OptionChainSnapshot):
+            return option_prices.available_strikes
+        
+        last_keys = self._last_keys
+        if len(last_keys) == len(option_prices):
+            for option_type, strikes in last_keys.items():
+                strike_prices = option_prices.get(option_type)
+                if strike_prices is None or strike_prices.keys() != strikes:
+                    break
+            else:
+                return self._last_strikes
+        
+        self._last_keys = {option_type: strike_prices.keys() for option_type, strike_prices in option_prices.items()}
+        self._last_strikes = sorted(set().union(*self._last_keys.values()))
+        return self._last_strikes
+
+
 class OptionChainManager:
     """Manages option chain data with efficient lookups and strike selection"""
     
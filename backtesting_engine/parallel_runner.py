@@ -0,0 +1,182 @@
+"""
+Process-pool backtest runner that shards trading days across CPU cores
+"""
+
+import os
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+from .models import TradingSetup, BacktestResults
+from .backtest_engine import BacktestEngine
+from .trade_log import TradeLog
+from .equity_recorder import EquityRecorder
+from .event_log import EventRecorder, VERBOSITY_SILENT, VERBOSITY_SUMMARY
+
+
+def _run_day_shard(data_path: str, setups: List[TradingSetup], engine_kwargs: Dict,
+                   symbols: List[str], dates: List[str], multi_symbol: bool, event_level: int) -> Dict:
+    """Worker entry point: run a contiguous block of days in a fresh engine"""
+    recorder = engine_kwargs.get("equity_recorder")
+    if recorder is not None:
+        # Each shard records from zero into its own recorder; the merge shifts and appends it
+        engine_kwargs = dict(engine_kwargs, equity_recorder=EquityRecorder(recorder.every_n_ticks, recorder.mode,
+                                                                           recorder.capacity))
+    # Workers stay silent and keep their events for the parent to replay in date order
+    engine = BacktestEngine(data_path, setups, **dict(engine_kwargs, verbosity=VERBOSITY_SILENT, event_sink=None))
+    engine.event_log = EventRecorder(event_level)
+    if engine.dynamic_setup_manager is not None:
+        engine.dynamic_setup_manager.event_log = engine.event_log
+    if multi_symbol:
+        engine._initialize_symbol_components(symbols)
+    
+    for date in dates:
+        day_label = "multi-symbol day " if multi_symbol else ""
+        engine.event_log.event(VERBOSITY_SUMMARY, "day_started", f"\nProcessing {day_label}{date}...", date=date)
+        if multi_symbol:
+            daily_result = engine._process_multi_symbol_trading_day(symbols, date)
+        else:
+            daily_result = engine.process_trading_day(symbols[0], date)
+        if daily_result:
+            engine.daily_results.append(daily_result)
+    
+    return {
+        "events": engine.event_log,
+        "daily_results": engine.daily_results,
+        "trades": engine.all_trades,
+        "trade_stats": engine.trade_stats,
+        "equity_recorder": engine.equity_recorder,
+        "symbol_performance": engine.symbol_performance,
+        "correlation_matrix": engine.correlation_matrix,
+        "correlation_history": engine.correlation_history,
+        "market_regime_detector": engine.market_regime_detector,
+        "dynamic_setup_manager": engine.dynamic_setup_manager,
+        "symbol_regime_detectors": engine.symbol_regime_detectors,
+        "symbol_setup_managers": engine.symbol_setup_managers
+    }
+
+
+class ParallelBacktestRunner:
+    """
+    Run a backtest with trading days split across worker processes.
+    
+    Positions, risk limits and daily setup state are reset at every day boundary,
+    so the date range is cut into contiguous shards, one per worker, each run by a
+    fresh BacktestEngine. Shard results are merged back in date order, so the
+    output does not depend on which worker finishes first. Workers print nothing;
+    their events are replayed through the runner's verbosity and sink in date order.
+    Only the regime detectors carry state across days; they start cold at each
+    shard boundary, so dynamic management over more than one shard warns. With
+    dynamic management disabled the results match a sequential run exactly.
+    """
+    
+    def __init__(self, data_path: str, setups: List[TradingSetup], max_workers: Optional[int] = None,
+                 **engine_kwargs):
+        """
+        Initialize the runner
+        
+        Args:
+            data_path: Root of the 5SecData directory
+            setups: Trading setups, pickled to each worker
+            max_workers: Worker processes (defaults to the CPU count)
+            **engine_kwargs: Passed through to every BacktestEngine
+        """
+        self.data_path = data_path
+        self.setups = setups
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.engine_kwargs = engine_kwargs
+    
+    def run_backtest(self, symbols, start_date: str, end_date: str) -> BacktestResults:
+        """Run the backtest in parallel and return merged results"""
+        if isinstance(symbols, str):
+            symbols = [symbols]  # Support single symbol as string
+        
+        engine = BacktestEngine(self.data_path, self.setups, **self.engine_kwargs)
+        multi_symbol = engine.enable_multi_symbol and len(symbols) > 1
+        
+        if multi_symbol:
+            engine._initialize_symbol_components(symbols)
+            dates = engine._get_common_dates(symbols, start_date, end_date)
+        else:
+            symbols = symbols[:1]
+            dates = [date for date in engine.data_loader.get_available_dates(symbols[0])
+                     if start_date <= date <= end_date]
+        
+        shards = self._shard_dates(dates)
+        if engine.enable_dynamic_management and len(shards) > 1:
+            warnings.warn(f"Dynamic management restarts the regime detectors at each of {len(shards)} shards, "
+                          "so results differ from a sequential run; pass enable_dynamic_management=False "
+                          "or max_workers=1 to match it", RuntimeWarning, stacklevel=2)
+        engine.event_log.event(VERBOSITY_SUMMARY, "backtest_started",
+                               f"Running parallel backtest for {symbols}: {len(dates)} days in {len(shards)} shards",
+                               symbols=symbols, start_date=start_date, end_date=end_date, dates=dates,
+                               shards=len(shards))
+        
+        event_log = engine.event_log
+        event_level = max(event_log.verbosity,
+                          event_log.sink_verbosity if event_log.sink is not None else VERBOSITY_SILENT)
+        shard_args = [(self.data_path, self.setups, self.engine_kwargs, symbols, shard, multi_symbol, event_level)
+                      for shard in shards]
+        
+        if len(shards) <= 1:
+            shard_results = [_run_day_shard(*args) for args in shard_args]
+        else:
+            with ProcessPoolExecutor(max_workers=len(shards)) as executor:
+                # map yields in submission order, which keeps the merge deterministic
+                shard_results = list(executor.map(_run_day_shard, *zip(*shard_args)))
+        
+        for shard_result in shard_results:
+            self._merge_shard(engine, shard_result)
+        
+        engine.event_log.flush()
+        return engine._generate_final_results()
+    
+    def _shard_dates(self, dates: List[str]) -> List[List[str]]:
+        """Split dates into at most max_workers contiguous, near-equal blocks"""
+        shard_count = min(self.max_workers, len(dates))
+        if shard_count == 0:
+            return []
+        
+        base_size, remainder = divmod(len(dates), shard_count)
+        shards = []
+        start = 0
+        for index in range(shard_count):
+            end = start + base_size + (1 if index < remainder else 0)
+            shards.append(dates[start:end])
+            start = end
+        
+        return shards
+    
+    def _merge_shard(self, engine: BacktestEngine, shard_result: Dict) -> None:
+        """Append one shard's results to the engine that produces the final report"""
+        shard_result["events"].replay(engine.event_log)
+        engine.daily_results.extend(shard_result["daily_results"])
+        engine.cumulative_pnl += sum(daily.daily_pnl for daily in shard_result["daily_results"])
+        engine.trade_stats.extend_mtm(shard_result["trade_stats"])
+        if engine.equity_recorder is not None:
+            # Shard equity starts at zero; shift it by the closed P&L of earlier shards
+            per_symbol = bool(engine.symbol_position_managers)
+            offsets = {symbol: engine.trade_stats.stats(symbol=symbol if per_symbol else None).total_pnl
+                       for symbol in shard_result["equity_recorder"].series}
+            engine.equity_recorder.extend(shard_result["equity_recorder"], offsets)
+        for trade, (regime, date) in zip(shard_result["trades"], shard_result["trade_stats"].trade_tags):
+            engine.all_trades.append(trade)
+            engine.trade_stats.add(trade, regime, date)
+        
+        for symbol, performance in shard_result["symbol_performance"].items():
+            target = engine.symbol_performance.setdefault(
+                symbol, {'trades': TradeLog(), 'daily_pnls': [], 'regime_performance': {}})
+            target['trades'].extend(performance['trades'])
+            target['daily_pnls'].extend(performance['daily_pnls'])
+        
+        for pair_key, history in shard_result["correlation_history"].items():
+            engine.correlation_history.setdefault(pair_key, []).extend(history)
+        if shard_result["correlation_matrix"]:
+            engine.correlation_matrix = shard_result["correlation_matrix"]
+        
+        if engine.enable_dynamic_management:
+            # Statistics accumulate; regime state is taken from the latest shard
+            engine.market_regime_detector = shard_result["market_regime_detector"]
+            engine.dynamic_setup_manager.merge_statistics(shard_result["dynamic_setup_manager"])
+            engine.symbol_regime_detectors.update(shard_result["symbol_regime_detectors"])
+            for symbol, setup_manager in shard_result["symbol_setup_managers"].items():
+                engine.symbol_setup_managers[symbol].merge_statistics(setup_manager)
@@ -0,0 +1,408 @@
+"""
+Parallel parameter sweeps over a trading setup class
+"""
+
+import os
+import csv
+import io
+import itertools
+import contextlib
+from bisect import bisect_left
+from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple, Type
+from .models import TradingSetup, BacktestResults, MarketData
+from .data_loader import DataLoader
+from .backtest_engine import BacktestEngine
+from .event_log import VERBOSITY_SILENT
+from .position_manager import PositionManager
+from .strategies import StraddleSetup
+
+
+def calculate_sharpe_ratio(results: BacktestResults) -> float:
+    """Calculate Sharpe ratio for backtest results"""
+    if not results.daily_results or len(results.daily_results) < 2:
+        return 0.0
+    
+    return _sharpe_ratio([day.daily_pnl for day in results.daily_results])
+
+
+def calculate_profit_factor(results: BacktestResults) -> float:
+    """Calculate profit factor (gross profit / gross loss)"""
+    if not results.trade_log:
+        return 0.0
+    
+    return _profit_factor([trade.pnl for trade in results.trade_log])
+
+
+def _sharpe_ratio(daily_returns: List[float]) -> float:
+    """Mean over sample standard deviation of daily P&L"""
+    if len(daily_returns) < 2:
+        return 0.0
+    
+    mean_return = sum(daily_returns) / len(daily_returns)
+    variance = sum((r - mean_return) ** 2 for r in daily_returns) / (len(daily_returns) - 1)
+    std_dev = variance ** 0.5
+    
+    return mean_return / std_dev if std_dev > 0 else 0.0
+
+
+def _profit_factor(trade_pnls: List[float]) -> float:
+    """Gross profit over gross loss of trade P&Ls"""
+    if not trade_pnls:
+        return 0.0
+    
+    gross_profit = sum(pnl for pnl in trade_pnls if pnl > 0)
+    gross_loss = abs(sum(pnl for pnl in trade_pnls if pnl < 0))
+    
+    return gross_profit / gross_loss if gross_loss > 0 else float('inf')
+
+
+def _max_drawdown(trade_pnls: List[float]) -> float:
+    """Largest peak-to-trough fall of cumulative trade P&L"""
+    cumulative_pnl = 0.0
+    peak = 0.0
+    max_drawdown = 0.0
+    
+    for pnl in trade_pnls:
+        cumulative_pnl += pnl
+        if cumulative_pnl > peak:
+            peak = cumulative_pnl
+        
+        drawdown = peak - cumulative_pnl
+        if drawdown > max_drawdown:
+            max_drawdown = drawdown
+    
+    return max_drawdown
+
+
+@dataclass
+class SweepResult:
+    """Metrics for one parameter combination"""
+    parameters: Dict[str, Any]
+    total_pnl: float
+    total_trades: int
+    win_rate: float
+    max_drawdown: float
+    sharpe_ratio: float
+    profit_factor: float
+    
+    def to_row(self) -> Dict[str, Any]:
+        """Flatten parameters and metrics into one table row"""
+        row = dict(self.parameters)
+        row.update({
+            'total_pnl': self.total_pnl,
+            'total_trades': self.total_trades,
+            'win_rate': self.win_rate,
+            'max_drawdown': self.max_drawdown,
+            'sharpe_ratio': self.sharpe_ratio,
+            'profit_factor': self.profit_factor
+        })
+        return row
+
+
+def _evaluate_combination(setup_class: Type[TradingSetup], setup_id: str, parameters: Dict[str, Any],
+                          fixed_parameters: Dict[str, Any], data_path: str, engine_kwargs: Dict,
+                          symbols: List[str], start_date: str, end_date: str, quiet: bool) -> SweepResult:
+    """Worker entry point: backtest one combination and reduce it to metrics"""
+    setup = setup_class(setup_id=setup_id, **fixed_parameters, **parameters)
+    
+    if quiet:
+        # Skip building per-tick messages; the redirect still catches loader output
+        engine_kwargs = dict(engine_kwargs)
+        engine_kwargs.setdefault('verbosity', VERBOSITY_SILENT)
+    
+    # Each worker process keeps its loaded days in the shared day cache across combinations
+    with contextlib.redirect_stdout(io.StringIO()) if quiet else contextlib.nullcontext():
+        engine = BacktestEngine(data_path, [setup], **engine_kwargs)
+        results = engine.run_backtest(symbols, start_date, end_date)
+    
+    return SweepResult(
+        parameters=parameters,
+        total_pnl=results.total_pnl,
+        total_trades=results.total_trades,
+        win_rate=results.win_rate,
+        max_drawdown=results.max_drawdown,
+        sharpe_ratio=calculate_sharpe_ratio(results),
+        profit_factor=calculate_profit_factor(results)
+    )
+
+
+class ParameterSweep:
+    """
+    Evaluate every combination of a parameter grid for one setup class on a worker pool.
+    
+    Trading days are converted to memory-mapped day files once, up front; workers map
+    those files instead of re-parsing CSVs and keep them in their day cache across
+    combinations, so the operating system shares the pages between processes.
+    """
+    
+    def __init__(self, setup_class: Type[TradingSetup], parameter_grid: Dict[str, Iterable],
+                 fixed_parameters: Optional[Dict[str, Any]] = None, data_path: str = "5SecData",
+                 max_workers: Optional[int] = None, quiet: bool = True, **engine_kwargs):
+        """
+        Initialize the sweep
+        
+        Args:
+            setup_class: TradingSetup subclass to instantiate per combination
+            parameter_grid: parameter name -> values (any iterable, e.g. a list or range)
+            fixed_parameters: Constructor arguments shared by every combination
+            data_path: Root of the 5SecData directory
+            max_workers: Worker processes (defaults to the CPU count; 1 runs in-process)
+            quiet: Suppress the sweep's progress line and the engine output inside workers
+            **engine_kwargs: Passed through to every BacktestEngine
+        """
+        self.setup_class = setup_class
+        self.parameter_grid = {name: list(values) for name, values in parameter_grid.items()}
+        self.fixed_parameters = fixed_parameters or {}
+        self.data_path = data_path
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.quiet = quiet
+        self.engine_kwargs = engine_kwargs
+    
+    def expand_combinations(self) -> List[Dict[str, Any]]:
+        """Expand the grid into one parameter dict per combination, in grid order"""
+        names = list(self.parameter_grid)
+        return [dict(zip(names, values))
+                for values in itertools.product(*(self.parameter_grid[name] for name in names))]
+    
+    def run(self, symbols, start_date: str, end_date: str) -> List[SweepResult]:
+        """
+        Backtest every combination and return their metrics
+        
+        Returns:
+            List of SweepResult in the same order as expand_combinations()
+        """
+        if isinstance(symbols, str):
+            symbols = [symbols]  # Support single symbol as string
+        
+        combinations = self.expand_combinations()
+        if not self.quiet:
+            print(f"Sweeping {len(combinations)} {self.setup_class.__name__} combinations "
+                  f"on {min(self.max_workers, len(combinations))} workers...")
+        
+        # Convert every day once so workers only map binary day files
+        DataLoader(self.data_path).build_cache(symbols, start_date, end_date)
+        
+        task_args = [
+            (self.setup_class, f"sweep_{index}", parameters, self.fixed_parameters, self.data_path,
+             self.engine_kwargs, symbols, start_date, end_date, self.quiet)
+            for index, parameters in enumerate(combinations)
+        ]
+        
+        if self.max_workers == 1 or len(task_args) <= 1:
+            return [_evaluate_combination(*args) for args in task_args]
+        
+        workers = min(self.max_workers, len(task_args))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # Batches amortise task pickling; map keeps results in combination order
+            chunksize = max(1, len(task_args) // (workers * 4))
+            return list(executor.map(_evaluate_combination, *zip(*task_args), chunksize=chunksize))
+    
+    @staticmethod
+    def format_table(results: List[SweepResult], sort_by: str = "total_pnl", descending: bool = True,
+                     limit: Optional[int] = None) -> str:
+        """Format sweep results as a fixed-width text table sorted by a metric"""
+        if not results:
+            return ""
+        
+        rows = sorted((result.to_row() for result in results), key=lambda row: row[sort_by], reverse=descending)
+        if limit:
+            rows = rows[:limit]
+        
+        columns = list(rows[0])
+        widths = {column: max(len(column), 10) for column in columns}
+        
+        def format_value(value):
+            return f"{value:.4g}" if isinstance(value, float) else str(value)
+        
+        lines = [" ".join(f"{column:<{widths[column]}}" for column in columns)]
+        lines.append("-" * len(lines[0]))
+        for row in rows:
+            lines.append(" ".join(f"{format_value(row[column]):<{widths[column]}}" for column in columns))
+        
+        return "\n".join(lines)
+    
+    @staticmethod
+    def save_csv(results: List[SweepResult], filename: str) -> None:
+        """Write sweep results to a CSV file, one row per combination"""
+        if not results:
+            return
+        
+        rows = [result.to_row() for result in results]
+        with open(filename, 'w', newline='') as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+
+
+class _EntryPath(NamedTuple):
+    """Mark-to-market path of one straddle entry, from the entry tick to the last tick processed"""
+    timestamps: List[int]
+    running_max_pnl: List[float]  # Best mark P&L so far (non-decreasing)
+    running_max_loss: List[float]  # Worst mark P&L so far, negated (non-decreasing)
+    close_pnls: List[float]  # Realized P&L if closed at each tick
+    job_end_reached: bool
+
+
+class StraddleGridSweep(ParameterSweep):
+    """
+    Evaluate StraddleSetup grids by sharing one P&L path per distinct entry.
+    
+    Combinations that differ only in exit parameters (target_pct, stop_loss_pct,
+    close_timeindex) open the same legs at the same tick, so each day's mark and
+    close P&L are computed once per entry with PositionManager's own arithmetic.
+    Each exit variant is then resolved by binary search on the running best/worst
+    P&L: the first tick where the running maximum reaches the target is the first
+    target crossing, and likewise for the stop, the daily loss limit and the close
+    time. Results match running each combination alone in a BacktestEngine with
+    dynamic management disabled.
+    """
+    
+    EXIT_PARAMETERS = ("target_pct", "stop_loss_pct", "close_timeindex")
+    
+    def __init__(self, parameter_grid: Dict[str, Iterable], fixed_parameters: Optional[Dict[str, Any]] = None,
+                 data_path: str = "5SecData", daily_max_loss: float = 1000.0, quiet: bool = True):
+        """
+        Initialize the sweep
+        
+        Args:
+            parameter_grid: StraddleSetup parameter name -> values
+            fixed_parameters: Constructor arguments shared by every combination
+            data_path: Root of the 5SecData directory
+            daily_max_loss: Daily loss limit applied as in RiskManager
+            quiet: Suppress the sweep's progress line
+        """
+        # No engines are built, so there are no engine arguments to pass on
+        super().__init__(StraddleSetup, parameter_grid, fixed_parameters=fixed_parameters, data_path=data_path,
+                         max_workers=1, quiet=quiet)
+        self.daily_max_loss = abs(daily_max_loss)
+    
+    def run(self, symbols, start_date: str, end_date: str) -> List[SweepResult]:
+        """
+        Evaluate every combination over the date range for a single symbol
+        
+        Returns:
+            List of SweepResult in the same order as expand_combinations()
+        """
+        if not isinstance(symbols, str):
+            if len(symbols) != 1:
+                raise ValueError("StraddleGridSweep evaluates a single symbol")
+            symbols = symbols[0]
+        symbol = symbols
+        
+        combinations = [dict(self.fixed_parameters, **parameters) for parameters in self.expand_combinations()]
+        entry_groups: Dict[Tuple, List[int]] = {}
+        for index, setup_parameters in enumerate(combinations):
+            entry_key = tuple(sorted((name, value) for name, value in setup_parameters.items()
+                                     if name not in self.EXIT_PARAMETERS))
+            entry_groups.setdefault(entry_key, []).append(index)
+        
+        if not self.quiet:
+            print(f"Sweeping {len(combinations)} StraddleSetup combinations over {len(entry_groups)} distinct entries...")
+        
+        data_loader = DataLoader(self.data_path)
+        dates = [date for date in data_loader.get_available_dates(symbol) if start_date <= date <= end_date]
+        daily_pnls: List[List[float]] = [[] for _ in combinations]
+        trade_pnls: List[List[float]] = [[] for _ in combinations]
+        
+        for date in dates:
+            trading_day_data = data_loader.load_trading_day(symbol, date)
+            if not trading_day_data:
+                continue
+            
+            ticks = [
+                MarketData(timestamp=tick.timestamp, symbol=tick.symbol, spot_price=tick.spot_price,
+                           option_prices=tick.option_prices, available_strikes=[])
+                for tick in data_loader.iter_day_ticks(trading_day_data)
+            ]
+            timestamps = [market_data.timestamp for market_data in ticks]
+            
+            # The engine stops at the first tick at or past jobEndIdx
+            job_end_index = bisect_left(timestamps, trading_day_data.job_end_idx)
+            job_end_reached = job_end_index < len(ticks)
+            ticks = ticks[:job_end_index + 1]
+            timestamps = timestamps[:job_end_index + 1]
+            
+            for entry_key, indices in entry_groups.items():
+                path = self._build_entry_path(dict(entry_key), ticks, timestamps, job_end_reached, date)
+                
+                for index in indices:
+                    pnl = None
+                    if path is not None:
+                        setup_parameters = combinations[index]
+                        pnl = self._resolve_exit(
+                            path,
+                            target_pnl=setup_parameters["target_pct"],
+                            stop_loss_pnl=-abs(setup_parameters["stop_loss_pct"]),
+                            close_timeindex=setup_parameters.get("close_timeindex", 4650)
+                        )
+                    
+                    daily_pnls[index].append(pnl if pnl is not None else 0.0)
+                    if pnl is not None:
+                        trade_pnls[index].append(pnl)
+        
+        results = []
+        for parameters, days, trades in zip(self.expand_combinations(), daily_pnls, trade_pnls):
+            results.append(SweepResult(
+                parameters=parameters,
+                total_pnl=sum(trades),
+                total_trades=len(trades),
+                win_rate=len([pnl for pnl in trades if pnl > 0]) / len(trades) if trades else 0.0,
+                max_drawdown=_max_drawdown(trades),
+                sharpe_ratio=_sharpe_ratio(days),
+                profit_factor=_profit_factor(trades)
+            ))
+        
+        return results
+    
+    def _build_entry_path(self, entry_parameters: Dict[str, Any], ticks: List[MarketData], timestamps: List[int],
+                          job_end_reached: bool, date: str) -> Optional[_EntryPath]:
+        """Open the entry's position and record its mark and close P&L at every later tick"""
+        if self.daily_max_loss == 0:
+            return None  # RiskManager trips on the first tick and the engine stops for the day
+        
+        setup = StraddleSetup(setup_id="grid", target_pct=0.0, stop_loss_pct=0.0, **entry_parameters)
+        
+        entry_index = bisect_left(timestamps, setup.entry_timeindex)
+        if entry_index >= len(ticks) or timestamps[entry_index] != setup.entry_timeindex:
+            return None
+        
+        positions = setup.create_positions(ticks[entry_index])
+        if not positions:
+            return None
+        position = positions[0]
+        
+        position_manager = PositionManager()
+        running_max_pnl = []
+        running_max_loss = []
+        close_pnls = []
+        best = float('-inf')
+        worst = float('-inf')
+        
+        for market_data in ticks[entry_index:]:
+            mark_pnl = position_manager._calculate_position_pnl(position, market_data)
+            best = max(best, mark_pnl)
+            worst = max(worst, -mark_pnl)
+            running_max_pnl.append(best)
+            running_max_loss.append(worst)
+            close_pnls.append(position_manager._close_position(position, market_data, "", date).pnl)
+        
+        return _EntryPath(timestamps[entry_index:], running_max_pnl, running_max_loss, close_pnls, job_end_reached)
+    
+    def _resolve_exit(self, path: _EntryPath, target_pnl: float, stop_loss_pnl: float,
+                      close_timeindex: int) -> Optional[float]:
+        """Find the first exit tick for one target/stop pair; None if the position never closes"""
+        tick_count = len(path.close_pnls)
+        exit_index = tick_count
+        
+        if target_pnl > 0:
+            exit_index = min(exit_index, bisect_left(path.running_max_pnl, target_pnl))
+        if stop_loss_pnl < 0:
+            exit_index = min(exit_index, bisect_left(path.running_max_loss, -stop_loss_pnl))
+        exit_index = min(exit_index, bisect_left(path.timestamps, close_timeindex))
+        exit_index = min(exit_index, bisect_left(path.running_max_loss, self.daily_max_loss))
+        if path.job_end_reached:
+            exit_index = min(exit_index, tick_count - 1)
+        
+        return path.close_pnls[exit_index] if exit_index < tick_count else None
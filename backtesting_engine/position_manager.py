@@ -2,34 +2,422 @@
 Position management and P&L tracking
 """
 
-from typing import Dict, List, Optional
-from .models import Position, Trade, MarketData, TradingSetup
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from .models import Position, PositionLeg, Trade, MarketData, TradingSetup
+from .option_chain import OptionChainSnapshot
+
+INF = float("inf")
+TRIGGER_TOLERANCE = 1e-9  # Relative slack on trigger prices; crossings are confirmed on exact P&L
+_UNSEEN = object()  # Contract price before the first tick
+BOOK_COMPACT_MIN_DEAD = 64  # Dead book slots tolerated before a rebuild
+
+
+class PositionBook:
+    """
+    Event-driven mark-to-market and exit scheduling for every open position of a PositionManager.
+    
+    Legs are grouped by contract (option type, strike). Each tick reads every contract
+    quote once and re-marks only positions holding a contract whose quote changed
+    (plus positions added since the last tick); the others keep their P&L. Exits are
+    found without polling the whole book:
+    
+    - single-leg positions with only target/stop rules get trigger prices at entry,
+      kept sorted per contract, and a changed quote bisects to the positions whose
+      trigger it crossed (confirmed on the exact P&L);
+    - other re-marked positions run the full threshold checks;
+    - time exits come from the force_close_timeindex schedule.
+    
+    Results match per-position polling exactly. Exit thresholds are captured when a
+    position enters the book. Closed positions leave their slot dead (P&L 0.0, no
+    contract membership, triggers or time exit); the owner rebuilds the book once dead
+    slots outnumber live ones.
+    """
+    
+    def __init__(self, positions: Dict[str, Position]):
+        self.position_ids: List[str] = []
+        self.positions: List[Position] = []
+        self.pnls: List[float] = []  # 0.0 in dead slots, so the sum is the open P&L
+        self.indices: Dict[str, int] = {}  # position_id -> book index of open positions
+        self.dead = 0  # Slots of removed positions
+        
+        # Per contract
+        self.contract_ids: Dict[Tuple[str, float], int] = {}
+        self.contract_keys: List[Tuple[str, float]] = []
+        self.contract_members: List[List[int]] = []  # Book indices holding a leg on the contract
+        self.contract_prices: List = []  # Latest quote, None while missing
+        self.falling_triggers: List[List[Tuple[float, int]]] = []  # Exit once the price falls to the trigger
+        self.rising_triggers: List[List[Tuple[float, int]]] = []  # Exit once the price rises to the trigger
+        
+        # Per leg, grouped by position
+        self.leg_contract = array('l')
+        self.leg_quantity = array('q')
+        self.leg_entry = array('d')
+        self.leg_exit_slippage = array('d')
+        self.leg_lot_size = array('q')
+        self.leg_start = array('l')  # Per position: legs are leg_start[i]:leg_end[i]
+        self.leg_end = array('l')
+        
+        # Per position, in _check_exit_conditions order
+        self.target = array('d')
+        self.stop = array('d')
+        self.unlimited_stop = array('d')
+        self.early_profit = array('d')
+        self.ratio_stop = array('d')
+        self.force_close = array('q')
+        self.trigger_only = array('B')  # 1 if target/stop triggers cover every non-time exit
+        self.force_close_schedule: List[Tuple[int, int]] = []  # Sorted (force_close_timeindex, index)
+        
+        self._pending: Set[int] = set()  # Positions not yet marked
+        self._chain = None  # ColumnarOptionData the contract columns were resolved against
+        self._contract_columns: List[Optional[Tuple]] = []
+        
+        for position_id, position in positions.items():
+            self.append(position_id, position)
+    
+    def __len__(self) -> int:
+        """Open positions in the book"""
+        return len(self.positions) - self.dead
+    
+    def _contract_id(self, option_type: str, strike: float) -> int:
+        """Id of a contract, registering it on first use"""
+        key = (option_type, strike)
+        contract_id = self.contract_ids.get(key)
+        if contract_id is None:
+            contract_id = self.contract_ids[key] = len(self.contract_keys)
+            self.contract_keys.append(key)
+            self.contract_members.append([])
+            self.contract_prices.append(_UNSEEN)
+            self.falling_triggers.append([])
+            self.rising_triggers.append([])
+            if self._chain is not None:
+                self._contract_columns.append(self._contract_column(self._chain, option_type, strike))
+        return contract_id
+    
+    def append(self, position_id: str, position: Position) -> None:
+        """Add a position whose legs are already parsed"""
+        index = len(self.positions)
+        self.position_ids.append(position_id)
+        self.positions.append(position)
+        self.pnls.append(position.current_pnl)
+        self.indices[position_id] = index
+        self._pending.add(index)
+        
+        self.leg_start.append(len(self.leg_contract))
+        for _, option_type, strike, signed_quantity, entry_price, exit_slippage in position.legs:
+            if option_type is None:
+                continue  # Unparseable keys never contribute P&L
+            contract_id = self._contract_id(option_type, strike)
+            members = self.contract_members[contract_id]
+            if not members or members[-1] != index:
+                members.append(index)
+            self.leg_contract.append(contract_id)
+            self.leg_quantity.append(signed_quantity)
+            self.leg_entry.append(entry_price)
+            self.leg_exit_slippage.append(exit_slippage)
+            self.leg_lot_size.append(position.lot_size)
+        self.leg_end.append(len(self.leg_contract))
+        
+        # Disabled checks use thresholds that a finite P&L never crosses
+        stop_loss = position.stop_loss_pnl
+        target = position.target_pnl if position.target_pnl > 0 else INF
+        stop = stop_loss if stop_loss < 0 else -INF
+        unlimited_stop = stop_loss * 0.5 if position.unlimited_risk else -INF
+        early_profit = INF
+        if position.max_profit > 0:
+            if position.position_type == "IRON_CONDOR":
+                early_profit = position.max_profit * 0.5
+            elif position.position_type == "BUTTERFLY":
+                early_profit = position.max_profit * 0.6
+        ratio_stop = stop_loss * 0.75 if position.position_type == "RATIO_SPREAD" else -INF
+        
+        self.target.append(target)
+        self.stop.append(stop)
+        self.unlimited_stop.append(unlimited_stop)
+        self.early_profit.append(early_profit)
+        self.ratio_stop.append(ratio_stop)
+        self.force_close.append(position.force_close_timeindex)
+        insort(self.force_close_schedule, (position.force_close_timeindex, index))
+        
+        leg_count = self.leg_end[index] - self.leg_start[index]
+        trigger_only = (leg_count <= 1 and unlimited_stop == -INF and early_profit == INF and ratio_stop == -INF)
+        self.trigger_only.append(trigger_only)
+        if trigger_only and leg_count == 1:
+            for triggers, entry in self._trigger_entries(index):
+                insort(triggers, entry)
+    
+    def _trigger_entries(self, index: int) -> List[Tuple[List, Tuple[float, int]]]:
+        """(trigger list, (price, index)) at which a single-leg position reaches its target or stop"""
+        leg = self.leg_start[index]
+        # P&L = ((price + exit_slippage) - entry) * scale is monotone in price
+        scale = self.leg_quantity[leg] * self.leg_lot_size[leg]
+        if scale == 0:
+            return []
+        base = self.leg_entry[leg] - self.leg_exit_slippage[leg]
+        contract_id = self.leg_contract[leg]
+        
+        entries = []
+        for threshold, reaches_up in ((self.target[index], True), (self.stop[index], False)):
+            if threshold in (INF, -INF):
+                continue
+            trigger = base + threshold / scale
+            # Long legs gain as the price rises, short legs as it falls
+            if (scale > 0) == reaches_up:
+                entries.append((self.rising_triggers[contract_id], (trigger, index)))
+            else:
+                entries.append((self.falling_triggers[contract_id], (trigger, index)))
+        return entries
+    
+    def remove(self, position_id: str) -> None:
+        """Retire a closed position's slot, dropping its memberships, triggers and time exit"""
+        index = self.indices.pop(position_id, None)
+        if index is None:
+            return
+        self.dead += 1
+        self.pnls[index] = 0.0
+        self._pending.discard(index)
+        
+        for contract_id in {self.leg_contract[leg] for leg in range(self.leg_start[index], self.leg_end[index])}:
+            members = self.contract_members[contract_id]
+            pos = bisect_left(members, index)  # Members are in book order
+            if pos < len(members) and members[pos] == index:
+                del members[pos]
+        
+        if self.trigger_only[index] and self.leg_end[index] - self.leg_start[index] == 1:
+            for triggers, entry in self._trigger_entries(index):
+                pos = bisect_left(triggers, entry)
+                if pos < len(triggers) and triggers[pos] == entry:
+                    del triggers[pos]
+        
+        schedule = self.force_close_schedule
+        entry = (self.force_close[index], index)
+        pos = bisect_left(schedule, entry)
+        if pos < len(schedule) and schedule[pos] == entry:
+            del schedule[pos]
+    
+    @staticmethod
+    def _contract_column(chain, option_type: str, strike: float) -> Optional[Tuple]:
+        """(price matrix, strike column) of a contract in a columnar day, or None if never quoted"""
+        matrix = chain.prices.get(option_type)
+        col = chain.strike_index.get(strike)
+        return None if matrix is None or col is None else (matrix, col)
+    
+    def _read_prices(self, option_prices: Dict[str, Dict[float, float]]) -> List:
+        """Current quote of every contract, None where missing"""
+        if isinstance(option_prices, OptionChainSnapshot):
+            chain = option_prices.chain
+            if chain is not self._chain:
+                self._contract_columns = [self._contract_column(chain, option_type, strike)
+                                          for option_type, strike in self.contract_keys]
+                self._chain = chain
+            offset = option_prices.row * len(chain.strikes)
+            prices = []
+            for columns in self._contract_columns:
+                price = None if columns is None else columns[0][offset + columns[1]]
+                prices.append(price if price == price else None)  # NaN marks a missing quote
+            return prices
+        
+        prices = []
+        for option_type, strike in self.contract_keys:
+            strike_prices = option_prices.get(option_type)
+            prices.append(strike_prices[strike] if strike_prices is not None and strike in strike_prices else None)
+        return prices
+    
+    def _position_pnl(self, index: int) -> float:
+        """P&L of one position from the current contract prices; legs without a quote are skipped"""
+        prices = self.contract_prices
+        total_pnl = 0.0
+        for leg in range(self.leg_start[index], self.leg_end[index]):
+            price = prices[self.leg_contract[leg]]
+            if price is None:
+                continue
+            total_pnl += ((price + self.leg_exit_slippage[leg]) - self.leg_entry[leg]) * self.leg_quantity[leg] * self.leg_lot_size[leg]
+        return total_pnl
+    
+    def _full_exit_check(self, index: int, current_timeindex: int) -> Optional[str]:
+        """Every exit rule, in _check_exit_conditions order"""
+        pnl = self.pnls[index]
+        if pnl >= self.target[index]:
+            return "TARGET"
+        if pnl <= self.stop[index]:
+            return "STOP_LOSS"
+        if pnl <= self.unlimited_stop[index]:
+            return "UNLIMITED_RISK_PROTECTION"
+        if pnl >= self.early_profit[index]:
+            return "EARLY_PROFIT_TARGET"
+        if pnl <= self.ratio_stop[index]:
+            return "RATIO_SPREAD_PROTECTION"
+        if current_timeindex >= self.force_close[index]:
+            return "TIME_BASED"
+        return None
+    
+    def update(self, option_prices: Dict[str, Dict[float, float]],
+               current_timeindex: int) -> Tuple[List[int], List[Tuple[int, str]]]:
+        """
+        Apply one tick of quotes
+        
+        Returns:
+            (book indices whose P&L changed, (book index, exit reason) to close in book order)
+        """
+        prices = self._read_prices(option_prices)
+        last_prices = self.contract_prices
+        changed_contracts = [contract_id for contract_id, price in enumerate(prices)
+                             if price != last_prices[contract_id]]
+        self.contract_prices = prices
+        
+        pending = self._pending
+        affected = set(pending)
+        for contract_id in changed_contracts:
+            affected.update(self.contract_members[contract_id])
+        
+        changed_pnls = []
+        pnls = self.pnls
+        for index in affected:
+            pnl = self._position_pnl(index)
+            if pnl != pnls[index]:
+                pnls[index] = pnl
+                changed_pnls.append(index)
+        
+        exits: Dict[int, str] = {}
+        
+        # Positions with more than target/stop rules, or marked for the first time
+        for index in affected:
+            if index in pending or not self.trigger_only[index]:
+                exit_reason = self._full_exit_check(index, current_timeindex)
+                if exit_reason:
+                    exits[index] = exit_reason
+        self._pending = set()
+        
+        # Single-leg positions whose trigger price the new quote crossed
+        for contract_id in changed_contracts:
+            price = prices[contract_id]
+            if price is None:
+                continue  # A missing quote marks single-leg positions at zero, inside every threshold
+            slack = TRIGGER_TOLERANCE * max(1.0, abs(price))
+            falling = self.falling_triggers[contract_id]
+            rising = self.rising_triggers[contract_id]
+            candidates = falling[bisect_left(falling, (price - slack, -1)):] + rising[:bisect_right(rising, (price + slack, INF))]
+            for _, index in candidates:
+                if index not in exits:
+                    pnl = pnls[index]
+                    if pnl >= self.target[index]:
+                        exits[index] = "TARGET"
+                    elif pnl <= self.stop[index]:
+                        exits[index] = "STOP_LOSS"
+        
+        # Everything else can only have reached its close time
+        schedule = self.force_close_schedule
+        for _, index in schedule[:bisect_right(schedule, (current_timeindex, INF))]:
+            exits.setdefault(index, "TIME_BASED")
+        
+        return changed_pnls, sorted(exits.items())
 
 
 class PositionManager:
     """Tracks all open positions and calculates real-time P&L"""
     
-    def __init__(self):
+    def __init__(self, vectorized: bool = False):
+        """
+        Initialize the position manager
+        
+        Args:
+            vectorized: Mark changed positions and schedule exits via an event-driven PositionBook
+        """
         self.positions: Dict[str, Position] = {}  # position_id -> Position
         self.position_counter = 0
+        self.vectorized = vectorized
+        self._book: Optional[PositionBook] = None
+        self._reset_pnl_aggregates()
+    
+    def _reset_pnl_aggregates(self) -> None:
+        """Zero the running realized/unrealized P&L totals"""
+        self.realized_pnl = 0.0  # Closed since the last reset_positions()
+        self.unrealized_pnl = 0.0  # Open positions at their latest mark
+        self.setup_realized_pnl: Dict[str, float] = {}
+        self.setup_unrealized_pnl: Dict[str, float] = {}
+        self.symbol_realized_pnl: Dict[str, float] = {}
+        self.symbol_unrealized_pnl: Dict[str, float] = {}
     
     def add_position(self, position: Position) -> str:
         """Add a new position and return position ID"""
         position_id = f"{position.setup_id}_{self.position_counter}"
         self.position_counter += 1
+        position.legs = self._build_legs(position)
         self.positions[position_id] = position
+        self._apply_unrealized_delta(position, position.current_pnl)
+        if self._book is not None:
+            if len(self._book) + 1 == len(self.positions):
+                self._book.append(position_id, position)
+            else:
+                self._book = None
         return position_id
     
+    def _apply_unrealized_delta(self, position: Position, delta: float) -> None:
+        """Move the position's setup and symbol unrealized totals by a P&L change"""
+        self.setup_unrealized_pnl[position.setup_id] = self.setup_unrealized_pnl.get(position.setup_id, 0.0) + delta
+        self.symbol_unrealized_pnl[position.symbol] = self.symbol_unrealized_pnl.get(position.symbol, 0.0) + delta
+        self.unrealized_pnl += delta
+    
+    def _mark_positions(self, positions: Iterable[Position], pnls: Iterable[float]) -> None:
+        """Store fresh marks, updating setup and symbol totals by their deltas"""
+        setup_unrealized = self.setup_unrealized_pnl
+        symbol_unrealized = self.symbol_unrealized_pnl
+        total = 0.0
+        
+        for position, pnl in zip(positions, pnls):
+            delta = pnl - position.current_pnl
+            if delta:
+                position.current_pnl = pnl
+                setup_unrealized[position.setup_id] = setup_unrealized.get(position.setup_id, 0.0) + delta
+                symbol_unrealized[position.symbol] = symbol_unrealized.get(position.symbol, 0.0) + delta
+            total += pnl
+        
+        # Every open position was just marked, so the total is re-summed rather than drifted
+        self.unrealized_pnl = total
+    
+    def _remove_position(self, position_id: str, trade: Trade) -> None:
+        """Drop a closed position and move its P&L from unrealized to realized"""
+        position = self.positions.pop(position_id)
+        self._apply_unrealized_delta(position, -position.current_pnl)
+        
+        self.realized_pnl += trade.pnl
+        self.setup_realized_pnl[position.setup_id] = self.setup_realized_pnl.get(position.setup_id, 0.0) + trade.pnl
+        self.symbol_realized_pnl[position.symbol] = self.symbol_realized_pnl.get(position.symbol, 0.0) + trade.pnl
+        
+        book = self._book
+        if book is not None:
+            book.remove(position_id)
+            if book.dead > max(BOOK_COMPACT_MIN_DEAD, len(book)):
+                self._book = None  # Rebuilt without the dead slots on the next update
+        
+        if not self.positions:
+            # Nothing open: clear accumulated rounding from the unrealized totals
+            self.unrealized_pnl = 0.0
+            self.setup_unrealized_pnl = dict.fromkeys(self.setup_unrealized_pnl, 0.0)
+            self.symbol_unrealized_pnl = dict.fromkeys(self.symbol_unrealized_pnl, 0.0)
+    
+    def _get_book(self) -> PositionBook:
+        """Book over the open positions, built on first use and after compaction"""
+        if self._book is None or len(self._book) != len(self.positions):
+            for position in self.positions.values():
+                self._get_legs(position)
+            self._book = PositionBook(self.positions)
+        return self._book
+    
     def update_positions(self, market_data: MarketData, date: str = "") -> List[Trade]:
         """Update all positions and return closed positions as trades"""
+        if self.vectorized:
+            return self._update_book(market_data, date)
+        
         closed_trades = []
         positions_to_remove = []
         
+        # Calculate current P&L
+        self._mark_positions(self.positions.values(),
+                             [self._calculate_position_pnl(position, market_data) for position in self.positions.values()])
+        
         for position_id, position in self.positions.items():
-            # Calculate current P&L
-            current_pnl = self._calculate_position_pnl(position, market_data)
-            position.current_pnl = current_pnl
-            
             # Check exit conditions
             exit_reason = self._check_exit_conditions(position, market_data.timestamp)
             
@@ -39,8 +427,34 @@ class PositionManager:
                 positions_to_remove.append(position_id)
         
         # Remove closed positions
-        for position_id in positions_to_remove:
-            del self.positions[position_id]
+        for position_id, trade in zip(positions_to_remove, closed_trades):
+            self._remove_position(position_id, trade)
+        
+        return closed_trades
+    
+    def _update_book(self, market_data: MarketData, date: str = "") -> List[Trade]:
+        """update_positions re-marking only positions whose quotes changed, with exits from the book schedule"""
+        if not self.positions:
+            return []
+        
+        book = self._get_book()
+        changed_pnls, exits = book.update(market_data.option_prices, market_data.timestamp)
+        
+        setup_unrealized = self.setup_unrealized_pnl
+        symbol_unrealized = self.symbol_unrealized_pnl
+        for index in changed_pnls:
+            position = book.positions[index]
+            delta = book.pnls[index] - position.current_pnl
+            position.current_pnl = book.pnls[index]
+            setup_unrealized[position.setup_id] = setup_unrealized.get(position.setup_id, 0.0) + delta
+            symbol_unrealized[position.symbol] = symbol_unrealized.get(position.symbol, 0.0) + delta
+        self.unrealized_pnl = sum(book.pnls)  # C-level re-sum in book order, so the total does not drift
+        
+        closed_trades = []
+        for index, exit_reason in exits:
+            trade = self._close_position(book.positions[index], market_data, exit_reason, date)
+            closed_trades.append(trade)
+            self._remove_position(book.position_ids[index], trade)
         
         return closed_trades
     
@@ -69,29 +483,40 @@ class PositionManager:
                 positions_to_remove.append(position_id)
         
         # Remove closed positions
-        for position_id in positions_to_remove:
-            del self.positions[position_id]
+        for position_id, trade in zip(positions_to_remove, closed_trades):
+            self._remove_position(position_id, trade)
         
         return closed_trades
     
     def get_total_pnl(self) -> float:
         """Get total P&L across all positions"""
-        return sum(position.current_pnl for position in self.positions.values())
+        return self.unrealized_pnl
     
     def get_setup_pnl(self, setup_id: str) -> float:
         """Get P&L for a specific setup"""
-        return sum(position.current_pnl for position in self.positions.values() 
-                  if position.setup_id == setup_id)
+        return self.setup_unrealized_pnl.get(setup_id, 0.0)
+    
+    def get_day_pnl(self) -> float:
+        """Realized plus unrealized P&L since the last reset_positions()"""
+        return self.realized_pnl + self.unrealized_pnl
+    
+    def get_setup_day_pnl(self, setup_id: str) -> float:
+        """Realized plus unrealized P&L for a specific setup"""
+        return self.setup_realized_pnl.get(setup_id, 0.0) + self.setup_unrealized_pnl.get(setup_id, 0.0)
+    
+    def get_symbol_day_pnl(self, symbol: str) -> float:
+        """Realized plus unrealized P&L for positions on a specific symbol"""
+        return self.symbol_realized_pnl.get(symbol, 0.0) + self.symbol_unrealized_pnl.get(symbol, 0.0)
     
     def close_all_positions(self, market_data: MarketData, reason: str = "FORCE_CLOSE", date: str = "") -> List[Trade]:
         """Close all open positions"""
         closed_trades = []
         
-        for position in self.positions.values():
+        for position_id, position in list(self.positions.items()):
             trade = self._close_position(position, market_data, reason, date)
             closed_trades.append(trade)
+            self._remove_position(position_id, trade)
         
-        self.positions.clear()
         return closed_trades
     
     def close_setup_positions(self, setup_id: str, market_data: MarketData, reason: str = "SETUP_CLOSE", date: str = "") -> List[Trade]:
@@ -106,8 +531,8 @@ class PositionManager:
                 positions_to_remove.append(position_id)
         
         # Remove closed positions
-        for position_id in positions_to_remove:
-            del self.positions[position_id]
+        for position_id, trade in zip(positions_to_remove, closed_trades):
+            self._remove_position(position_id, trade)
         
         return closed_trades
     
@@ -119,38 +544,51 @@ class PositionManager:
         """Clear all positions for new trading day"""
         self.positions.clear()
         self.position_counter = 0
+        self._book = None
+        self._reset_pnl_aggregates()
     
-    def _calculate_position_pnl(self, position: Position, market_data: MarketData) -> float:
-        """Calculate current P&L for a position with slippage applied"""
-        total_pnl = 0.0
+    def _build_legs(self, position: Position) -> List[PositionLeg]:
+        """Parse every entry_prices key once into the position's leg table"""
+        legs = []
         
         for option_key, entry_price in position.entry_prices.items():
-            # Parse option key using enhanced parsing for complex multi-leg positions
             leg_details = self._parse_option_key(option_key, position)
-            
             if not leg_details:
+                legs.append(PositionLeg(option_key, None, 0.0, 0, entry_price, 0.0))
                 continue
-                
-            option_type = leg_details['option_type']
-            strike = leg_details['strike']
-            leg_type = leg_details['action']
-            leg_quantity = leg_details['quantity']
             
-            # Get current market price
-            current_price = 0.0
-            if (option_type in market_data.option_prices and 
-                strike in market_data.option_prices[option_type]):
-                current_price = market_data.option_prices[option_type][strike]
-            else:
-                # Handle missing price gracefully - use last known price or skip
+            if leg_details['action'] in ["SELL", "SHORT"]:
+                # When selling: receive less on entry, pay more on exit
+                legs.append(PositionLeg(option_key, leg_details['option_type'], leg_details['strike'],
+                                        -leg_details['quantity'], entry_price - position.slippage,
+                                        position.slippage))
+            else:  # BUY, LONG, or other buy actions
+                # When buying: pay more on entry, receive less on exit
+                legs.append(PositionLeg(option_key, leg_details['option_type'], leg_details['strike'],
+                                        leg_details['quantity'], entry_price + position.slippage,
+                                        -position.slippage))
+        
+        return legs
+    
+    def _get_legs(self, position: Position) -> List[PositionLeg]:
+        """Leg table for a position, built on first use for positions not added via add_position"""
+        if position.legs is None:
+            position.legs = self._build_legs(position)
+        return position.legs
+    
+    def _calculate_position_pnl(self, position: Position, market_data: MarketData) -> float:
+        """Calculate current P&L for a position with slippage applied"""
+        total_pnl = 0.0
+        option_prices = market_data.option_prices
+        lot_size = position.lot_size
+        
+        for _, option_type, strike, signed_quantity, entry_price, exit_slippage in self._get_legs(position):
+            strike_prices = option_prices.get(option_type)
+            if strike_prices is None or strike not in strike_prices:
+                # Handle missing price gracefully (also skips unparseable keys)
                 continue
             
-            # Calculate P&L for this leg with slippage
-            option_pnl = self._calculate_leg_pnl(
-                entry_price, current_price, leg_type, leg_quantity, position.lot_size, position.slippage
-            )
-            
-            total_pnl += option_pnl
+            total_pnl += ((strike_prices[strike] + exit_slippage) - entry_price) * signed_quantity * lot_size
         
         return total_pnl
     
@@ -271,44 +709,22 @@ class PositionManager:
     def _close_position(self, position: Position, market_data: MarketData, exit_reason: str, date: str = "") -> Trade:
         """Close a position and create trade record with enhanced multi-leg support"""
         exit_prices = {}
+        final_pnl = 0.0
+        option_prices = market_data.option_prices
+        lot_size = position.lot_size
         
-        # Get exit prices for all legs
-        for option_key, entry_price in position.entry_prices.items():
-            leg_details = self._parse_option_key(option_key, position)
-            
-            if not leg_details:
-                # Handle invalid keys gracefully
-                exit_prices[option_key] = 0.0
-                continue
-                
-            option_type = leg_details['option_type']
-            strike = leg_details['strike']
-            
-            # Get current market price
+        for option_key, option_type, strike, signed_quantity, entry_price, exit_slippage in self._get_legs(position):
+            # Get current market price; unparseable keys and missing quotes exit at 0.0
             market_price = 0.0
-            if (option_type in market_data.option_prices and 
-                strike in market_data.option_prices[option_type]):
-                market_price = market_data.option_prices[option_type][strike]
+            strike_prices = option_prices.get(option_type)
+            if strike_prices is not None and strike in strike_prices:
+                market_price = strike_prices[strike]
             
             # Store original market price (slippage applied in P&L calculation)
             exit_prices[option_key] = market_price
-        
-        # Calculate final P&L using enhanced leg calculation
-        final_pnl = 0.0
-        for option_key, entry_price in position.entry_prices.items():
-            exit_price = exit_prices.get(option_key, 0.0)
-            leg_details = self._parse_option_key(option_key, position)
-            
-            if not leg_details:
-                continue
-                
-            # Calculate P&L for this leg
-            option_pnl = self._calculate_leg_pnl(
-                entry_price, exit_price, leg_details['action'], 
-                leg_details['quantity'], position.lot_size, position.slippage
-            )
             
-            final_pnl += option_pnl
+            if option_type is not None:
+                final_pnl += ((market_price + exit_slippage) - entry_price) * signed_quantity * lot_size
         
         return Trade(
             setup_id=position.setup_id,
@@ -372,8 +788,8 @@ class PositionManager:
                         positions_to_remove.append(position_id)
         
         # Remove closed positions
-        for position_id in positions_to_remove:
-            del self.positions[position_id]
+        for position_id, trade in zip(positions_to_remove, closed_trades):
+            self._remove_position(position_id, trade)
         
         # Add new rebalanced positions
         for new_position in new_positions:
@@ -438,7 +854,7 @@ class PositionManager:
         
         # Close the position
         trade = self._close_position(position, market_data, reason, date)
-        del self.positions[position_id]
+        self._remove_position(position_id, trade)
         
         return trade
     
@@ -622,8 +1038,8 @@ class PositionManager:
                     print(f"EMERGENCY: Closed unlimited risk position {position_id} with P&L: {current_pnl:.2f}")
         
         # Remove closed positions
-        for position_id in positions_to_remove:
-            del self.positions[position_id]
+        for position_id, trade in zip(positions_to_remove, emergency_trades):
+            self._remove_position(position_id, trade)
         
         return emergency_trades
     
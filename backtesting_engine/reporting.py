@@ -12,6 +12,7 @@ from .models import (BacktestResults, Trade, DailyResults, SetupResults,
                      SymbolResults, RegimeResults, DynamicAdjustmentResults,
                      RegimeTransition, ParameterAdjustment)
 from .html_reporter import HTMLReporter
+from .trade_stats import TradeAggregator
 
 
 class BacktestReporter:
@@ -20,8 +21,21 @@ class BacktestReporter:
     def __init__(self, results: BacktestResults):
         self.results = results
         self.report_dir = "backtest_reports"
+        self._trades: Optional[List[Trade]] = None
         self._ensure_report_dir()
     
+    def _get_trade_stats(self) -> TradeAggregator:
+        """Grouped trade statistics from the results, aggregated from the trade log if absent"""
+        if self.results.trade_stats is None:
+            self.results.trade_stats = TradeAggregator.from_trades(self._get_trades())
+        return self.results.trade_stats
+    
+    def _get_trades(self) -> List[Trade]:
+        """Trades of the results' columnar log, built once per reporter instead of on every pass"""
+        if self._trades is None or len(self._trades) != len(self.results.trade_log):
+            self._trades = list(self.results.trade_log)
+        return self._trades
+    
     def _ensure_report_dir(self):
         """Create reports directory if it doesn't exist"""
         if not os.path.exists(self.report_dir):
@@ -47,6 +61,7 @@ class BacktestReporter:
         self._export_symbol_performance_csv(f"{report_prefix}_symbol_performance.csv")
         self._export_pattern_analysis_csv(f"{report_prefix}_pattern_analysis.csv")
         self._export_correlation_analysis_csv(f"{report_prefix}_correlation_analysis.csv")
+        self._export_intraday_equity_csv(f"{report_prefix}_intraday_equity.csv")
         
         # Save summary to text file
         summary_file = os.path.join(self.report_dir, f"{report_prefix}_summary.txt")
@@ -67,6 +82,8 @@ class BacktestReporter:
         print(f"   - {report_prefix}_symbol_performance.csv")
         print(f"   - {report_prefix}_pattern_analysis.csv")
         print(f"   - {report_prefix}_correlation_analysis.csv")
+        if self.results.intraday_equity is not None:
+            print(f"   - {report_prefix}_intraday_equity.csv")
         print(f"   - {os.path.basename(html_file)} (HTML Report)")
         
         return summary
@@ -88,6 +105,8 @@ class BacktestReporter:
         lines.append(f"Total Trades:        {self.results.total_trades:>10,}")
         lines.append(f"Win Rate:            {self.results.win_rate:>10.1%}")
         lines.append(f"Max Drawdown:        ${self.results.max_drawdown:>10,.2f}")
+        if self.results.mtm_max_drawdown:
+            lines.append(f"MTM Max Drawdown:    ${self.results.mtm_max_drawdown:>10,.2f}")
         
         if self.results.total_trades > 0:
             avg_trade = self.results.total_pnl / self.results.total_trades
@@ -117,31 +136,25 @@ class BacktestReporter:
         lines.append("\n📊 TRADE STATISTICS")
         lines.append("-" * 40)
         
-        winning_trades = [t for t in self.results.trade_log if t.pnl > 0]
-        losing_trades = [t for t in self.results.trade_log if t.pnl < 0]
+        trade_stats = self._get_trade_stats()
+        overall = trade_stats.stats()
         
-        lines.append(f"Winning Trades:      {len(winning_trades):>10}")
-        lines.append(f"Losing Trades:       {len(losing_trades):>10}")
+        lines.append(f"Winning Trades:      {overall.wins:>10}")
+        lines.append(f"Losing Trades:       {overall.losses:>10}")
         
-        if winning_trades:
-            avg_win = sum(t.pnl for t in winning_trades) / len(winning_trades)
-            max_win = max(t.pnl for t in winning_trades)
-            lines.append(f"Average Win:         ${avg_win:>10.2f}")
-            lines.append(f"Largest Win:         ${max_win:>10.2f}")
+        if overall.wins:
+            lines.append(f"Average Win:         ${overall.avg_win:>10.2f}")
+            lines.append(f"Largest Win:         ${overall.best_pnl:>10.2f}")
         
-        if losing_trades:
-            avg_loss = sum(t.pnl for t in losing_trades) / len(losing_trades)
-            max_loss = min(t.pnl for t in losing_trades)
-            lines.append(f"Average Loss:        ${avg_loss:>10.2f}")
-            lines.append(f"Largest Loss:        ${max_loss:>10.2f}")
+        if overall.losses:
+            lines.append(f"Average Loss:        ${overall.avg_loss:>10.2f}")
+            lines.append(f"Largest Loss:        ${overall.worst_pnl:>10.2f}")
         
         # Exit Reason Analysis
         lines.append("\n🚪 EXIT REASON ANALYSIS")
         lines.append("-" * 40)
         
-        exit_reasons = {}
-        for trade in self.results.trade_log:
-            exit_reasons[trade.exit_reason] = exit_reasons.get(trade.exit_reason, 0) + 1
+        exit_reasons = trade_stats.exit_reasons
         
         for reason, count in sorted(exit_reasons.items()):
             pct = count / self.results.total_trades * 100 if self.results.total_trades > 0 else 0
@@ -195,7 +208,7 @@ class BacktestReporter:
             writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
             writer.writeheader()
             
-            for i, trade in enumerate(self.results.trade_log, 1):
+            for i, trade in enumerate(self._get_trades(), 1):
                 # Initialize all values
                 ce_sell_strike = pe_sell_strike = ce_buy_strike = pe_buy_strike = 'N/A'
                 ce_sell_entry = pe_sell_entry = ce_buy_entry = pe_buy_entry = 0.0
@@ -455,6 +468,21 @@ class BacktestReporter:
                 
                 writer.writerow(row)
     
+    def _export_intraday_equity_csv(self, filename: str):
+        """Export recorded tick-level equity per symbol to CSV"""
+        recorder = self.results.intraday_equity
+        if recorder is None:
+            return
+        
+        filepath = os.path.join(self.report_dir, filename)
+        
+        with open(filepath, 'w', newline='') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(['symbol', 'date', 'timestamp', 'equity'])
+            for symbol in recorder.series:
+                for date, timestamp, equity in recorder.get_points(symbol):
+                    writer.writerow([symbol, date, timestamp, f"{equity:.2f}"])
+    
     def _export_pattern_analysis_csv(self, filename: str):
         """Export pattern discovery analysis to CSV"""
         filepath = os.path.join(self.report_dir, filename)
@@ -540,7 +568,7 @@ class BacktestReporter:
         # Group trades by hour of day (assuming timeindex represents time)
         hourly_performance = defaultdict(list)
         
-        for trade in self.results.trade_log:
+        for trade in self._get_trades():
             # Convert timeindex to approximate hour (simplified)
             hour = (trade.entry_timeindex // 300) % 24  # Rough approximation
             hourly_performance[hour].append(trade.pnl)
@@ -573,7 +601,7 @@ class BacktestReporter:
         # Group by exit reason
         exit_performance = defaultdict(list)
         
-        for trade in self.results.trade_log:
+        for trade in self._get_trades():
             exit_performance[trade.exit_reason].append(trade.pnl)
         
         for reason, pnls in exit_performance.items():
@@ -605,7 +633,7 @@ class BacktestReporter:
         max_win_streak = 0
         max_loss_streak = 0
         
-        for trade in self.results.trade_log:
+        for trade in self._get_trades():
             if trade.pnl > 0:  # Winning trade
                 if current_streak_type == 'WIN':
                     current_streak += 1
@@ -658,7 +686,7 @@ class BacktestReporter:
         
         bucket_performance = defaultdict(list)
         
-        for trade in self.results.trade_log:
+        for trade in self._get_trades():
             duration = trade.exit_timeindex - trade.entry_timeindex
             
             for bucket_name, (min_dur, max_dur) in duration_buckets.items():
@@ -696,8 +724,8 @@ class BacktestReporter:
             for j, symbol2 in enumerate(symbols[i+1:], i+1):
                 
                 # Get trades for each symbol
-                symbol1_trades = [t for t in self.results.trade_log if getattr(t, 'symbol', '') == symbol1]
-                symbol2_trades = [t for t in self.results.trade_log if getattr(t, 'symbol', '') == symbol2]
+                symbol1_trades = [t for t in self._get_trades() if getattr(t, 'symbol', '') == symbol1]
+                symbol2_trades = [t for t in self._get_trades() if getattr(t, 'symbol', '') == symbol2]
                 
                 if len(symbol1_trades) < 3 or len(symbol2_trades) < 3:
                     continue
@@ -20,6 +20,17 @@ class RiskManager:
         """Check if all positions should be closed due to daily limit"""
         return self.check_daily_limit(total_pnl)
     
+    def check_position_manager(self, position_manager) -> bool:
+        """
+        Check the daily limit against a PositionManager's running totals in O(1).
+        
+        Uses realized plus unrealized P&L, so losses already booked today count
+        toward the limit, and records it as the current daily P&L.
+        """
+        day_pnl = position_manager.get_day_pnl()
+        self.daily_pnl = day_pnl
+        return self.check_daily_limit(day_pnl)
+    
     def update_daily_pnl(self, pnl: float):
         """Update daily P&L tracking"""
         self.daily_pnl = pnl
@@ -0,0 +1,129 @@
+"""
+Sliding-window accumulators for O(1) rolling indicators
+"""
+
+import math
+from collections import deque
+from typing import Optional
+
+
+class RollingVariance:
+    """Population mean and variance of a sliding window, kept with windowed Welford updates"""
+    
+    __slots__ = ("count", "mean", "m2")
+    
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0  # Sum of squared deviations from the mean
+    
+    def add(self, value: float) -> None:
+        """Add a value entering the window"""
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+    
+    def remove(self, value: float) -> None:
+        """Remove a value leaving the window"""
+        self.count -= 1
+        if self.count == 0:
+            self.mean = 0.0
+            self.m2 = 0.0
+            return
+        delta = value - self.mean
+        self.mean -= delta / self.count
+        self.m2 -= delta * (value - self.mean)
+    
+    @property
+    def variance(self) -> float:
+        return max(self.m2, 0.0) / self.count if self.count else 0.0
+
+
+class RollingSlope:
+    """
+    Least-squares slope of a sliding window of values against their positions 0..n-1.
+    
+    Keeps the sum of values and of position-weighted values. Dropping the oldest value
+    shifts every remaining position down by one, which subtracts the remaining sum
+    from the weighted sum, so each update is O(1). The sums are recomputed from the
+    window once per window's worth of evictions to stop rounding drift building up.
+    """
+    
+    __slots__ = ("values", "y_sum", "xy_sum", "evictions")
+    
+    def __init__(self, values: deque):
+        self.values = values  # Bounded window, appended to by the owner
+        self.y_sum = 0.0
+        self.xy_sum = 0.0
+        self.evictions = 0
+    
+    def update(self, value: float, evicted: Optional[float] = None) -> None:
+        """Account for value just appended to the window, after evicted dropped out of it"""
+        if evicted is not None:
+            self.evictions += 1
+            if self.evictions >= len(self.values):
+                self.resync()
+                return
+            self.y_sum -= evicted
+            self.xy_sum -= self.y_sum
+        self.xy_sum += (len(self.values) - 1) * value
+        self.y_sum += value
+    
+    def resync(self) -> None:
+        """Recompute the sums from the window"""
+        self.y_sum = sum(self.values)
+        self.xy_sum = sum(i * value for i, value in enumerate(self.values))
+        self.evictions = 0
+    
+    def slope(self) -> float:
+        """Slope of values per position, 0.0 with fewer than two values"""
+        n = len(self.values)
+        if n < 2:
+            return 0.0
+        x_sum = n * (n - 1) // 2
+        x2_sum = (n - 1) * n * (2 * n - 1) // 6
+        return (n * self.xy_sum - x_sum * self.y_sum) / (n * x2_sum - x_sum * x_sum)
+    
+    def mean(self) -> float:
+        """Mean of the values in the window"""
+        return self.y_sum / len(self.values) if self.values else 0.0
+
+
+class RollingLogReturns:
+    """
+    A bounded history of values with the variance of log returns between consecutive values.
+    
+    Pairs where either value is not positive have no return and are left out, as is
+    any pair that straddles the oldest value once it leaves the window.
+    """
+    
+    def __init__(self, window: int):
+        self.values: deque = deque(maxlen=window)
+        self.returns: deque = deque()  # Return into each value after the first, None where undefined
+        self.stats = RollingVariance()
+    
+    def push(self, value: float) -> Optional[float]:
+        """Append a value; returns the value that left the window, if any"""
+        values = self.values
+        evicted = None
+        if values.maxlen and len(values) == values.maxlen:
+            evicted = values[0]
+            if self.returns:
+                oldest = self.returns.popleft()
+                if oldest is not None:
+                    self.stats.remove(oldest)
+        
+        previous = values[-1] if values else 0.0
+        values.append(value)
+        if len(values) >= 2:
+            log_return = math.log(value / previous) if previous > 0 and value > 0 else None
+            self.returns.append(log_return)
+            if log_return is not None:
+                self.stats.add(log_return)
+        
+        return evicted
+    
+    def std(self) -> float:
+        """Population standard deviation of the returns in the window"""
+        return math.sqrt(self.stats.variance)
@@ -0,0 +1,206 @@
+"""
+Date-indexed access to multi-day spot price CSV files
+"""
+
+import os
+import csv
+import json
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+
+INDEX_EXTENSION = ".idx"
+SPOT_CACHE_MAX_DAYS = 64  # Parsed (file, date) series kept per process
+_FINGERPRINT_BYTES = 64
+
+_lock = threading.Lock()
+_indexes: Dict[str, Dict] = {}  # real path -> index dict
+_spot_cache: 'OrderedDict[Tuple[str, str, int, int], Dict[int, float]]' = OrderedDict()
+
+
+def _file_state(file_path: str) -> Tuple[int, int]:
+    """Size and nanosecond mtime used to detect file changes"""
+    stat = os.stat(file_path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _read_fingerprint(file_path: str) -> str:
+    """Leading bytes of the file, used to tell an appended file from a rewritten one"""
+    with open(file_path, 'rb') as file:
+        return file.read(_FINGERPRINT_BYTES).hex()
+
+
+def _add_range(ranges: Dict[str, List[List[int]]], date: str, start: int, end: int) -> None:
+    """Record a byte range for a date, merging it with an adjacent previous range"""
+    if not date or end <= start:
+        return
+    date_ranges = ranges.setdefault(date, [])
+    if date_ranges and date_ranges[-1][1] == start:
+        date_ranges[-1][1] = end
+    else:
+        date_ranges.append([start, end])
+
+
+def _scan_ranges(file_path: str, start: int, ranges: Dict[str, List[List[int]]]) -> None:
+    """Scan the file from a byte offset and add each date's contiguous row ranges"""
+    with open(file_path, 'rb') as file:
+        file.seek(start)
+        offset = start
+        current_date = None
+        range_start = start
+        
+        for line in file:
+            comma = line.find(b',')
+            date = line[:comma].decode('utf-8', 'replace') if comma > 0 else ""
+            if date != current_date:
+                if current_date is not None:
+                    _add_range(ranges, current_date, range_start, offset)
+                current_date = date
+                range_start = offset
+            offset += len(line)
+        
+        if current_date is not None:
+            _add_range(ranges, current_date, range_start, offset)
+
+
+def _build_index(file_path: str, previous: Optional[Dict]) -> Dict:
+    """
+    Build a date index, extending a previous index if the file was only appended to
+    
+    Each date also gets the file mtime at which its rows last changed, so an append
+    leaves earlier dates' caches fresh.
+    """
+    size, mtime_ns = _file_state(file_path)
+    fingerprint = _read_fingerprint(file_path)
+    ranges: Dict[str, List[List[int]]] = {}
+    day_mtimes: Dict[str, int] = {}
+    previous_ranges: Dict[str, List[List[int]]] = {}
+    resume_offset = 0
+    
+    if (previous and previous["fingerprint"] == fingerprint and previous["size"] < size
+            and previous["ranges"] and "day_mtimes" in previous):
+        # Appended file: re-scan from the start of the last indexed range, which may have grown
+        ranges = {date: [list(r) for r in date_ranges] for date, date_ranges in previous["ranges"].items()}
+        last_date = max(ranges, key=lambda date: ranges[date][-1][1])
+        resume_offset = ranges[last_date].pop()[0]
+        if not ranges[last_date]:
+            del ranges[last_date]
+        day_mtimes = dict(previous["day_mtimes"])
+        previous_ranges = previous["ranges"]
+    
+    _scan_ranges(file_path, resume_offset, ranges)
+    
+    for date, date_ranges in ranges.items():
+        if previous_ranges.get(date) != date_ranges:
+            day_mtimes[date] = mtime_ns
+    
+    return {"size": size, "mtime_ns": mtime_ns, "fingerprint": fingerprint, "ranges": ranges,
+            "day_mtimes": day_mtimes}
+
+
+def get_spot_index(file_path: str) -> Dict[str, List[List[int]]]:
+    """
+    Get the date -> [[start, end], ...] byte ranges for a spot CSV file.
+    
+    The index is persisted next to the CSV as <file>.idx and kept in memory per
+    process; it is rebuilt (or extended, for appended files) when the file changes.
+    """
+    return _load_index(file_path)["ranges"]
+
+
+def get_spot_day_mtime_ns(file_path: str, target_date: str) -> int:
+    """File mtime (ns) at which the date's rows last changed, 0 if the file has no rows for it"""
+    return _load_index(file_path)["day_mtimes"].get(target_date, 0)
+
+
+def _read_index_file(index_file: str) -> Optional[Dict]:
+    """A persisted index, None if it is missing or malformed"""
+    try:
+        with open(index_file, 'r') as file:
+            index = json.load(file)
+    except (OSError, ValueError):
+        return None
+    if (not isinstance(index, dict) or not isinstance(index.get("size"), int)
+            or not isinstance(index.get("mtime_ns"), int) or not isinstance(index.get("fingerprint"), str)
+            or not isinstance(index.get("ranges"), dict) or not isinstance(index.get("day_mtimes"), dict)):
+        return None
+    return index
+
+
+def _write_index_file(index_file: str, index: Dict) -> None:
+    """Write an index atomically, so concurrent readers never see a partial file"""
+    temp_file = f"{index_file}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temp_file, 'w') as file:
+        json.dump(index, file)
+    os.replace(temp_file, index_file)
+
+
+def _load_index(file_path: str) -> Dict:
+    """The current index of a spot CSV, from memory, the .idx file or a fresh scan"""
+    real_path = os.path.realpath(file_path)
+    size, mtime_ns = _file_state(real_path)
+    
+    with _lock:
+        index = _indexes.get(real_path)
+        if index and index["size"] == size and index["mtime_ns"] == mtime_ns:
+            return index
+        
+        index_file = real_path + INDEX_EXTENSION
+        if index is None:
+            index = _read_index_file(index_file)
+        
+        if not index or index["size"] != size or index["mtime_ns"] != mtime_ns:
+            index = _build_index(real_path, index)
+            try:
+                _write_index_file(index_file, index)
+            except OSError as e:
+                print(f"Error writing spot index {index_file}: {e}")
+        
+        _indexes[real_path] = index
+        return index
+
+
+def read_spot_day(file_path: str, target_date: str) -> Dict[int, float]:
+    """
+    Read one date's close prices from a multi-day spot CSV via the date index.
+    
+    Parsed series are shared across callers (e.g. "QQQ" and "QQQ 1DTE" reading the
+    same file) and must be treated as read-only.
+    """
+    real_path = os.path.realpath(file_path)
+    size, mtime_ns = _file_state(real_path)
+    cache_key = (real_path, target_date, size, mtime_ns)
+    
+    with _lock:
+        spot_data = _spot_cache.get(cache_key)
+        if spot_data is not None:
+            _spot_cache.move_to_end(cache_key)
+            return spot_data
+    
+    spot_data = {}
+    date_ranges = get_spot_index(real_path).get(target_date, [])
+    
+    with open(real_path, 'rb') as file:
+        for start, end in date_ranges:
+            file.seek(start)
+            chunk = file.read(end - start).decode('utf-8')
+            for row in csv.reader(chunk.splitlines()):
+                if len(row) >= 6 and row[0] == target_date:
+                    timestamp = int(row[1])
+                    close_price = float(row[5])  # Using close price
+                    spot_data[timestamp] = close_price
+    
+    with _lock:
+        _spot_cache[cache_key] = spot_data
+        while len(_spot_cache) > SPOT_CACHE_MAX_DAYS:
+            _spot_cache.popitem(last=False)
+    
+    return spot_data
+
+
+def clear_spot_cache() -> None:
+    """Drop in-memory spot indexes and parsed series (persisted .idx files are kept)"""
+    with _lock:
+        _indexes.clear()
+        _spot_cache.clear()
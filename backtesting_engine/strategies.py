@@ -2,8 +2,9 @@
 Concrete trading strategy implementations
 """
 
-from typing import Dict, List
+from typing import Dict, List, Mapping
 from .models import TradingSetup, Position, MarketData
+from .indicator_cache import DayIndicators
 
 
 class StraddleSetup(TradingSetup):
@@ -1479,8 +1480,20 @@ class MomentumReversalSetup(TradingSetup):
         self.strategy_type = strategy_type  # "MOMENTUM" or "REVERSION"
         self.momentum_threshold = momentum_threshold  # Minimum velocity for signal
         self.reversion_lookback = reversion_lookback  # Periods to look back for reversion
-        self.price_history = []  # Store recent price movements
-        self.velocity_history = []  # Store calculated velocities
+    
+    @property
+    def price_history(self) -> List[float]:
+        """Recent spot prices up to the current tick"""
+        if self.indicators is None:
+            return []
+        return self.indicators.recent_spot(self.reversion_lookback * 2)
+    
+    @property
+    def velocity_history(self) -> List[float]:
+        """Recent one-tick price velocities up to the current tick"""
+        if self.indicators is None:
+            return []
+        return self.indicators.recent_changes(self.reversion_lookback)
     
     def check_entry_condition(self, current_timeindex: int) -> bool:
         """Check if entry conditions are met based on momentum/reversion signals"""
@@ -1538,19 +1551,11 @@ class MomentumReversalSetup(TradingSetup):
     
     def update_price_data(self, market_data: MarketData):
         """Update price history for momentum/reversion analysis"""
-        self.price_history.append(market_data.spot_price)
-        
-        # Keep only recent history
-        if len(self.price_history) > self.reversion_lookback * 2:
-            self.price_history = self.price_history[-self.reversion_lookback:]
-        
-        # Calculate and store velocity
-        velocity = self.calculate_price_velocity(self.price_history)
-        self.velocity_history.append(velocity)
-        
-        # Keep velocity history manageable
-        if len(self.velocity_history) > self.reversion_lookback:
-            self.velocity_history = self.velocity_history[-self.reversion_lookback:]
+        # Bound setups add to the symbol's shared series; otherwise keep a private, spot-only one
+        if self.indicators is None or self.indicators.symbol != market_data.symbol:
+            self.indicators = DayIndicators(market_data.symbol, record_options=False).view()
+            self.indicators_bound = False
+        self.indicators.update(market_data)
     
     def select_strikes(self, spot_price: float, option_chain: Dict[str, Dict[float, float]]) -> Dict[str, float]:
         """Select strikes based on momentum direction"""
@@ -1655,8 +1660,7 @@ class MomentumReversalSetup(TradingSetup):
     
     def reset_daily_state(self):
         """Reset daily state for new trading day"""
-        self.price_history = []
-        self.velocity_history = []
+        self._reset_indicators()
 
 
 class VolatilitySkewSetup(TradingSetup):
@@ -1670,7 +1674,13 @@ class VolatilitySkewSetup(TradingSetup):
                         close_timeindex, strike_selection, scalping_price, strikes_away)
         self.skew_threshold = skew_threshold  # Minimum IV difference for signal
         self.iv_history = {}  # Store IV estimates by strike
-        self.price_history = {}  # Store price history by strike for IV calculation
+    
+    @property
+    def price_history(self) -> Mapping[str, List[float]]:
+        """Recent prices of each option ("CE_580.0") up to the current tick"""
+        if self.indicators is None:
+            return {}
+        return self.indicators.recent_option_prices(20)
     
     def check_entry_condition(self, current_timeindex: int) -> bool:
         """Check if entry conditions are met based on volatility skew"""
@@ -1683,11 +1693,12 @@ class VolatilitySkewSetup(TradingSetup):
     def estimate_relative_iv(self, option_prices: Dict[float, float]) -> Dict[float, float]:
         """Estimate relative implied volatility from option price changes"""
         relative_iv = {}
+        price_history = self.price_history
         
         for strike, price in option_prices.items():
-            if strike in self.price_history and len(self.price_history[strike]) >= 2:
+            if strike in price_history and len(price_history[strike]) >= 2:
                 # Simple IV proxy: price volatility over recent periods
-                prices = self.price_history[strike]
+                prices = price_history[strike]
                 if len(prices) >= 3:
                     # Calculate price volatility as proxy for IV
                     price_changes = [abs(prices[i] - prices[i-1]) / prices[i-1] 
@@ -1728,21 +1739,11 @@ class VolatilitySkewSetup(TradingSetup):
     
     def update_iv_data(self, market_data: MarketData):
         """Update IV history for skew analysis"""
-        for option_type in ["CE", "PE"]:
-            if option_type not in market_data.option_prices:
-                continue
-            
-            for strike, price in market_data.option_prices[option_type].items():
-                strike_key = f"{option_type}_{strike}"
-                
-                if strike_key not in self.price_history:
-                    self.price_history[strike_key] = []
-                
-                self.price_history[strike_key].append(price)
-                
-                # Keep only recent history
-                if len(self.price_history[strike_key]) > 20:
-                    self.price_history[strike_key] = self.price_history[strike_key][-10:]
+        # Bound setups add to the symbol's shared series; otherwise keep a private one
+        if self.indicators is None or self.indicators.symbol != market_data.symbol:
+            self.indicators = DayIndicators(market_data.symbol).view()
+            self.indicators_bound = False
+        self.indicators.update(market_data)
         
         # Update IV estimates
         for option_type in ["CE", "PE"]:
@@ -1820,7 +1821,7 @@ class VolatilitySkewSetup(TradingSetup):
     def reset_daily_state(self):
         """Reset daily state for new trading day"""
         self.iv_history = {}
-        self.price_history = {}
+        self._reset_indicators()
 
 
 class TimeDecaySetup(TradingSetup):
@@ -0,0 +1,177 @@
+"""
+Columnar trade log: completed trades stored as flat arrays, with Trade objects built on access
+"""
+
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional
+from .models import Trade
+
+
+class StringTable:
+    """Intern strings to small integer ids"""
+    
+    def __init__(self):
+        self.strings: List[str] = []
+        self.ids: Dict[str, int] = {}
+    
+    def intern(self, value: str) -> int:
+        """Id of a string, adding it on first use"""
+        string_id = self.ids.get(value)
+        if string_id is None:
+            string_id = self.ids[value] = len(self.strings)
+            self.strings.append(value)
+        return string_id
+
+
+class FlatDicts:
+    """
+    A sequence of {str: float} dicts stored as flat (key id, value) pairs.
+    
+    Dict i is pairs offsets[i]:offsets[i + 1]. Dicts holding anything other than
+    string keys and float values are kept as-is, so every dict reads back unchanged.
+    """
+    
+    def __init__(self, strings: StringTable):
+        self.strings = strings
+        self.offsets = array('q', [0])
+        self.keys = array('i')
+        self.values = array('d')
+        self.irregular: Dict[int, Dict] = {}
+    
+    def append(self, values: Dict) -> None:
+        """Store the next dict"""
+        if all(type(key) is str and type(value) is float for key, value in values.items()):
+            intern = self.strings.intern
+            for key, value in values.items():
+                self.keys.append(intern(key))
+                self.values.append(value)
+        else:
+            self.irregular[len(self.offsets) - 1] = dict(values)
+        self.offsets.append(len(self.keys))
+    
+    def get(self, index: int) -> Dict:
+        """A fresh copy of dict index"""
+        irregular = self.irregular.get(index)
+        if irregular is not None:
+            return dict(irregular)
+        strings = self.strings.strings
+        start, end = self.offsets[index], self.offsets[index + 1]
+        return {strings[key]: value for key, value in zip(self.keys[start:end], self.values[start:end])}
+
+
+class TradeLog:
+    """
+    Append-only log of completed trades kept in columnar arrays.
+    
+    Behaves like a list of Trade: len(), indexing, slicing and iteration build Trade
+    objects on demand, so long backtests hold a few arrays and an interned string
+    table instead of one object and three dicts per trade. Aggregations can read the
+    pnl, setup/symbol id and time columns directly. Trades are copied in on append;
+    changing a Trade read back from the log does not change the log.
+    """
+    
+    def __init__(self, trades: Iterable[Trade] = ()):
+        self.strings = StringTable()
+        
+        self.setup_ids = array('i')  # Ids into strings
+        self.symbols = array('i')
+        self.dates = array('i')
+        self.exit_reasons = array('i')
+        self.entry_timeindex = array('q')
+        self.exit_timeindex = array('q')
+        self.quantity = array('i')
+        self.rebalance_count = array('i')
+        self.pnl = array('d')
+        self.gamma_pnl = array('d')
+        self.theta_pnl = array('d')
+        self.final_delta = array('d')
+        
+        self.entry_prices = FlatDicts(self.strings)
+        self.exit_prices = FlatDicts(self.strings)
+        self.strikes = FlatDicts(self.strings)
+        
+        self.extend(trades)
+    
+    def append(self, trade: Trade) -> None:
+        """Add one completed trade"""
+        intern = self.strings.intern
+        self.setup_ids.append(intern(trade.setup_id))
+        self.symbols.append(intern(trade.symbol))
+        self.dates.append(intern(trade.date))
+        self.exit_reasons.append(intern(trade.exit_reason))
+        self.entry_timeindex.append(trade.entry_timeindex)
+        self.exit_timeindex.append(trade.exit_timeindex)
+        self.quantity.append(trade.quantity)
+        self.rebalance_count.append(trade.rebalance_count)
+        self.pnl.append(trade.pnl)
+        self.gamma_pnl.append(trade.gamma_pnl)
+        self.theta_pnl.append(trade.theta_pnl)
+        self.final_delta.append(trade.final_delta)
+        
+        self.entry_prices.append(trade.entry_prices)
+        self.exit_prices.append(trade.exit_prices)
+        self.strikes.append(trade.strikes)
+    
+    def extend(self, trades: Iterable[Trade]) -> None:
+        """Add completed trades in order"""
+        for trade in trades:
+            self.append(trade)
+    
+    def string_id(self, value: str) -> Optional[int]:
+        """Id of a setup_id, symbol, date or exit reason, or None if no trade uses it"""
+        return self.strings.ids.get(value)
+    
+    def select(self, setup_id: Optional[str] = None, symbol: Optional[str] = None) -> List[Trade]:
+        """Trades matching a setup_id and/or symbol, filtered on the id columns before building objects"""
+        setup_key = self.string_id(setup_id) if setup_id is not None else None
+        symbol_key = self.string_id(symbol) if symbol is not None else None
+        if (setup_id is not None and setup_key is None) or (symbol is not None and symbol_key is None):
+            return []
+        return [self.get_trade(index) for index in range(len(self.pnl))
+                if (setup_key is None or self.setup_ids[index] == setup_key)
+                and (symbol_key is None or self.symbols[index] == symbol_key)]
+    
+    def get_trade(self, index: int) -> Trade:
+        """Build the Trade at index"""
+        strings = self.strings.strings
+        return Trade(
+            setup_id=strings[self.setup_ids[index]],
+            entry_timeindex=self.entry_timeindex[index],
+            exit_timeindex=self.exit_timeindex[index],
+            entry_prices=self.entry_prices.get(index),
+            exit_prices=self.exit_prices.get(index),
+            strikes=self.strikes.get(index),
+            quantity=self.quantity[index],
+            pnl=self.pnl[index],
+            exit_reason=strings[self.exit_reasons[index]],
+            date=strings[self.dates[index]],
+            symbol=strings[self.symbols[index]],
+            gamma_pnl=self.gamma_pnl[index],
+            theta_pnl=self.theta_pnl[index],
+            final_delta=self.final_delta[index],
+            rebalance_count=self.rebalance_count[index]
+        )
+    
+    def __len__(self) -> int:
+        return len(self.pnl)
+    
+    def __iter__(self) -> Iterator[Trade]:
+        for index in range(len(self.pnl)):
+            yield self.get_trade(index)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.get_trade(i) for i in range(*index.indices(len(self.pnl)))]
+        if index < 0:
+            index += len(self.pnl)
+        if not 0 <= index < len(self.pnl):
+            raise IndexError("trade index out of range")
+        return self.get_trade(index)
+    
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (TradeLog, list)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+    
+    def __repr__(self) -> str:
+        return f"TradeLog({len(self)} trades)"
@@ -0,0 +1,194 @@
+"""
+One-pass grouped trade statistics, updated as trades close
+"""
+
+from array import array
+from itertools import product
+from typing import Dict, Iterable, List, Optional, Tuple
+from .models import Trade
+
+
+class DrawdownTracker:
+    """Running peak and maximum drawdown of an equity series starting at zero"""
+    
+    __slots__ = ("peak_pnl", "trough_pnl", "max_drawdown")
+    
+    def __init__(self):
+        self.peak_pnl = 0.0
+        self.trough_pnl = 0.0
+        self.max_drawdown = 0.0
+    
+    def update(self, equity: float) -> None:
+        """Account for the next equity value"""
+        if equity > self.peak_pnl:
+            self.peak_pnl = equity
+        elif equity < self.trough_pnl:
+            self.trough_pnl = equity
+        drawdown = self.peak_pnl - equity
+        if drawdown > self.max_drawdown:
+            self.max_drawdown = drawdown
+    
+    def extend(self, other: 'DrawdownTracker', offset: float) -> None:
+        """Continue with a series tracked separately that started at equity offset instead of zero"""
+        self.max_drawdown = max(self.max_drawdown, other.max_drawdown, self.peak_pnl - (offset + other.trough_pnl))
+        self.peak_pnl = max(self.peak_pnl, offset + other.peak_pnl)
+        self.trough_pnl = min(self.trough_pnl, offset + other.trough_pnl)
+
+
+class PnLStats(DrawdownTracker):
+    """Running P&L statistics for one group of trades, in close order"""
+    
+    __slots__ = ("total_pnl", "trades", "wins", "losses", "win_pnl", "loss_pnl",
+                 "best_pnl", "worst_pnl", "total_duration")
+    
+    def __init__(self):
+        super().__init__()
+        self.total_pnl = 0.0
+        self.trades = 0
+        self.wins = 0
+        self.losses = 0
+        self.win_pnl = 0.0
+        self.loss_pnl = 0.0
+        self.best_pnl = 0.0  # Largest win, 0.0 until there is one
+        self.worst_pnl = 0.0  # Largest loss, 0.0 until there is one
+        self.total_duration = 0
+    
+    def add(self, pnl: float, duration: int) -> None:
+        """Account for one closed trade"""
+        self.total_pnl += pnl
+        self.trades += 1
+        self.total_duration += duration
+        if pnl > 0:
+            self.wins += 1
+            self.win_pnl += pnl
+            if pnl > self.best_pnl:
+                self.best_pnl = pnl
+        elif pnl < 0:
+            self.losses += 1
+            self.loss_pnl += pnl
+            if pnl < self.worst_pnl:
+                self.worst_pnl = pnl
+        
+        # Drawdown of the group's cumulative closed P&L
+        self.update(self.total_pnl)
+    
+    @property
+    def win_rate(self) -> float:
+        return self.wins / self.trades if self.trades else 0.0
+    
+    @property
+    def avg_win(self) -> float:
+        return self.win_pnl / self.wins if self.wins else 0.0
+    
+    @property
+    def avg_loss(self) -> float:
+        return self.loss_pnl / self.losses if self.losses else 0.0
+    
+    @property
+    def avg_duration(self) -> float:
+        return self.total_duration / self.trades if self.trades else 0.0
+
+
+class EquityCurve:
+    """Cumulative closed P&L of a group after each of its trades"""
+    
+    def __init__(self):
+        self.trade_indices = array('l')  # Position of the trade in the trade log
+        self.equity = array('d')
+    
+    def __len__(self) -> int:
+        return len(self.equity)
+
+
+class TradeAggregator:
+    """
+    P&L statistics for every (setup_id, symbol, regime, date) group and all of their rollups.
+    
+    Each closed trade updates its own group and the 15 rollups where any of the four
+    keys is a wildcard, so results and reports read totals, win/loss counts and
+    drawdowns in O(1) instead of rescanning the trade log. Groups see trades in
+    close order, so sums match a sequential pass over the log exactly.
+    
+    Closed-trade equity curves are kept overall, per setup and per symbol. When the
+    engine marks open positions each tick, mark_equity() also tracks drawdowns of
+    realized plus unrealized P&L for the same groups.
+    """
+    
+    def __init__(self):
+        self.groups: Dict[Tuple, PnLStats] = {}
+        self.equity_curves: Dict[Tuple, EquityCurve] = {}  # (setup_id, symbol), one of them None
+        self.mtm_drawdowns: Dict[Tuple, DrawdownTracker] = {}  # (setup_id, symbol), one of them None
+        self.exit_reasons: Dict[str, int] = {}
+        self.trade_tags: List[Tuple[str, str]] = []  # (regime, date) per trade, in close order
+        self._empty = PnLStats()
+    
+    @classmethod
+    def from_trades(cls, trades: Iterable[Trade]) -> 'TradeAggregator':
+        """Aggregate an existing trade list, using each trade's own date and an unknown regime"""
+        aggregator = cls()
+        for trade in trades:
+            aggregator.add(trade, "UNKNOWN", trade.date)
+        return aggregator
+    
+    def add(self, trade: Trade, regime: str, date: str) -> None:
+        """Account for a trade closed in a regime on a trading date"""
+        pnl = trade.pnl
+        duration = trade.exit_timeindex - trade.entry_timeindex
+        groups = self.groups
+        for key in product((trade.setup_id, None), (trade.symbol, None), (regime, None), (date, None)):
+            stats = groups.get(key)
+            if stats is None:
+                stats = groups[key] = PnLStats()
+            stats.add(pnl, duration)
+        
+        trade_index = len(self.trade_tags)
+        for key in ((None, None), (trade.setup_id, None), (None, trade.symbol)):
+            curve = self.equity_curves.get(key)
+            if curve is None:
+                curve = self.equity_curves[key] = EquityCurve()
+            curve.trade_indices.append(trade_index)
+            curve.equity.append(groups[key + (None, None)].total_pnl)
+        
+        self.exit_reasons[trade.exit_reason] = self.exit_reasons.get(trade.exit_reason, 0) + 1
+        self.trade_tags.append((regime, date))
+    
+    def stats(self, setup_id: Optional[str] = None, symbol: Optional[str] = None,
+              regime: Optional[str] = None, date: Optional[str] = None) -> PnLStats:
+        """Statistics for a group; None matches everything. Unseen groups are empty"""
+        return self.groups.get((setup_id, symbol, regime, date), self._empty)
+    
+    def equity_curve(self, setup_id: Optional[str] = None, symbol: Optional[str] = None) -> EquityCurve:
+        """Closed-trade equity curve overall, for a setup or for a symbol"""
+        return self.equity_curves.get((setup_id, symbol)) or EquityCurve()
+    
+    def mark_equity(self, equity: float, setup_id: Optional[str] = None, symbol: Optional[str] = None) -> None:
+        """Record realized plus unrealized P&L overall, for a setup or for a symbol"""
+        tracker = self.mtm_drawdowns.get((setup_id, symbol))
+        if tracker is None:
+            tracker = self.mtm_drawdowns[(setup_id, symbol)] = DrawdownTracker()
+        tracker.update(equity)
+    
+    def mtm_max_drawdown(self, setup_id: Optional[str] = None, symbol: Optional[str] = None) -> float:
+        """Largest mark-to-market drawdown recorded by mark_equity, 0.0 if never marked"""
+        tracker = self.mtm_drawdowns.get((setup_id, symbol))
+        return tracker.max_drawdown if tracker is not None else 0.0
+    
+    def extend_mtm(self, other: 'TradeAggregator') -> None:
+        """
+        Continue mark-to-market drawdowns with those of a later run of days.
+        
+        Call before adding the other run's trades: its equity started at zero, where
+        this aggregator's started at the closed P&L so far.
+        """
+        for (setup_id, symbol), tracker in other.mtm_drawdowns.items():
+            offset = self.stats(setup_id=setup_id, symbol=symbol).total_pnl
+            own = self.mtm_drawdowns.get((setup_id, symbol))
+            if own is None:
+                own = self.mtm_drawdowns[(setup_id, symbol)] = DrawdownTracker()
+            own.extend(tracker, offset)
+    
+    def values(self, dimension: str) -> List[str]:
+        """Distinct setup_id, symbol, regime or date values seen, in first-seen order"""
+        position = ("setup_id", "symbol", "regime", "date").index(dimension)
+        return [key[position] for key in self.groups
+                if key[position] is not None and all(part is None for i, part in enumerate(key) if i != position)]
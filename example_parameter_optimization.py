@@ -17,6 +17,7 @@ from backtesting_engine.strategies import (
     TimeDecaySetup, GammaScalpingSetup
 )
 from backtesting_engine.reporting import BacktestReporter
+from backtesting_engine.parameter_sweep import ParameterSweep, calculate_sharpe_ratio, calculate_profit_factor
 
 
 def optimize_straddle_parameters():
@@ -131,6 +132,33 @@ def optimize_straddle_parameters():
     return sorted_results
 
 
+def sweep_straddle_grid():
+    """
+    Full-grid straddle sweep evaluated in parallel with ParameterSweep
+    """
+    print("\n🧮 Straddle Grid Sweep (parallel)")
+    print("=" * 60)
+    
+    sweep = ParameterSweep(
+        StraddleSetup,
+        parameter_grid={
+            'target_pct': [0.25, 0.35, 0.50, 0.75, 1.00],
+            'stop_loss_pct': [1.00, 1.50, 2.00, 2.50, 3.00],
+            'entry_timeindex': [800, 1000, 1200, 1500, 2000],
+            'scalping_price': [0.25, 0.30, 0.35, 0.40, 0.50]
+        },
+        fixed_parameters={'strike_selection': "premium"},
+        data_path="5SecData",
+        daily_max_loss=500.0,
+        enable_dynamic_management=False
+    )
+    
+    results = sweep.run("QQQ", "2025-08-13", "2025-08-15")
+    print(ParameterSweep.format_table(results, sort_by="total_pnl", limit=10))
+    
+    return results
+
+
 def optimize_multi_leg_strategies():
     """
     Parameter optimization for complex multi-leg strategies
@@ -516,34 +544,6 @@ def run_comprehensive_optimization():
     return optimized_results
 
 
-def calculate_sharpe_ratio(results) -> float:
-    """Calculate Sharpe ratio for backtest results"""
-    if not results.daily_results or len(results.daily_results) < 2:
-        return 0.0
-    
-    daily_returns = [day.daily_pnl for day in results.daily_results]
-    
-    if len(daily_returns) < 2:
-        return 0.0
-    
-    mean_return = sum(daily_returns) / len(daily_returns)
-    variance = sum((r - mean_return) ** 2 for r in daily_returns) / (len(daily_returns) - 1)
-    std_dev = variance ** 0.5
-    
-    return mean_return / std_dev if std_dev > 0 else 0.0
-
-
-def calculate_profit_factor(results) -> float:
-    """Calculate profit factor (gross profit / gross loss)"""
-    if not results.trade_log:
-        return 0.0
-    
-    gross_profit = sum(trade.pnl for trade in results.trade_log if trade.pnl > 0)
-    gross_loss = abs(sum(trade.pnl for trade in results.trade_log if trade.pnl < 0))
-    
-    return gross_profit / gross_loss if gross_loss > 0 else float('inf')
-
-
 if __name__ == "__main__":
     print("🎯 Advanced Parameter Optimization Examples")
     print("=" * 70)
@@ -551,6 +551,7 @@ if __name__ == "__main__":
     # Run individual optimization modules
     print("Running individual parameter optimizations...")
     optimize_straddle_parameters()
+    sweep_straddle_grid()
     optimize_multi_leg_strategies()
     optimize_pattern_recognition_parameters()
     optimize_risk_management_parameters()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Shared fixtures for the test modules: on-disk trading days, trades and reference statistics
+"""
+
+import os
+import math
+import csv
+import random
+
+from backtesting_engine.models import Trade
+
+
+def write_trading_day(test_dir, symbol, date, suffix="", timestamps=range(1000, 1100, 5), drift=0.0):
+    """Write a three-strike option day, its spot file and .prop file"""
+    symbol_dir = os.path.join(test_dir, symbol)
+    os.makedirs(os.path.join(symbol_dir, "Spot"), exist_ok=True)
+    
+    with open(os.path.join(symbol_dir, f"{date}{suffix}_BK.csv"), 'w', newline='') as f:
+        writer = csv.writer(f)
+        for i, timestamp in enumerate(timestamps):
+            for strike in [575.0, 580.0, 585.0]:
+                writer.writerow([timestamp, "CE", strike, round(max(0.05, 582.0 - strike + 2.0 + drift * i), 2)])
+                writer.writerow([timestamp, "PE", strike, round(max(0.05, strike - 582.0 + 2.0 - drift * i), 2)])
+    
+    with open(os.path.join(symbol_dir, "Spot", f"{symbol.split()[0].lower()}.csv"), 'w', newline='') as f:
+        writer = csv.writer(f)
+        for i, timestamp in enumerate(timestamps):
+            writer.writerow([date, timestamp, 582.0, 582.0, 582.0, 582.0 + drift * i])
+    
+    with open(os.path.join(symbol_dir, f"{date}{suffix}.prop"), 'w') as f:
+        f.write(f"jobEndIdx={timestamps[-1]}\n")
+
+
+def write_wavy_day(test_dir, date, phase):
+    """Write a QQQ day whose straddle value oscillates so targets and stops get hit"""
+    symbol_dir = os.path.join(test_dir, "QQQ")
+    os.makedirs(os.path.join(symbol_dir, "Spot"), exist_ok=True)
+    timestamps = range(1000, 1400, 5)
+    
+    with open(os.path.join(symbol_dir, f"{date}_BK.csv"), 'w', newline='') as f:
+        writer = csv.writer(f)
+        for i, timestamp in enumerate(timestamps):
+            for strike in [575.0, 580.0, 585.0]:
+                ce = max(0.05, 582.0 - strike + 2.0 + 1.5 * math.sin(i / 7.0 + phase))
+                pe = max(0.05, strike - 582.0 + 2.0 + 1.2 * math.cos(i / 11.0 + phase) - 0.01 * i)
+                writer.writerow([timestamp, "CE", strike, round(ce, 2)])
+                writer.writerow([timestamp, "PE", strike, round(pe, 2)])
+    
+    spot_file = os.path.join(symbol_dir, "Spot", "qqq.csv")
+    with open(spot_file, 'a', newline='') as f:
+        writer = csv.writer(f)
+        for timestamp in timestamps:
+            writer.writerow([date, timestamp, 582.0, 582.0, 582.0, 582.0])
+    
+    with open(os.path.join(symbol_dir, f"{date}.prop"), 'w') as f:
+        f.write("jobEndIdx=1350\n")
+
+
+def make_trade(index, **overrides):
+    """A straddle-like trade with distinct values per index"""
+    fields = dict(
+        setup_id=f"setup{index % 3}", entry_timeindex=1000 + index, exit_timeindex=1100 + index,
+        entry_prices={"CE": 2.5 + index, "PE": 1.25}, exit_prices={"CE": 2.0, "PE": 1.5 + index},
+        strikes={"CE": 580.0, "PE": 575.0}, quantity=1, pnl=10.0 * index - 15.0, exit_reason="TARGET",
+        date="2025-08-13", symbol="QQQ" if index % 2 else "SPY"
+    )
+    fields.update(overrides)
+    return Trade(**fields)
+
+
+def pearson(xs, ys):
+    """Correlation of two equal-length lists, recomputed from scratch"""
+    n = len(xs)
+    x_mean, y_mean = sum(xs) / n, sum(ys) / n
+    covariance = sum((x - x_mean) * (y - y_mean) for x, y in zip(xs, ys))
+    x_var = sum((x - x_mean) ** 2 for x in xs)
+    y_var = sum((y - y_mean) ** 2 for y in ys)
+    return covariance / math.sqrt(x_var * y_var) if x_var > 0 and y_var > 0 else 0.0
+
+
+def random_walk(count, seed, start=580.0, step=0.0008):
+    """Positive random walk prices"""
+    rng = random.Random(seed)
+    prices = []
+    price = start
+    for _ in range(count):
+        price *= math.exp(rng.gauss(0.0, step))
+        prices.append(price)
+    return prices
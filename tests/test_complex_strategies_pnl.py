@@ -5,6 +5,10 @@ Tests for complex multi-leg strategy P&L calculations
 
 import sys
 import os
+import copy
+import math
+import random
+import tempfile
 import unittest
 from unittest.mock import Mock, patch
 
@@ -12,10 +16,15 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from backtesting_engine.strategies import (
     IronCondorSetup, ButterflySetup, VerticalSpreadSetup, 
-    RatioSpreadSetup, GammaScalpingSetup
+    RatioSpreadSetup, GammaScalpingSetup, StraddleSetup,
+    CEScalpingSetup, PEScalpingSetup, TimeDecaySetup
 )
 from backtesting_engine.position_manager import PositionManager
+from backtesting_engine.backtest_engine import BacktestEngine
+from backtesting_engine.option_chain import ColumnarOptionData
+from backtesting_engine.day_cache import shared_day_cache
 from backtesting_engine.models import MarketData, Position
+from helpers import write_wavy_day
 
 
 class TestComplexStrategyPnL(unittest.TestCase):
@@ -429,13 +438,234 @@ class TestComplexStrategyPnL(unittest.TestCase):
                 self.assertFalse(math.isinf(updated_position.current_pnl), 
                                "P&L should not be infinite in extreme scenarios")
 
+    
+    def test_leg_table_matches_key_parsing(self):
+        """Pre-parsed legs should reproduce the per-key parsing P&L exactly"""
+        setups = [
+            IronCondorSetup(setup_id="ic", target_pct=50.0, stop_loss_pct=200.0, entry_timeindex=1000),
+            ButterflySetup(setup_id="bf", target_pct=40.0, stop_loss_pct=80.0, entry_timeindex=1000,
+                           wing_distance=5, butterfly_type="CALL"),
+            VerticalSpreadSetup(setup_id="vs", target_pct=50.0, stop_loss_pct=100.0, entry_timeindex=1000),
+            RatioSpreadSetup(setup_id="rs", target_pct=50.0, stop_loss_pct=100.0, entry_timeindex=1000)
+        ]
+        moved_market = self.create_price_movement_scenario(583.0, 0.5)
+        
+        for setup in setups:
+            for position in setup.create_positions(self.market_data):
+                with self.subTest(setup=setup.setup_id):
+                    expected = 0.0
+                    for option_key, entry_price in position.entry_prices.items():
+                        leg = self.position_manager._parse_option_key(option_key, position)
+                        price = moved_market.option_prices.get(leg['option_type'], {}).get(leg['strike'])
+                        if price is not None:
+                            expected += self.position_manager._calculate_leg_pnl(
+                                entry_price, price, leg['action'], leg['quantity'],
+                                position.lot_size, position.slippage)
+                    
+                    self.position_manager.add_position(position)
+                    self.assertEqual(len(position.legs), len(position.entry_prices))
+                    self.assertEqual(self.position_manager._calculate_position_pnl(position, moved_market), expected)
+                    
+                    trade = self.position_manager._close_position(position, moved_market, "TEST")
+                    self.assertEqual(trade.pnl, expected)
+                    self.assertEqual(list(trade.exit_prices), list(position.entry_prices))
+
+
+class TestVectorizedPositionBook(unittest.TestCase):
+    """Test that whole-book mark-to-market matches per-position updates"""
+    
+    def make_chains(self, seed):
+        """Random-walk option chains with occasional missing quotes"""
+        rng = random.Random(seed)
+        strikes = [570.0, 575.0, 580.0, 585.0, 590.0, 595.0]
+        base = {"CE": {strike: max(0.05, 585.0 - strike) + 2.0 for strike in strikes},
+                "PE": {strike: max(0.05, strike - 575.0) + 2.0 for strike in strikes}}
+        chains = {}
+        for timestamp in range(1000, 1400, 5):
+            chain = {}
+            for option_type, prices in base.items():
+                for strike in strikes:
+                    prices[strike] = max(0.05, round(prices[strike] + rng.uniform(-0.4, 0.4), 2))
+                    if rng.random() > 0.05:
+                        chain.setdefault(option_type, {})[strike] = prices[strike]
+            chains[timestamp] = chain
+        return chains
+    
+    def run_manager(self, manager, positions, ticks):
+        """Feed positions and ticks, returning (timestamp, pnls, trades) per tick"""
+        history = []
+        positions = copy.deepcopy(positions)
+        for index, (timestamp, option_prices) in enumerate(ticks):
+            if index % 7 == 0 and positions:
+                manager.add_position(positions.pop())
+            market_data = MarketData(timestamp=timestamp, symbol="QQQ", spot_price=580.0,
+                                     option_prices=option_prices, available_strikes=[])
+            trades = manager.update_positions(market_data)
+            history.append((timestamp, [position.current_pnl for position in manager.positions.values()],
+                            [(trade.setup_id, trade.pnl, trade.exit_reason, trade.exit_prices) for trade in trades]))
+        return history
+    
+    def test_book_matches_per_position_updates(self):
+        """Vectorized updates should reproduce P&L and exits exactly on dict and columnar chains"""
+        market_data = MarketData(timestamp=1000, symbol="QQQ", spot_price=580.0,
+                                 option_prices=self.make_chains(0)[1000],
+                                 available_strikes=[570.0, 575.0, 580.0, 585.0, 590.0, 595.0])
+        setups = [
+            StraddleSetup("straddle", target_pct=40.0, stop_loss_pct=60.0, entry_timeindex=1000, close_timeindex=1300),
+            IronCondorSetup("condor", target_pct=50.0, stop_loss_pct=150.0, entry_timeindex=1000),
+            ButterflySetup("butterfly", target_pct=40.0, stop_loss_pct=80.0, entry_timeindex=1000, wing_distance=5),
+            RatioSpreadSetup("ratio", target_pct=50.0, stop_loss_pct=100.0, entry_timeindex=1000),
+            VerticalSpreadSetup("vertical", target_pct=30.0, stop_loss_pct=50.0, entry_timeindex=1000)
+        ]
+        positions = [position for setup in setups for position in setup.create_positions(market_data)] * 3
+        self.assertGreater(len(positions), 10)
+        
+        for seed in range(3):
+            chains = self.make_chains(seed)
+            columnar = ColumnarOptionData.from_nested(chains)
+            for ticks in (list(chains.items()), [(timestamp, columnar[timestamp]) for timestamp in columnar]):
+                expected = self.run_manager(PositionManager(), positions, ticks)
+                actual = self.run_manager(PositionManager(vectorized=True), positions, ticks)
+                self.assertEqual(actual, expected)
+                self.assertTrue(any(trades for _, _, trades in expected))
+    
+    def test_single_leg_triggers_match_polling(self):
+        """Many single-leg positions on the same contracts should exit on exactly the polled ticks"""
+        rng = random.Random(7)
+        positions = []
+        for index in range(60):
+            option_type = rng.choice(["CE", "PE"])
+            action = rng.choice(["SELL", "BUY"])
+            positions.append(Position(
+                setup_id=f"scalp{index}", entry_timeindex=1000,
+                entry_prices={f"{option_type}_{rng.choice([580.0, 585.0])}_{action}": round(rng.uniform(1.0, 8.0), 2)},
+                strikes={}, quantity=1, target_pnl=rng.choice([0.0, 10.0, 35.0, 80.0]),
+                stop_loss_pnl=-rng.choice([0.0, 20.0, 50.0, 120.0]), position_type=action,
+                force_close_timeindex=rng.choice([1200, 1300, 4650])))
+        
+        for seed in range(3):
+            chains = self.make_chains(seed)
+            columnar = ColumnarOptionData.from_nested(chains)
+            for ticks in (list(chains.items()), [(timestamp, columnar[timestamp]) for timestamp in columnar]):
+                expected = self.run_manager(PositionManager(), positions, ticks)
+                actual = self.run_manager(PositionManager(vectorized=True), positions, ticks)
+                self.assertEqual(actual, expected)
+                exit_reasons = {reason for _, _, trades in expected for _, _, reason, _ in trades}
+                self.assertTrue({"TARGET", "STOP_LOSS"} <= exit_reasons)
+    
+    def test_unchanged_quotes_skip_positions(self):
+        """A tick repeating the previous quotes should re-mark and exit nothing"""
+        chains = self.make_chains(1)
+        chain = chains[1000]
+        market_data = MarketData(timestamp=1000, symbol="QQQ", spot_price=580.0, option_prices=chain,
+                                 available_strikes=[570.0, 575.0, 580.0, 585.0, 590.0, 595.0])
+        manager = PositionManager(vectorized=True)
+        for position in StraddleSetup("straddle", target_pct=500.0, stop_loss_pct=500.0,
+                                      entry_timeindex=1000).create_positions(market_data):
+            manager.add_position(position)
+        manager.update_positions(market_data)
+        
+        book = manager._get_book()
+        self.assertEqual(book.update(chain, 1005), ([], []))
+        
+        moved = copy.deepcopy(chain)
+        moved["CE"][book.positions[0].strikes["CE"]] += 0.5
+        changed_pnls, exits = book.update(moved, 1010)
+        self.assertEqual(changed_pnls, [0])
+        self.assertEqual(exits, [])
+    
+    def test_closes_keep_the_book(self):
+        """Closing positions retires their slots in place and later ticks still match polling"""
+        rng = random.Random(11)
+        positions = [Position(
+            setup_id=f"scalp{index % 4}", entry_timeindex=1000,
+            entry_prices={f"{rng.choice(['CE', 'PE'])}_{rng.choice([580.0, 585.0])}_SELL": round(rng.uniform(1.0, 8.0), 2)},
+            strikes={}, quantity=1, target_pnl=80.0, stop_loss_pnl=-120.0, position_type="SELL",
+            force_close_timeindex=rng.choice([1200, 4650])) for index in range(40)]
+        ticks = list(self.make_chains(2).items())
+        
+        managers = [PositionManager(), PositionManager(vectorized=True)]
+        history = [[], []]
+        for manager in managers:
+            for position in copy.deepcopy(positions):
+                manager.add_position(position)
+        book = None
+        for tick_index, (timestamp, option_prices) in enumerate(ticks):
+            market_data = MarketData(timestamp=timestamp, symbol="QQQ", spot_price=580.0,
+                                     option_prices=option_prices, available_strikes=[])
+            for manager, record in zip(managers, history):
+                trades = manager.update_positions(market_data)
+                if tick_index == 10:
+                    trades += manager.close_setup_positions("scalp1", market_data)
+                record.append(([position.current_pnl for position in manager.positions.values()],
+                               [(trade.setup_id, trade.pnl, trade.exit_reason) for trade in trades],
+                               manager.unrealized_pnl))
+            if tick_index == 0:
+                book = managers[1]._book
+        
+        self.assertEqual(history[1], history[0])
+        self.assertIs(managers[1]._book, book)
+        self.assertEqual(len(book), len(managers[1].positions))
+        self.assertEqual(set(book.indices), set(managers[1].positions))
+        self.assertEqual(book.dead, len(positions) - len(managers[1].positions))
+        self.assertGreaterEqual(book.dead, 10)
+        self.assertTrue(all(entry[1] in book.indices.values() for entry in book.force_close_schedule))
+    
+    def test_marks_positions_added_directly(self):
+        """Positions placed in the dict without add_position are marked without missing totals"""
+        chain = self.make_chains(1)
+        timestamp, option_prices = next(iter(chain.items()))
+        market_data = MarketData(timestamp=timestamp, symbol="QQQ", spot_price=580.0,
+                                 option_prices=option_prices, available_strikes=[])
+        for vectorized in (False, True):
+            manager = PositionManager(vectorized=vectorized)
+            position = Position(setup_id="manual", entry_timeindex=1000, entry_prices={"CE_580.0_SELL": 100.0},
+                                strikes={}, quantity=1, target_pnl=1e9, stop_loss_pnl=-1e9, position_type="SELL",
+                                force_close_timeindex=4650)
+            position.symbol = "QQQ"
+            manager.positions["manual_0"] = position
+            manager.update_positions(market_data)
+            
+            self.assertNotEqual(position.current_pnl, 0.0)
+            self.assertAlmostEqual(manager.setup_unrealized_pnl["manual"], position.current_pnl, places=9)
+            self.assertAlmostEqual(manager.symbol_unrealized_pnl["QQQ"], position.current_pnl, places=9)
+    
+    def test_engine_results_match(self):
+        """Engine runs with and without the vectorized book should produce identical trades"""
+        shared_day_cache.clear()
+        test_dir = tempfile.mkdtemp()
+        for index, date in enumerate(["2025-08-11", "2025-08-12"]):
+            write_wavy_day(test_dir, date, phase=index * 1.3)
+        
+        def run(vectorized_book, stream_data):
+            setups = [
+                CEScalpingSetup("ce", target_pct=30.0, stop_loss_pct=60.0, entry_timeindex=1010, reentry_gap=20),
+                PEScalpingSetup("pe", target_pct=30.0, stop_loss_pct=60.0, entry_timeindex=1010, reentry_gap=20),
+                TimeDecaySetup("theta", target_pct=20.0, stop_loss_pct=40.0, entry_timeindex=1010,
+                               theta_acceleration_time=1200, high_theta_threshold=0.0),
+                StraddleSetup("straddle", target_pct=50.0, stop_loss_pct=100.0, entry_timeindex=1010)
+            ]
+            engine = BacktestEngine(test_dir, setups, daily_max_loss=5000.0, enable_dynamic_management=False,
+                                    vectorized_book=vectorized_book, stream_data=stream_data, verbosity=0)
+            results = engine.run_backtest("QQQ", "2025-08-01", "2025-08-31")
+            return [(trade.setup_id, trade.entry_timeindex, trade.exit_timeindex, trade.pnl, trade.exit_reason)
+                    for trade in results.trade_log]
+        
+        for stream_data in (False, True):
+            expected = run(False, stream_data)
+            self.assertGreater(len(expected), 10)
+            self.assertEqual(run(True, stream_data), expected)
+        shared_day_cache.clear()
+
 
 def run_complex_strategy_tests():
     """Run complex strategy P&L tests"""
     print("Running Complex Multi-Leg Strategy P&L Tests")
     print("=" * 60)
     
-    suite = unittest.TestLoader().loadTestsFromTestCase(TestComplexStrategyPnL)
+    suite = unittest.TestSuite()
+    suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestComplexStrategyPnL))
+    suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestVectorizedPositionBook))
     runner = unittest.TextTestRunner(verbosity=2)
     result = runner.run(suite)
     
@@ -446,5 +676,4 @@ def run_complex_strategy_tests():
 
 
 if __name__ == "__main__":
-    import math
     run_complex_strategy_tests()
\ No newline at end of file
@@ -458,6 +458,83 @@ class TestDynamicParameterAdjustment(unittest.TestCase):
         # Check reset
         self.assertEqual(self.manager.total_adjustments, 0)
         self.assertEqual(len(self.manager.adjustment_history), 0)
+    
+    def test_unchanged_regime_keeps_setup_state(self):
+        """Ticks in the same regime leave the adjusted setup and its daily state alone"""
+        from backtesting_engine.strategies import CEScalpingSetup
+        
+        base_setup = CEScalpingSetup("test_ce", target_pct=30.0, stop_loss_pct=60.0, entry_timeindex=1000)
+        manager = DynamicSetupManager([base_setup])
+        market_data = MarketData(timestamp=1000, symbol="QQQ", spot_price=580.0,
+                                 option_prices={"CE": {580.0: 5.0}}, available_strikes=[580.0])
+        
+        manager.update_market_regime("HIGH_VOL", 0.8, market_data)
+        adjusted_setup = manager.get_adjusted_setups()[0]
+        adjusted_setup.entry_count = 1
+        for timestamp in range(1005, 1050, 5):
+            market_data.timestamp = timestamp
+            manager.update_market_regime("HIGH_VOL", 0.8, market_data)
+        
+        self.assertIs(manager.get_adjusted_setups()[0], adjusted_setup)
+        self.assertEqual(adjusted_setup.entry_count, 1)
+        self.assertAlmostEqual(adjusted_setup.target_pct, 45.0)
+        self.assertEqual(len(manager.adjustment_history), 3)
+        self.assertEqual(base_setup.target_pct, 30.0)
+        
+        # A regime change rescales from the base parameters, not the current ones
+        manager.update_market_regime("LOW_VOL", 0.8, market_data)
+        self.assertAlmostEqual(adjusted_setup.target_pct, 24.0)
+        self.assertAlmostEqual(adjusted_setup.stop_loss_pct, 54.0)
+        self.assertEqual(adjusted_setup.entry_count, 1)
+        self.assertEqual(manager.adjustment_history[-1].old_value, 1.3 * 0.40)
+    
+    def test_adjustment_lookup_by_setup(self):
+        """Only changed values are recorded, and lookups use each setup's first adjustment time"""
+        from backtesting_engine.strategies import StraddleSetup
+        
+        manager = DynamicSetupManager([StraddleSetup("test_a", 50.0, 100.0, 1000),
+                                       StraddleSetup("test_b", 50.0, 100.0, 1000)])
+        market_data = MarketData(timestamp=1010, symbol="QQQ", spot_price=580.0,
+                                 option_prices={"CE": {580.0: 5.0}}, available_strikes=[580.0])
+        
+        manager.update_market_regime("RANGING", 0.8, market_data)
+        market_data.timestamp = 1020
+        manager.update_market_regime("RANGING", 0.8, market_data)
+        
+        # RANGING keeps target_pct, so only the stop and scalping price change, once per setup
+        self.assertEqual([(adj.setup_id, adj.parameter_name) for adj in manager.adjustment_history],
+                         [("test_a", "stop_loss_pct"), ("test_a", "scalping_price"),
+                          ("test_b", "stop_loss_pct"), ("test_b", "scalping_price")])
+        self.assertFalse(manager.was_adjusted_before("test_a", 1005))
+        self.assertTrue(manager.was_adjusted_before("test_a", 1010))
+        self.assertTrue(manager.was_adjusted_before("test_b", 1500))
+        self.assertFalse(manager.was_adjusted_before("test_c", 1500))
+        
+        manager.reset_daily_adjustments()
+        self.assertFalse(manager.was_adjusted_before("test_a", 1500))
+    
+    def test_merge_statistics_weights_shards(self):
+        """Merging shards one by one gives the trade-weighted average and keeps adjustment history"""
+        from backtesting_engine.strategies import StraddleSetup
+        
+        shards = []
+        for shard_index, pnls in enumerate([[10.0, 20.0, 30.0], [100.0], [-40.0, -20.0]]):
+            shard = DynamicSetupManager([StraddleSetup("test_a", 50.0, 100.0, 1000)])
+            market_data = MarketData(timestamp=2000 - 500 * shard_index, symbol="QQQ", spot_price=580.0,
+                                     option_prices={"CE": {580.0: 5.0}}, available_strikes=[580.0])
+            shard.update_market_regime("RANGING", 0.8, market_data)
+            for pnl in pnls:
+                shard.track_adjustment_performance(Trade("test_a", 1000, 1100, {}, {}, {}, 1, pnl, "TARGET"), True)
+            shards.append(shard)
+        
+        merged = shards[0]
+        for shard in shards[1:]:
+            merged.merge_statistics(shard)
+        
+        self.assertAlmostEqual(merged.adjustment_performance["RANGING_test_a"], 100.0 / 6)
+        self.assertEqual(merged.adjustment_trade_counts["RANGING_test_a"], 6)
+        self.assertEqual(len(merged.adjustment_history), 6)
+        self.assertEqual(merged.first_adjustment_times["test_a"], 1000)
 
 
 class TestComplexMultiLegStrategies(unittest.TestCase):
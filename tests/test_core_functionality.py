@@ -15,6 +15,7 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from backtesting_engine.data_loader import DataLoader
 from backtesting_engine.position_manager import PositionManager
+from backtesting_engine.risk_manager import RiskManager
 from backtesting_engine.models import MarketData, Position, Trade
 
 
@@ -190,6 +191,51 @@ class TestCorePositionManagement(unittest.TestCase):
         
         self.assertGreater(len(trades), 0)
         self.assertEqual(len(self.position_manager.positions), 0)
+    
+    def test_running_pnl_aggregates(self):
+        """Realized and unrealized totals track per setup and symbol as positions mark and close"""
+        for vectorized in (False, True):
+            position_manager = PositionManager(vectorized=vectorized)
+            for setup_id, target_pnl in [("tight", 20.0), ("wide", 1000.0), ("wide", 1000.0)]:
+                position_manager.add_position(Position(
+                    setup_id=setup_id, entry_timeindex=1000, entry_prices={"CE_580.0": 5.2, "PE_580.0": 4.8},
+                    strikes={"CE": 580.0, "PE": 580.0}, quantity=1, target_pnl=target_pnl,
+                    stop_loss_pnl=-1000.0, position_type="SELL", symbol="QQQ"))
+            
+            cheaper = MarketData(timestamp=1100, symbol="QQQ", spot_price=580.0,
+                                 option_prices={"CE": {580.0: 4.9}, "PE": {580.0: 4.6}}, available_strikes=[580.0])
+            trades = position_manager.update_positions(cheaper)
+            open_pnls = [position.current_pnl for position in position_manager.positions.values()]
+            
+            self.assertEqual([trade.setup_id for trade in trades], ["tight"])
+            self.assertAlmostEqual(position_manager.realized_pnl, trades[0].pnl)
+            self.assertAlmostEqual(position_manager.get_total_pnl(), sum(open_pnls))
+            self.assertAlmostEqual(position_manager.get_setup_pnl("tight"), 0.0)
+            self.assertAlmostEqual(position_manager.get_setup_day_pnl("tight"), trades[0].pnl)
+            self.assertAlmostEqual(position_manager.get_setup_pnl("wide"), sum(open_pnls))
+            self.assertAlmostEqual(position_manager.get_symbol_day_pnl("QQQ"), trades[0].pnl + sum(open_pnls))
+            
+            closed = position_manager.close_all_positions(cheaper, "TEST_CLOSE")
+            self.assertEqual(position_manager.get_total_pnl(), 0.0)
+            self.assertAlmostEqual(position_manager.get_day_pnl(), sum(trade.pnl for trade in trades + closed))
+            
+            position_manager.reset_positions()
+            self.assertEqual(position_manager.get_day_pnl(), 0.0)
+    
+    def test_daily_limit_counts_realized_losses(self):
+        """A loss already booked today should count toward the daily limit"""
+        self.position_manager.add_position(Position(
+            setup_id="loser", entry_timeindex=1000, entry_prices={"CE_580.0": 5.2}, strikes={"CE": 580.0},
+            quantity=1, stop_loss_pnl=-50.0, position_type="SELL"))
+        
+        spike = MarketData(timestamp=1100, symbol="QQQ", spot_price=590.0,
+                           option_prices={"CE": {580.0: 10.0}}, available_strikes=[580.0])
+        trades = self.position_manager.update_positions(spike)
+        
+        self.assertEqual(trades[0].exit_reason, "STOP_LOSS")
+        self.assertEqual(self.position_manager.get_total_pnl(), 0.0)
+        self.assertTrue(RiskManager(400.0).check_position_manager(self.position_manager))
+        self.assertFalse(RiskManager(600.0).check_position_manager(self.position_manager))
 
 
 class TestCoreStrategies(unittest.TestCase):
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Tests for the batched cross-symbol correlation matrix and regime divergences
+"""
+
+import sys
+import os
+import random
+import unittest
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from backtesting_engine.cross_symbol import CorrelationMatrix, regime_divergences
+from backtesting_engine.market_regime_detector import MarketRegimeDetector
+from backtesting_engine.models import MarketData
+from helpers import pearson, random_walk
+
+
+SYMBOLS = ["QQQ", "SPY", "IWM", "DIA", "XLF"]
+
+
+def correlated_returns(rng, present_probability=1.0):
+    """One tick of returns driven by a common factor, each symbol present with the given probability"""
+    market = rng.gauss(0.0, 0.001)
+    returns = {}
+    for index, symbol in enumerate(SYMBOLS):
+        if rng.random() < present_probability:
+            returns[symbol] = (0.2 * index) * market + rng.gauss(0.0, 0.0007)
+    return returns
+
+
+class TestCorrelationMatrix(unittest.TestCase):
+    """Test the 2-D ring buffer against per-pair and brute-force references"""
+    
+    def test_full_rows_match_pearson(self):
+        """With every symbol ticking, each pair equals Pearson over the last window of returns"""
+        rng = random.Random(5)
+        matrix = CorrelationMatrix(SYMBOLS, 40)
+        rows = []
+        for step in range(3000):
+            returns = correlated_returns(rng)
+            matrix.update(returns)
+            rows.append(returns)
+            if step % 113 == 0:
+                window = rows[-40:]
+                for i, a in enumerate(SYMBOLS):
+                    for b in SYMBOLS[i+1:]:
+                        expected = pearson([row[a] for row in window], [row[b] for row in window])
+                        self.assertAlmostEqual(matrix.correlation(a, b), expected, places=9)
+                        self.assertEqual(matrix.correlation(b, a), matrix.correlation(a, b))
+        self.assertEqual(len(matrix.pair_correlations()), 10)
+    
+    def test_missing_symbols_use_shared_rows(self):
+        """A pair's correlation covers the window's rows where both symbols have a return"""
+        rng = random.Random(8)
+        matrix = CorrelationMatrix(SYMBOLS, 25)
+        rows = []
+        for step in range(1500):
+            returns = correlated_returns(rng, present_probability=0.7)
+            matrix.update(returns)
+            rows.append(returns)
+            if step % 89 == 0 or step < 30:
+                window = rows[-25:]
+                for i, a in enumerate(SYMBOLS):
+                    for b in SYMBOLS[i+1:]:
+                        shared = [row for row in window if a in row and b in row]
+                        self.assertEqual(matrix.count(a, b), len(shared))
+                        expected = pearson([row[a] for row in shared], [row[b] for row in shared]) if len(shared) >= 2 else 0.0
+                        self.assertAlmostEqual(matrix.correlation(a, b), expected, places=9)
+    
+    def test_clear_and_unknown_symbols(self):
+        """Clearing empties the window and returns for untracked symbols are ignored"""
+        matrix = CorrelationMatrix(["QQQ", "SPY"], 10)
+        for step in range(5):
+            matrix.update({"QQQ": 0.001 * step, "SPY": 0.002 * step, "IWM": 0.5})
+        self.assertAlmostEqual(matrix.correlation("QQQ", "SPY"), 1.0)
+        
+        matrix.clear()
+        self.assertEqual(matrix.count("QQQ", "SPY"), 0)
+        self.assertEqual(matrix.pair_correlations(), {})
+
+
+class TestRegimeDivergences(unittest.TestCase):
+    """Test batched divergence scores against the per-pair detector method"""
+    
+    def test_batch_matches_pairwise(self):
+        """Every pair scores as detect_cross_symbol_divergence does"""
+        detectors = {symbol: MarketRegimeDetector(lookback_periods=20) for symbol in SYMBOLS}
+        for seed, (symbol, detector) in enumerate(detectors.items()):
+            for step, price in enumerate(random_walk(120, seed, step=0.0005 * (seed + 1))):
+                detector.update_market_data(MarketData(
+                    timestamp=1000 + 5 * step, symbol=symbol, spot_price=price,
+                    option_prices={"CE": {580.0: 2.0 + 0.01 * step}, "PE": {580.0: 2.1}},
+                    available_strikes=[580.0]))
+        detectors["NEW"] = MarketRegimeDetector(lookback_periods=20)  # No history yet
+        
+        divergences = regime_divergences(detectors)
+        names = list(detectors)
+        self.assertEqual(len(divergences), len(names) * (len(names) - 1) // 2)
+        for i, a in enumerate(SYMBOLS):
+            for b in SYMBOLS[i+1:]:
+                self.assertEqual(divergences[(a, b)], detectors[a].detect_cross_symbol_divergence(detectors[b]))
+        for symbol in SYMBOLS:
+            self.assertEqual(divergences[(symbol, "NEW")], 0.0)
+
+
+def run_cross_symbol_tests():
+    """Run cross-symbol statistics tests"""
+    print("Running Cross-Symbol Statistics Tests")
+    print("=" * 50)
+    
+    suite = unittest.TestSuite()
+    suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestCorrelationMatrix))
+    suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestRegimeDivergences))
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+    
+    success = len(result.failures) == 0 and len(result.errors) == 0
+    print(f"\nCross-Symbol Statistics Tests: {'PASSED' if success else 'FAILED'}")
+    
+    return success
+
+
+if __name__ == "__main__":
+    run_cross_symbol_tests()
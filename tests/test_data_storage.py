@@ -0,0 +1,697 @@
+#!/usr/bin/env python3
+"""
+Tests for the columnar option chain storage and data loading fast paths
+"""
+
+import sys
+import os
+import math
+import tempfile
+import csv
+import time
+import pickle
+import io
+import contextlib
+import unittest
+from unittest.mock import patch
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from backtesting_engine.data_loader import DataLoader
+from backtesting_engine.option_chain import ColumnarOptionData, StrikeIndex
+from backtesting_engine.models import MarketData, MarketSnapshot
+from backtesting_engine.day_cache import SharedDayCache, read_day_cache, shared_day_cache
+from backtesting_engine.backtest_engine import BacktestEngine
+from backtesting_engine.parallel_runner import ParallelBacktestRunner
+from backtesting_engine.event_log import RingBufferSink
+from backtesting_engine.strategies import StraddleSetup
+from backtesting_engine.spot_index import INDEX_EXTENSION, clear_spot_cache, get_spot_index, read_spot_day
+from helpers import write_trading_day
+
+
+class TestColumnarOptionData(unittest.TestCase):
+    """Test the columnar option chain and its nested-dict view"""
+    
+    def setUp(self):
+        """Set up a small chain with a missing quote"""
+        self.nested = {
+            1000: {"CE": {580.0: 5.2, 585.0: 2.8}, "PE": {575.0: 2.1, 580.0: 4.8}},
+            1005: {"CE": {580.0: 5.0, 585.0: 2.7}},
+            1010: {"PE": {575.0: 2.3}},
+        }
+        self.chain = ColumnarOptionData.from_nested(self.nested)
+    
+    def test_axes_are_sorted(self):
+        """Timestamp and strike axes should be sorted and unique"""
+        self.assertEqual(list(self.chain.timestamps), [1000, 1005, 1010])
+        self.assertEqual(list(self.chain.strikes), [575.0, 580.0, 585.0])
+        self.assertEqual(len(self.chain.prices["CE"]), 9)
+    
+    def test_missing_quotes_are_nan(self):
+        """Missing quotes are stored as NaN and hidden from the mapping view"""
+        row = self.chain.row_of(1005)
+        col = self.chain.column_of(575.0)
+        self.assertTrue(math.isnan(self.chain.prices["CE"][row * 3 + col]))
+        self.assertNotIn(575.0, self.chain[1005]["CE"])
+        self.assertNotIn("PE", self.chain[1005])
+        self.assertIsNone(self.chain.get_price(1005, "CE", 575.0))
+    
+    def test_mapping_view_matches_nested_dicts(self):
+        """The mapping view should be indistinguishable from the nested-dict layout"""
+        self.assertEqual(self.chain.to_dict(), self.nested)
+        self.assertEqual(self.chain[1000], self.nested[1000])
+        self.assertEqual(sorted(self.chain[1000]["CE"].keys()), [580.0, 585.0])
+        self.assertEqual(self.chain[1000]["PE"][575.0], 2.1)
+        self.assertIn(1010, self.chain)
+        self.assertNotIn(1015, self.chain)
+        with self.assertRaises(KeyError):
+            self.chain[1015]
+    
+    def test_point_lookup(self):
+        """Direct array lookup should return the stored price"""
+        self.assertEqual(self.chain.get_price(1000, "CE", 585.0), 2.8)
+        self.assertEqual(self.chain.get_price(1010, "PE", 575.0), 2.3)
+        self.assertIsNone(self.chain.get_price(1000, "CE", 999.0))
+        self.assertEqual(self.chain.strikes_at(1000), [575.0, 580.0, 585.0])
+    
+    def test_row_strike_index_is_shared(self):
+        """Rows quoting the same strikes share one precomputed list"""
+        row_strikes = self.chain.get_row_strikes()
+        self.assertEqual(row_strikes, [[575.0, 580.0, 585.0], [580.0, 585.0], [575.0]])
+        self.assertIs(self.chain[1000].available_strikes, row_strikes[0])
+        
+        chain = ColumnarOptionData.from_nested({1000: self.nested[1000], 1005: self.nested[1000]})
+        self.assertIs(chain.get_row_strikes()[0], chain.get_row_strikes()[1])
+    
+    def test_strike_index_matches_for_dicts_and_snapshots(self):
+        """StrikeIndex returns the same strikes for nested dicts and columnar snapshots"""
+        strike_index = StrikeIndex()
+        for timestamp, chain in self.nested.items():
+            self.assertEqual(strike_index.strikes_for(chain), self.chain[timestamp].available_strikes)
+        
+        unchanged = {"PE": {575.0: 9.9}}
+        self.assertIs(strike_index.strikes_for(unchanged), strike_index.strikes_for(self.nested[1010]))
+    
+    def test_market_snapshot_updates_in_place(self):
+        """The reusable snapshot is a MarketData and resets regime fields on update"""
+        snapshot = MarketSnapshot("QQQ")
+        snapshot.update(1000, 582.0, self.chain[1000], [575.0])
+        snapshot.regime_classification = "HIGH_VOL"
+        
+        self.assertIs(snapshot.update(1005, 583.0, self.chain[1005], [580.0]), snapshot)
+        self.assertIsInstance(snapshot, MarketData)
+        self.assertEqual((snapshot.timestamp, snapshot.spot_price), (1005, 583.0))
+        self.assertEqual(snapshot.regime_classification, "UNKNOWN")
+    
+    def test_duplicate_quotes_keep_last_price(self):
+        """A repeated quote overwrites the earlier one, as with dict assignment"""
+        chain = ColumnarOptionData.from_quotes([1000, 1000], ["CE", "CE"], [580.0, 580.0], [1.0, 1.5])
+        self.assertEqual(chain.get_price(1000, "CE", 580.0), 1.5)
+
+
+class TestColumnarDataLoading(unittest.TestCase):
+    """Test that DataLoader produces columnar option data"""
+    
+    def setUp(self):
+        """Create a minimal on-disk trading day"""
+        shared_day_cache.clear()
+        self.test_dir = tempfile.mkdtemp()
+        self.data_loader = DataLoader(self.test_dir)
+        self.date = "2025-08-13"
+        
+        symbol_dir = os.path.join(self.test_dir, "QQQ")
+        os.makedirs(os.path.join(symbol_dir, "Spot"))
+        
+        with open(os.path.join(symbol_dir, f"{self.date}_BK.csv"), 'w', newline='') as f:
+            writer = csv.writer(f)
+            for timestamp in range(1000, 1100, 5):
+                for strike in [575.0, 580.0, 585.0]:
+                    writer.writerow([timestamp, "CE", strike, max(0.05, 582.0 - strike + 2.0)])
+                    writer.writerow([timestamp, "PE", strike, max(0.05, strike - 582.0 + 2.0)])
+        
+        with open(os.path.join(symbol_dir, "Spot", "qqq.csv"), 'w', newline='') as f:
+            writer = csv.writer(f)
+            for timestamp in range(1000, 1100, 5):
+                writer.writerow([self.date, timestamp, 582.0, 582.0, 582.0, 582.0])
+        
+        with open(os.path.join(symbol_dir, f"{self.date}.prop"), 'w') as f:
+            f.write("jobEndIdx=1095\n")
+    
+    def test_load_returns_columnar_chain(self):
+        """load_trading_day should hand out a ColumnarOptionData"""
+        data = self.data_loader.load_trading_day("QQQ", self.date)
+        
+        self.assertIsInstance(data.option_data, ColumnarOptionData)
+        self.assertEqual(len(data.option_data), 20)
+        self.assertEqual(self.data_loader.get_option_price(data.option_data, 1000, "CE", 580.0), 4.0)
+        self.assertEqual(data.option_data[1050]["PE"][585.0], 5.0)
+
+    
+    def test_source_mtime_is_computed_once_per_load(self):
+        """One load stats the sources once, and not at all with both caches off"""
+        with patch.object(DataLoader, "_get_source_mtime_ns", autospec=True, return_value=0) as source_mtime:
+            self.data_loader.load_trading_day("QQQ", self.date)
+            self.assertEqual(source_mtime.call_count, 1)
+            
+            DataLoader(self.test_dir, use_cache=False, use_memory_cache=False).load_trading_day("QQQ", self.date)
+            self.assertEqual(source_mtime.call_count, 1)
+    
+    def test_first_load_writes_day_cache(self):
+        """A CSV load should leave a binary cache file behind"""
+        self.data_loader.load_trading_day("QQQ", self.date)
+        
+        self.assertTrue(os.path.exists(self.data_loader.get_cache_file("QQQ", self.date)))
+    
+    def test_cached_load_matches_csv_load(self):
+        """Loading from the binary cache should reproduce the CSV parse exactly"""
+        csv_data = DataLoader(self.test_dir, use_cache=False, use_memory_cache=False).load_trading_day("QQQ", self.date)
+        self.data_loader.load_trading_day("QQQ", self.date)
+        cached_data = read_day_cache(self.data_loader.get_cache_file("QQQ", self.date))
+        
+        self.assertIsInstance(cached_data.option_data.prices["CE"], memoryview)
+        self.assertEqual(cached_data.option_data.to_dict(), csv_data.option_data.to_dict())
+        self.assertEqual(cached_data.spot_data, csv_data.spot_data)
+        self.assertEqual(cached_data.job_end_idx, csv_data.job_end_idx)
+        self.assertEqual(cached_data.metadata, csv_data.metadata)
+        self.assertEqual(cached_data.symbol, "QQQ")
+    
+    def test_stale_cache_is_rebuilt(self):
+        """A source file newer than the cache should force a re-parse"""
+        self.data_loader.load_trading_day("QQQ", self.date)
+        cache_file = self.data_loader.get_cache_file("QQQ", self.date)
+        
+        past = time.time() - 60
+        os.utime(cache_file, (past, past))
+        with open(os.path.join(self.test_dir, "QQQ", f"{self.date}.prop"), 'w') as f:
+            f.write("jobEndIdx=1090\n")
+        
+        data = self.data_loader.load_trading_day("QQQ", self.date)
+        
+        self.assertEqual(data.job_end_idx, 1090)
+        self.assertGreater(os.path.getmtime(cache_file), past)
+    
+    def test_spot_rows_for_other_days_keep_cache_fresh(self):
+        """Appending other dates to the shared spot file leaves the day cached; its own rows do not"""
+        spot_file = os.path.join(self.test_dir, "QQQ", "Spot", "qqq.csv")
+        past = time.time() - 60
+        for name in [f"{self.date}_BK.csv", f"{self.date}.prop", spot_file]:
+            os.utime(os.path.join(self.test_dir, "QQQ", name), (past, past))
+        first = self.data_loader.load_trading_day("QQQ", self.date)
+        
+        future = time.time() + 60
+        with open(spot_file, 'a', newline='') as f:
+            csv.writer(f).writerow(["2025-08-14", 1000, 583.0, 583.0, 583.0, 583.0])
+        os.utime(spot_file, (future, future))
+        self.assertIs(self.data_loader.load_trading_day("QQQ", self.date), first)
+        self.assertEqual(self.data_loader.build_cache(["QQQ"])["QQQ"], [])
+        
+        with open(spot_file, 'a', newline='') as f:
+            csv.writer(f).writerow([self.date, 1100, 590.0, 590.0, 590.0, 590.0])
+        os.utime(spot_file, (future + 60, future + 60))
+        second = self.data_loader.load_trading_day("QQQ", self.date)
+        self.assertIsNot(second, first)
+        self.assertEqual(second.spot_data[1100], 590.0)
+    
+    def test_build_cache_converts_each_day_once(self):
+        """build_cache should only convert days without a fresh cache"""
+        first = self.data_loader.build_cache(["QQQ"])
+        second = self.data_loader.build_cache(["QQQ"])
+        
+        self.assertEqual(first["QQQ"], [self.date])
+        self.assertEqual(second["QQQ"], [])
+    
+    def test_build_cache_without_cache_reads(self):
+        """A loader that does not read the day cache still writes it from build_cache"""
+        loader = DataLoader(self.test_dir, use_cache=False, use_memory_cache=False)
+        
+        self.assertEqual(loader.build_cache(["QQQ"])["QQQ"], [self.date])
+        self.assertTrue(os.path.exists(loader.get_cache_file("QQQ", self.date)))
+        self.assertFalse(loader.use_cache)
+    
+    def test_failed_parse_is_not_cached(self):
+        """A day whose option CSV fails to parse part way is returned but never cached"""
+        with open(os.path.join(self.test_dir, "QQQ", f"{self.date}_BK.csv"), 'a', newline='') as f:
+            f.write("1100,CE,580.0,not-a-price\n")
+        
+        data = self.data_loader.load_trading_day("QQQ", self.date)
+        
+        self.assertEqual(len(data.option_data), 20)
+        self.assertFalse(os.path.exists(self.data_loader.get_cache_file("QQQ", self.date)))
+        self.assertEqual(self.data_loader.build_cache(["QQQ"])["QQQ"], [])
+        self.assertEqual(self.data_loader.get_memory_cache_stats()["entries"], 0)
+    
+    def test_shared_cache_dir_keeps_data_paths_apart(self):
+        """Two data paths sharing a cache_dir get separate cache files for the same symbol and date"""
+        other_dir = tempfile.mkdtemp()
+        cache_dir = tempfile.mkdtemp()
+        write_trading_day(other_dir, "QQQ", self.date, drift=0.1)
+        loaders = [DataLoader(path, cache_dir=cache_dir, use_memory_cache=False) for path in (self.test_dir, other_dir)]
+        
+        self.assertNotEqual(loaders[0].get_cache_file("QQQ", self.date), loaders[1].get_cache_file("QQQ", self.date))
+        first, second = [loader.load_trading_day("QQQ", self.date) for loader in loaders]
+        self.assertTrue(all(os.path.exists(loader.get_cache_file("QQQ", self.date)) for loader in loaders))
+        self.assertEqual(loaders[0].load_trading_day("QQQ", self.date).spot_data, first.spot_data)
+        self.assertEqual(loaders[1].load_trading_day("QQQ", self.date).spot_data, second.spot_data)
+        self.assertNotEqual(first.spot_data, second.spot_data)
+    
+    def test_cached_day_pickles(self):
+        """Memory-mapped columns should pickle as plain arrays"""
+        self.data_loader.load_trading_day("QQQ", self.date)
+        cached_data = DataLoader(self.test_dir, use_memory_cache=False).load_trading_day("QQQ", self.date)
+        
+        self.assertIsInstance(cached_data.option_data.prices["CE"], memoryview)
+        restored = pickle.loads(pickle.dumps(cached_data))
+        
+        self.assertEqual(restored.option_data.to_dict(), cached_data.option_data.to_dict())
+
+
+class TestSpotIndex(unittest.TestCase):
+    """Test date-indexed spot file access"""
+    
+    def setUp(self):
+        """Create a multi-day spot file with a header row"""
+        clear_spot_cache()
+        self.test_dir = tempfile.mkdtemp()
+        self.spot_file = os.path.join(self.test_dir, "qqq.csv")
+        self.dates = ["2025-08-11", "2025-08-12", "2025-08-13"]
+        
+        with open(self.spot_file, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(["Date", "Time", "Open", "High", "Low", "Close"])
+            for day, date in enumerate(self.dates):
+                for timestamp in range(1000, 1050, 5):
+                    writer.writerow([date, timestamp, 0, 0, 0, 580.0 + day + timestamp / 10000])
+    
+    def full_scan(self, date):
+        """Reference implementation: scan the whole file"""
+        with open(self.spot_file, 'r') as f:
+            return {int(row[1]): float(row[5]) for row in csv.reader(f) if len(row) >= 6 and row[0] == date}
+    
+    def test_indexed_read_matches_full_scan(self):
+        """Each date read through the index should equal a full-file scan"""
+        for date in self.dates + ["2025-08-14"]:
+            self.assertEqual(read_spot_day(self.spot_file, date), self.full_scan(date))
+        self.assertEqual(len(read_spot_day(self.spot_file, self.dates[1])), 10)
+    
+    def test_index_is_persisted_and_reused(self):
+        """The index should be written next to the CSV and loaded by a fresh process"""
+        ranges = get_spot_index(self.spot_file)
+        self.assertTrue(os.path.exists(self.spot_file + INDEX_EXTENSION))
+        
+        clear_spot_cache()
+        self.assertEqual(get_spot_index(self.spot_file), ranges)
+    
+    def test_malformed_index_is_rebuilt(self):
+        """An index file missing its keys should be rebuilt like a missing one"""
+        ranges = get_spot_index(self.spot_file)
+        for content in ('{"ranges": {}}', '[]', '{"size": 1'):
+            with open(self.spot_file + INDEX_EXTENSION, 'w') as f:
+                f.write(content)
+            clear_spot_cache()
+            self.assertEqual(get_spot_index(self.spot_file), ranges)
+        self.assertEqual([name for name in os.listdir(os.path.dirname(self.spot_file)) if name.endswith(".tmp")], [])
+    
+    def test_parsed_series_are_shared(self):
+        """Repeated reads of the same file and date should return the same series"""
+        first = read_spot_day(self.spot_file, self.dates[0])
+        self.assertIs(read_spot_day(self.spot_file, self.dates[0]), first)
+    
+    def test_appended_day_extends_index(self):
+        """Appending a day should be picked up without losing earlier dates"""
+        read_spot_day(self.spot_file, self.dates[2])
+        with open(self.spot_file, 'a', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow([self.dates[2], 1050, 0, 0, 0, 600.0])
+            writer.writerow(["2025-08-14", 1000, 0, 0, 0, 601.0])
+        
+        self.assertEqual(read_spot_day(self.spot_file, self.dates[2]), self.full_scan(self.dates[2]))
+        self.assertEqual(read_spot_day(self.spot_file, "2025-08-14"), {1000: 601.0})
+        self.assertEqual(read_spot_day(self.spot_file, self.dates[0]), self.full_scan(self.dates[0]))
+    
+    def test_rewritten_file_rebuilds_index(self):
+        """A rewritten file should not reuse stale byte offsets"""
+        read_spot_day(self.spot_file, self.dates[1])
+        with open(self.spot_file, 'w', newline='') as f:
+            csv.writer(f).writerow([self.dates[1], 2000, 0, 0, 0, 590.0])
+        
+        self.assertEqual(read_spot_day(self.spot_file, self.dates[1]), {2000: 590.0})
+        self.assertEqual(read_spot_day(self.spot_file, self.dates[0]), {})
+
+
+class TestSharedDayCache(unittest.TestCase):
+    """Test the process-wide in-memory day cache"""
+    
+    def setUp(self):
+        """Create a minimal on-disk trading day and reset the shared cache"""
+        shared_day_cache.clear()
+        self.test_dir = tempfile.mkdtemp()
+        self.date = "2025-08-13"
+        
+        symbol_dir = os.path.join(self.test_dir, "QQQ")
+        os.makedirs(os.path.join(symbol_dir, "Spot"))
+        
+        with open(os.path.join(symbol_dir, f"{self.date}_BK.csv"), 'w', newline='') as f:
+            writer = csv.writer(f)
+            for timestamp in range(1000, 1100, 5):
+                writer.writerow([timestamp, "CE", 580.0, 4.0])
+                writer.writerow([timestamp, "PE", 580.0, 2.0])
+        
+        with open(os.path.join(symbol_dir, "Spot", "qqq.csv"), 'w', newline='') as f:
+            writer = csv.writer(f)
+            for timestamp in range(1000, 1100, 5):
+                writer.writerow([self.date, timestamp, 582.0, 582.0, 582.0, 582.0])
+        
+        with open(os.path.join(symbol_dir, f"{self.date}.prop"), 'w') as f:
+            f.write("jobEndIdx=1095\n")
+    
+    def tearDown(self):
+        """Leave the shared cache empty for other tests"""
+        shared_day_cache.clear()
+    
+    def test_loaders_share_loaded_days(self):
+        """A second DataLoader should get the same object without re-reading"""
+        first = DataLoader(self.test_dir).load_trading_day("QQQ", self.date)
+        second = DataLoader(self.test_dir).load_trading_day("QQQ", self.date)
+        
+        self.assertIs(first, second)
+        stats = DataLoader(self.test_dir).get_memory_cache_stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["entries"], 1)
+        self.assertGreater(stats["bytes"], 0)
+    
+    def test_modified_source_misses(self):
+        """Touching a source file changes the key and forces a reload"""
+        first = DataLoader(self.test_dir).load_trading_day("QQQ", self.date)
+        future = time.time() + 60
+        os.utime(os.path.join(self.test_dir, "QQQ", f"{self.date}.prop"), (future, future))
+        second = DataLoader(self.test_dir).load_trading_day("QQQ", self.date)
+        
+        self.assertIsNot(first, second)
+        self.assertEqual(shared_day_cache.get_stats()["misses"], 2)
+    
+    def test_memory_cache_can_be_disabled(self):
+        """use_memory_cache=False should neither read nor populate the shared cache"""
+        DataLoader(self.test_dir, use_memory_cache=False).load_trading_day("QQQ", self.date)
+        
+        self.assertEqual(shared_day_cache.get_stats()["entries"], 0)
+    
+    def test_byte_budget_evicts_least_recently_used(self):
+        """Entries beyond max_bytes are evicted oldest first"""
+        data = DataLoader(self.test_dir, use_memory_cache=False).load_trading_day("QQQ", self.date)
+        size = data.option_data.nbytes + len(data.spot_data) * 100
+        cache = SharedDayCache(max_bytes=size * 2)
+        
+        cache.put(("a",), data)
+        cache.put(("b",), data)
+        cache.get(("a",))
+        cache.put(("c",), data)
+        
+        self.assertIsNotNone(cache.get(("a",)))
+        self.assertIsNone(cache.get(("b",)))
+        self.assertEqual(cache.get_stats()["evictions"], 1)
+        self.assertLessEqual(cache.get_stats()["bytes"], size * 2)
+
+
+class TestTickStreaming(unittest.TestCase):
+    """Test the streaming DataLoader API and the engine running on it"""
+    
+    def setUp(self):
+        """Create QQQ and SPY days with partly overlapping timestamps"""
+        shared_day_cache.clear()
+        self.test_dir = tempfile.mkdtemp()
+        self.date = "2025-08-13"
+        write_trading_day(self.test_dir, "QQQ", self.date, drift=0.05)
+        write_trading_day(self.test_dir, "SPY", self.date, suffix="B", timestamps=range(1050, 1150, 10))
+    
+    def tearDown(self):
+        """Leave the shared cache empty for other tests"""
+        shared_day_cache.clear()
+    
+    def tick_tuples(self, ticks):
+        """Flatten ticks for comparison"""
+        return [(tick.timestamp, tick.symbol, tick.spot_price, dict(tick.option_prices), tick.job_end_idx)
+                for tick in ticks]
+    
+    def test_csv_stream_matches_loaded_day(self):
+        """Streaming straight from the CSV should yield the same ticks as a full load"""
+        loader = DataLoader(self.test_dir, use_cache=False, use_memory_cache=False)
+        loaded = loader.iter_day_ticks(loader.load_trading_day("QQQ", self.date))
+        streamed = loader.iter_ticks("QQQ", self.date)
+        
+        self.assertEqual(self.tick_tuples(streamed), self.tick_tuples(loaded))
+    
+    def test_cached_stream_matches_csv_stream(self):
+        """Streaming from the day cache should yield the same ticks as the CSV"""
+        csv_ticks = self.tick_tuples(DataLoader(self.test_dir, use_cache=False, use_memory_cache=False)
+                                     .iter_ticks("QQQ", self.date))
+        DataLoader(self.test_dir, use_memory_cache=False).build_cache(["QQQ"])
+        cached_ticks = self.tick_tuples(DataLoader(self.test_dir, use_memory_cache=False)
+                                        .iter_ticks("QQQ", self.date))
+        
+        self.assertEqual(len(cached_ticks), 20)
+        self.assertEqual(cached_ticks, csv_ticks)
+    
+    def test_missing_day_returns_none(self):
+        """An unknown day should be reported up front, not mid-iteration"""
+        self.assertIsNone(DataLoader(self.test_dir).iter_ticks("QQQ", "2025-01-01"))
+    
+    def test_unsorted_csv_falls_back_to_loaded_day(self):
+        """A CSV that goes back in time is loaded whole instead of failing mid-stream"""
+        option_file = os.path.join(self.test_dir, "QQQ", f"{self.date}_BK.csv")
+        with open(option_file, 'a', newline='') as f:
+            csv.writer(f).writerow([1000, "CE", 580.0, 1.0])
+        
+        loader = DataLoader(self.test_dir, use_cache=False, use_memory_cache=False)
+        ticks = self.tick_tuples(loader.iter_ticks("QQQ", self.date))
+        expected = self.tick_tuples(loader.iter_day_ticks(loader.load_trading_day("QQQ", self.date)))
+        
+        self.assertEqual(ticks, expected)
+        self.assertEqual(ticks[0][3]["CE"][580.0], 1.0)
+        with self.assertRaises(ValueError):
+            list(loader._stream_option_data(option_file))
+    
+    def test_header_row_falls_back_to_loaded_day(self):
+        """A CSV with a header row is loaded whole instead of raising mid-stream"""
+        option_file = os.path.join(self.test_dir, "QQQ", f"{self.date}_BK.csv")
+        with open(option_file) as f:
+            rows = f.read()
+        with open(option_file, 'w') as f:
+            f.write("timestamp,option_type,strike,price\n" + rows)
+        
+        loader = DataLoader(self.test_dir, use_cache=False, use_memory_cache=False)
+        ticks = self.tick_tuples(loader.iter_ticks("QQQ", self.date))
+        expected = self.tick_tuples(loader.iter_day_ticks(loader.load_trading_day("QQQ", self.date)))
+        
+        self.assertEqual(ticks, expected)
+    
+    def test_bad_row_ends_stream_like_loaded_day(self):
+        """An unparsable price ends the streamed day where the full load stops too"""
+        option_file = os.path.join(self.test_dir, "QQQ", f"{self.date}_BK.csv")
+        with open(option_file) as f:
+            lines = f.readlines()
+        lines[32] = "1025,CE,585.0,n/a\n"
+        with open(option_file, 'w') as f:
+            f.writelines(lines)
+        
+        loader = DataLoader(self.test_dir, use_cache=False, use_memory_cache=False)
+        ticks = self.tick_tuples(loader.iter_ticks("QQQ", self.date))
+        expected = self.tick_tuples(loader.iter_day_ticks(loader.load_trading_day("QQQ", self.date)))
+        
+        self.assertEqual(ticks, expected)
+        self.assertEqual(ticks[-1][0], 1025)
+    
+    def test_incomplete_spot_data_uses_loaded_day(self):
+        """A spot file that fails to parse sends the day through load_trading_day"""
+        loader = DataLoader(self.test_dir, use_cache=False, use_memory_cache=False)
+        with patch.object(loader, "_parse_spot_data", return_value=({}, False)), \
+                patch.object(loader, "load_trading_day", wraps=loader.load_trading_day) as load_trading_day:
+            ticks = list(loader.iter_ticks("QQQ", self.date))
+        
+        load_trading_day.assert_called_once_with("QQQ", self.date)
+        self.assertEqual(ticks, [])
+    
+    def test_known_job_end_idx_skips_prop_file(self):
+        """A job end index passed by the caller is used instead of parsing the .prop file again"""
+        loader = DataLoader(self.test_dir, use_cache=False, use_memory_cache=False)
+        with patch.object(loader, "_parse_prop_file") as parse_prop_file:
+            ticks = list(loader.iter_ticks("QQQ", self.date, job_end_idx=1042))
+        
+        parse_prop_file.assert_not_called()
+        self.assertTrue(ticks)
+        self.assertTrue(all(tick.job_end_idx == 1042 for tick in ticks))
+    
+    def test_multi_symbol_merge(self):
+        """Merged ticks should be grouped per timestamp in ascending order"""
+        merged = list(DataLoader(self.test_dir).iter_multi_symbol_ticks(["QQQ", "SPY"], self.date))
+        timestamps = [timestamp for timestamp, _ in merged]
+        
+        self.assertEqual(timestamps, sorted(set(range(1000, 1100, 5)) | set(range(1050, 1150, 10))))
+        self.assertEqual(set(dict(merged)[1050]), {"QQQ", "SPY"})
+        self.assertEqual(set(dict(merged)[1055]), {"QQQ"})
+        self.assertEqual(set(dict(merged)[1140]), {"SPY"})
+    
+    def test_engine_results_match_when_streaming(self):
+        """process_trading_day should give the same result on streamed and loaded data"""
+        results = []
+        for stream_data in [False, True]:
+            shared_day_cache.clear()
+            setup = StraddleSetup(setup_id="stream_test", target_pct=50.0, stop_loss_pct=100.0,
+                                  entry_timeindex=1010, scalping_price=0.40)
+            engine = BacktestEngine(self.test_dir, [setup], stream_data=stream_data)
+            engine.data_loader.use_cache = False
+            daily = engine.process_trading_day("QQQ", self.date)
+            results.append((daily.daily_pnl, daily.trades_count, daily.positions_forced_closed_at_job_end,
+                            [(t.entry_timeindex, t.exit_timeindex, t.pnl) for t in engine.all_trades]))
+        
+        self.assertGreater(results[0][1], 0)
+        self.assertEqual(results[0], results[1])
+
+
+class TestParallelBacktestRunner(unittest.TestCase):
+    """Test the process-pool runner against a sequential backtest"""
+    
+    def setUp(self):
+        """Create four QQQ and SPY days with different drifts"""
+        shared_day_cache.clear()
+        self.test_dir = tempfile.mkdtemp()
+        self.dates = ["2025-08-11", "2025-08-12", "2025-08-13", "2025-08-14"]
+        for index, date in enumerate(self.dates):
+            write_trading_day(self.test_dir, "QQQ", date, drift=0.05 * (index - 1.5))
+            write_trading_day(self.test_dir, "SPY", date, suffix="B", drift=-0.04 * (index - 1.5))
+    
+    def tearDown(self):
+        """Leave the shared cache empty for other tests"""
+        shared_day_cache.clear()
+    
+    def make_setups(self):
+        """Fresh setups for each run"""
+        return [StraddleSetup(setup_id="parallel_test", target_pct=30.0, stop_loss_pct=50.0,
+                              entry_timeindex=1010, scalping_price=0.40)]
+    
+    def summarize(self, results):
+        """Order-sensitive summary of a backtest"""
+        return ([(daily.date, daily.daily_pnl, daily.trades_count) for daily in results.daily_results],
+                [(trade.date, trade.symbol, trade.entry_timeindex, trade.exit_timeindex, trade.pnl)
+                 for trade in results.trade_log],
+                results.total_pnl, results.max_drawdown)
+    
+    def test_shards_are_contiguous_and_balanced(self):
+        """Dates should be split into near-equal blocks in order"""
+        runner = ParallelBacktestRunner(self.test_dir, self.make_setups(), max_workers=3)
+        shards = runner._shard_dates(["d1", "d2", "d3", "d4", "d5"])
+        
+        self.assertEqual(shards, [["d1", "d2"], ["d3", "d4"], ["d5"]])
+        self.assertEqual(runner._shard_dates([]), [])
+    
+    def test_parallel_matches_sequential(self):
+        """Worker processes should reproduce the sequential single-symbol run"""
+        sequential = BacktestEngine(self.test_dir, self.make_setups(), enable_dynamic_management=False)
+        expected = self.summarize(sequential.run_backtest("QQQ", "2025-08-01", "2025-08-31"))
+        
+        runner = ParallelBacktestRunner(self.test_dir, self.make_setups(), max_workers=2,
+                                        enable_dynamic_management=False)
+        actual = self.summarize(runner.run_backtest("QQQ", "2025-08-01", "2025-08-31"))
+        
+        self.assertEqual(len(actual[0]), 4)
+        self.assertEqual(actual, expected)
+    
+    def test_parallel_multi_symbol_matches_sequential(self):
+        """Multi-symbol shards should merge into the sequential result and symbol breakdown"""
+        kwargs = dict(enable_dynamic_management=False, enable_multi_symbol=True)
+        sequential = BacktestEngine(self.test_dir, self.make_setups(), **kwargs)
+        expected = sequential.run_backtest(["QQQ", "SPY"], "2025-08-01", "2025-08-31")
+        
+        runner = ParallelBacktestRunner(self.test_dir, self.make_setups(), max_workers=2, **kwargs)
+        actual = runner.run_backtest(["QQQ", "SPY"], "2025-08-01", "2025-08-31")
+        
+        self.assertEqual(self.summarize(actual), self.summarize(expected))
+        self.assertEqual(set(actual.symbol_performance), {"QQQ", "SPY"})
+        for symbol in ["QQQ", "SPY"]:
+            self.assertAlmostEqual(actual.symbol_performance[symbol].total_pnl,
+                                   expected.symbol_performance[symbol].total_pnl)
+            self.assertEqual(actual.symbol_performance[symbol].correlation_with_other_symbols,
+                             expected.symbol_performance[symbol].correlation_with_other_symbols)
+        
+        # Both spots drift smoothly, so their returns move together; the matrix is symmetric
+        self.assertAlmostEqual(sequential.correlation_matrix["QQQ"]["SPY"], 1.0, places=4)
+        self.assertEqual(sequential.correlation_matrix["SPY"]["QQQ"], sequential.correlation_matrix["QQQ"]["SPY"])
+        self.assertEqual(sequential.correlation_history["QQQ_SPY"][-1], sequential.correlation_matrix["QQQ"]["SPY"])
+    
+    def test_start_line_follows_verbosity(self):
+        """The runner reports its start through the engine's event log, so verbosity 0 keeps stdout quiet"""
+        sink = RingBufferSink()
+        runner = ParallelBacktestRunner(self.test_dir, self.make_setups(), max_workers=1, verbosity=0,
+                                        event_sink=sink, enable_dynamic_management=False)
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            runner.run_backtest("QQQ", "2025-08-01", "2025-08-31")
+        
+        self.assertEqual(output.getvalue(), "")
+        started = sink.get_events("backtest_started")
+        self.assertEqual(started[0]["shards"], 1)
+        self.assertEqual(started[0]["dates"], self.dates)
+    
+    def test_worker_events_are_replayed_in_date_order(self):
+        """Shard events reach the runner's sink in date order and workers print nothing"""
+        sequential_sink = RingBufferSink()
+        sequential = BacktestEngine(self.test_dir, self.make_setups(), enable_dynamic_management=False,
+                                    verbosity=0, event_sink=sequential_sink)
+        sequential.run_backtest("QQQ", "2025-08-01", "2025-08-31")
+        
+        sink = RingBufferSink()
+        runner = ParallelBacktestRunner(self.test_dir, self.make_setups(), max_workers=2, verbosity=1,
+                                        event_sink=sink, enable_dynamic_management=False)
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            runner.run_backtest("QQQ", "2025-08-01", "2025-08-31")
+        
+        kinds = [event["kind"] for event in sink.get_events() if event["kind"] != "backtest_started"]
+        expected_kinds = [event["kind"] for event in sequential_sink.get_events()
+                          if event["kind"] not in ("backtest_started", "backtest_finished")]
+        self.assertEqual(kinds, expected_kinds)
+        self.assertEqual([event["date"] for event in sink.get_events("day_completed")], self.dates)
+        self.assertEqual(output.getvalue().count("Running parallel backtest"), 1)
+    
+    def test_dynamic_management_across_shards_warns(self):
+        """Regime detectors restart at shard boundaries, which the runner warns about"""
+        runner = ParallelBacktestRunner(self.test_dir, self.make_setups(), max_workers=2, verbosity=0)
+        with self.assertWarns(RuntimeWarning):
+            runner.run_backtest("QQQ", "2025-08-01", "2025-08-31")
+    
+    def test_single_worker_matches_sequential_with_dynamic_management(self):
+        """One shard runs in-process and keeps regime state across days like the engine"""
+        sequential = BacktestEngine(self.test_dir, self.make_setups())
+        expected = sequential.run_backtest("QQQ", "2025-08-01", "2025-08-31")
+        
+        runner = ParallelBacktestRunner(self.test_dir, self.make_setups(), max_workers=1)
+        actual = runner.run_backtest("QQQ", "2025-08-01", "2025-08-31")
+        
+        self.assertEqual(self.summarize(actual), self.summarize(expected))
+        self.assertEqual(actual.dynamic_adjustment_performance.total_adjustments,
+                         expected.dynamic_adjustment_performance.total_adjustments)
+
+
+def run_data_storage_tests():
+    """Run data storage tests"""
+    print("Running Data Storage Tests")
+    print("=" * 50)
+    
+    suite = unittest.TestSuite()
+    suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestColumnarOptionData))
+    suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestColumnarDataLoading))
+    suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestSpotIndex))
+    suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestSharedDayCache))
+    suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestTickStreaming))
+    suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestParallelBacktestRunner))
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+    
+    success = len(result.failures) == 0 and len(result.errors) == 0
+    print(f"\nData Storage Tests: {'PASSED' if success else 'FAILED'}")
+    
+    return success
+
+
+if __name__ == "__main__":
+    run_data_storage_tests()
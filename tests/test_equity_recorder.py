@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Tests for the tick-level equity recorder
+"""
+
+import sys
+import os
+import io
+import csv
+import tempfile
+import unittest
+import contextlib
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from backtesting_engine.backtest_engine import BacktestEngine
+from backtesting_engine.parallel_runner import ParallelBacktestRunner
+from backtesting_engine.equity_recorder import EquityRecorder, DOWNSAMPLE_MINMAX
+from backtesting_engine.reporting import BacktestReporter
+from backtesting_engine.html_reporter import HTMLReporter
+from backtesting_engine.strategies import CEScalpingSetup, StraddleSetup
+from backtesting_engine.day_cache import shared_day_cache
+from helpers import write_wavy_day
+
+
+def record_day(recorder, date, values, symbol="QQQ"):
+    """Feed one day of equity values at 5-second timestamps"""
+    recorder.start_day(date)
+    for index, equity in enumerate(values):
+        recorder.record(symbol, 1000 + 5 * index, equity)
+    recorder.end_day()
+
+
+class TestEquityRecorder(unittest.TestCase):
+    """Test downsampling and storage in isolation"""
+    
+    def test_every_n_ticks_keeps_bucket_ends(self):
+        """Each full bucket keeps its last tick and the day end flushes the partial bucket"""
+        recorder = EquityRecorder(every_n_ticks=3)
+        record_day(recorder, "2025-08-11", [1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0])
+        
+        self.assertEqual(recorder.get_points("QQQ"),
+                         [("2025-08-11", 1010, 3.0), ("2025-08-11", 1025, 6.0), ("2025-08-11", 1030, 7.0)])
+    
+    def test_minmax_keeps_extremes_in_time_order(self):
+        """Min/max buckets keep both extremes so drawdowns survive downsampling"""
+        recorder = EquityRecorder(every_n_ticks=4, mode=DOWNSAMPLE_MINMAX)
+        record_day(recorder, "2025-08-11", [0.0, 5.0, -3.0, 1.0, 2.0, 2.0])
+        
+        self.assertEqual([(timestamp, equity) for _, timestamp, equity in recorder.get_points("QQQ")],
+                         [(1005, 5.0), (1010, -3.0), (1020, 2.0)])
+    
+    def test_arrays_grow_past_capacity(self):
+        """Points beyond the preallocated capacity are kept"""
+        recorder = EquityRecorder(capacity=2)
+        record_day(recorder, "2025-08-11", [float(index) for index in range(9)])
+        record_day(recorder, "2025-08-12", [10.0])
+        
+        self.assertEqual(list(recorder.get_equity("QQQ")), [float(index) for index in range(9)] + [10.0])
+        self.assertEqual(recorder.get_points("QQQ")[-1][0], "2025-08-12")
+    
+    def test_rejects_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            EquityRecorder(mode="mean")
+
+
+class TestEngineEquityRecorder(unittest.TestCase):
+    """Test recording from the engine and consumption by the reporters"""
+    
+    def setUp(self):
+        """Create four oscillating QQQ days"""
+        shared_day_cache.clear()
+        self.test_dir = tempfile.mkdtemp()
+        for index, date in enumerate(["2025-08-11", "2025-08-12", "2025-08-13", "2025-08-14"]):
+            write_wavy_day(self.test_dir, date, phase=index * 1.3)
+    
+    def tearDown(self):
+        """Leave the shared cache empty for other tests"""
+        shared_day_cache.clear()
+    
+    def make_setups(self):
+        """Fresh setups for each run"""
+        return [CEScalpingSetup("ce", target_pct=30.0, stop_loss_pct=60.0, entry_timeindex=1010, reentry_gap=20),
+                StraddleSetup("straddle", target_pct=50.0, stop_loss_pct=100.0, entry_timeindex=1010)]
+    
+    def run_engine(self, **engine_kwargs):
+        """Backtest the test days"""
+        engine = BacktestEngine(self.test_dir, self.make_setups(), enable_dynamic_management=False, verbosity=0,
+                                **engine_kwargs)
+        return engine.run_backtest("QQQ", "2025-08-01", "2025-08-31")
+    
+    def test_records_every_tick(self):
+        """Every tick is recorded and the results are otherwise unchanged"""
+        plain = self.run_engine()
+        results = self.run_engine(equity_recorder=EquityRecorder())
+        
+        self.assertIsNone(plain.intraday_equity)
+        self.assertEqual(list(results.trade_log), list(plain.trade_log))
+        
+        points = results.intraday_equity.get_points("QQQ")
+        ticks_per_day = len(range(1000, 1355, 5))  # Through the job end tick
+        self.assertEqual(len(points), 4 * ticks_per_day)
+        self.assertEqual([date for date, _, _ in points[::ticks_per_day]],
+                         ["2025-08-11", "2025-08-12", "2025-08-13", "2025-08-14"])
+        self.assertAlmostEqual(points[-1][2], results.total_pnl)
+        self.assertGreater(len({round(equity, 2) for _, _, equity in points}), 10)
+    
+    def test_parallel_matches_sequential(self):
+        """Shards are shifted by earlier closed P&L and appended in date order"""
+        sequential = self.run_engine(equity_recorder=EquityRecorder(every_n_ticks=10, mode=DOWNSAMPLE_MINMAX))
+        
+        recorder = EquityRecorder(every_n_ticks=10, mode=DOWNSAMPLE_MINMAX)
+        runner = ParallelBacktestRunner(self.test_dir, self.make_setups(), max_workers=2, verbosity=0,
+                                        enable_dynamic_management=False, equity_recorder=recorder)
+        with contextlib.redirect_stdout(io.StringIO()):
+            parallel = runner.run_backtest("QQQ", "2025-08-01", "2025-08-31")
+        
+        expected = sequential.intraday_equity.get_points("QQQ")
+        actual = parallel.intraday_equity.get_points("QQQ")
+        self.assertEqual([point[:2] for point in actual], [point[:2] for point in expected])
+        for (_, _, actual_equity), (_, _, expected_equity) in zip(actual, expected):
+            self.assertAlmostEqual(actual_equity, expected_equity)
+    
+    def test_reporters_consume_recording(self):
+        """CSV export writes every point and the HTML chart data includes the series"""
+        results = self.run_engine(equity_recorder=EquityRecorder(every_n_ticks=5))
+        points = results.intraday_equity.get_points("QQQ")
+        
+        reporter = BacktestReporter.__new__(BacktestReporter)
+        reporter.results = results
+        reporter.report_dir = tempfile.mkdtemp()
+        reporter._export_intraday_equity_csv("equity.csv")
+        with open(os.path.join(reporter.report_dir, "equity.csv"), newline='') as f:
+            rows = list(csv.reader(f))
+        
+        self.assertEqual(rows[0], ['symbol', 'date', 'timestamp', 'equity'])
+        self.assertEqual(len(rows), len(points) + 1)
+        self.assertEqual(rows[1][:3], ["QQQ", points[0][0], str(points[0][1])])
+        
+        javascript = HTMLReporter(results)._generate_javascript()
+        self.assertIn("const intradaySeries = {'QQQ': [{'x': '%s %d', 'y': " % points[0][:2], javascript)
+    
+    def test_html_skips_intraday_chart_without_recording(self):
+        """Runs without an equity recorder get no intraday tab or chart script"""
+        reporter = HTMLReporter(self.run_engine())
+        
+        self.assertNotIn("intraday-equity", reporter._generate_charts_section())
+        self.assertNotIn("intradayChart", reporter._generate_javascript())
+        
+        recorded = HTMLReporter(self.run_engine(equity_recorder=EquityRecorder()))
+        self.assertIn("intradayChart", recorded._generate_charts_section())
+    
+    def test_html_chart_aligns_symbols_by_timestamp(self):
+        """Each symbol's chart points keep their own timestamps on a merged label axis"""
+        recorder = EquityRecorder()
+        recorder.start_day("2025-08-11")
+        for timestamp in (100, 200, 300):
+            recorder.record("QQQ", timestamp, 1.0)
+        recorder.record("SPY", 200, 2.0)
+        recorder.end_day()
+        
+        results = self.run_engine()
+        results.intraday_equity = recorder
+        javascript = HTMLReporter(results)._generate_javascript()
+        
+        self.assertIn("const intradayLabels = ['2025-08-11 100', '2025-08-11 200', '2025-08-11 300'];", javascript)
+        self.assertIn("'SPY': [{'x': '2025-08-11 200', 'y': 2.0}]", javascript)
+
+
+def run_equity_recorder_tests():
+    """Run equity recorder tests"""
+    print("Running Equity Recorder Tests")
+    print("=" * 50)
+    
+    suite = unittest.TestSuite()
+    suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestEquityRecorder))
+    suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestEngineEquityRecorder))
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+    
+    success = len(result.failures) == 0 and len(result.errors) == 0
+    print(f"\nEquity Recorder Tests: {'PASSED' if success else 'FAILED'}")
+    
+    return success
+
+
+if __name__ == "__main__":
+    run_equity_recorder_tests()
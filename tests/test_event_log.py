@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Tests for engine verbosity levels and structured event sinks
+"""
+
+import sys
+import os
+import io
+import json
+import tempfile
+import unittest
+import contextlib
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from backtesting_engine.backtest_engine import BacktestEngine
+from backtesting_engine.event_log import (EventLog, RingBufferSink, JsonlSink,
+                                          VERBOSITY_SILENT, VERBOSITY_SUMMARY, VERBOSITY_EVENTS)
+from backtesting_engine.strategies import StraddleSetup
+from backtesting_engine.day_cache import shared_day_cache
+from helpers import write_trading_day
+
+
+class TestEventLog(unittest.TestCase):
+    """Test level gating and sinks in isolation"""
+    
+    def test_levels_gate_console_and_sink_separately(self):
+        """The sink can record events the console does not print"""
+        sink = RingBufferSink()
+        event_log = EventLog(VERBOSITY_SUMMARY, sink)
+        output = io.StringIO()
+        
+        with contextlib.redirect_stdout(output):
+            event_log.event(VERBOSITY_SUMMARY, "day_completed", "day line", date="2025-08-13")
+            event_log.event(VERBOSITY_EVENTS, "position_opened", "open line", timestamp=1010)
+        
+        self.assertEqual(output.getvalue(), "day line\n")
+        self.assertEqual([event["kind"] for event in sink.get_events()], ["day_completed", "position_opened"])
+        self.assertEqual(sink.get_events("position_opened")[0]["timestamp"], 1010)
+    
+    def test_silent_without_sink_is_disabled(self):
+        """Hot-loop guards should see every level above silent as disabled"""
+        event_log = EventLog(VERBOSITY_SILENT)
+        
+        self.assertFalse(event_log.is_enabled(VERBOSITY_SUMMARY))
+        self.assertFalse(event_log.is_enabled(VERBOSITY_EVENTS))
+    
+    def test_ring_buffer_keeps_latest_events(self):
+        """Old events are dropped once the buffer is full"""
+        sink = RingBufferSink(capacity=2)
+        for timestamp in range(5):
+            sink.record({"kind": "tick", "timestamp": timestamp})
+        
+        self.assertEqual([event["timestamp"] for event in sink.get_events()], [3, 4])
+
+
+class TestEngineEvents(unittest.TestCase):
+    """Test that the engine routes its output through the event log"""
+    
+    def setUp(self):
+        """Create one QQQ day with a straddle entry"""
+        shared_day_cache.clear()
+        self.test_dir = tempfile.mkdtemp()
+        self.date = "2025-08-13"
+        write_trading_day(self.test_dir, "QQQ", self.date, drift=0.05)
+    
+    def tearDown(self):
+        """Leave the shared cache empty for other tests"""
+        shared_day_cache.clear()
+    
+    def run_engine(self, **engine_kwargs):
+        """Run the test day and return (results, console output)"""
+        setup = StraddleSetup(setup_id="straddle", target_pct=50.0, stop_loss_pct=100.0,
+                              entry_timeindex=1010, close_timeindex=1090, scalping_price=0.40)
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            engine = BacktestEngine(self.test_dir, [setup], **engine_kwargs)
+            results = engine.run_backtest("QQQ", "2025-08-01", "2025-08-31")
+        return results, output.getvalue()
+    
+    def test_default_verbosity_prints_events(self):
+        """The default keeps the existing console output"""
+        _, output = self.run_engine()
+        
+        self.assertIn("Running backtest for QQQ", output)
+        self.assertIn("📈 straddle: Opened at 1010", output)
+        self.assertIn(f"Day {self.date} completed", output)
+    
+    def test_silent_mode_matches_results(self):
+        """Silent mode prints nothing from the engine and changes no results"""
+        loud, _ = self.run_engine(enable_dynamic_management=False)
+        silent, output = self.run_engine(enable_dynamic_management=False, verbosity=VERBOSITY_SILENT)
+        
+        self.assertEqual(output, "")
+        self.assertEqual(silent.total_trades, loud.total_trades)
+        self.assertAlmostEqual(silent.total_pnl, loud.total_pnl)
+    
+    def test_sink_records_structured_events(self):
+        """Silent console plus a sink still captures opens and day summaries"""
+        sink = RingBufferSink()
+        results, output = self.run_engine(verbosity=VERBOSITY_SILENT, event_sink=sink)
+        
+        self.assertEqual(output, "")
+        opened = sink.get_events("position_opened")
+        self.assertEqual(len(opened), 1)
+        self.assertEqual(opened[0]["setup_id"], "straddle")
+        self.assertEqual(opened[0]["timestamp"], 1010)
+        
+        completed = sink.get_events("day_completed")
+        self.assertEqual(len(completed), 1)
+        self.assertEqual(completed[0]["date"], self.date)
+        self.assertAlmostEqual(completed[0]["pnl"], results.total_pnl)
+    
+    def test_missing_day_goes_through_event_log(self):
+        """A day without data is reported as an event, not printed in silent mode"""
+        sink = RingBufferSink()
+        engine = BacktestEngine(self.test_dir, [], verbosity=VERBOSITY_SILENT, event_sink=sink)
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            self.assertIsNone(engine.process_trading_day("QQQ", "2025-08-20"))
+        
+        self.assertNotIn("Could not load data", output.getvalue())
+        self.assertEqual(sink.get_events("data_missing")[0]["date"], "2025-08-20")
+    
+    def test_jsonl_sink_writes_parseable_lines(self):
+        """Each event should be one JSON object per line"""
+        filename = os.path.join(self.test_dir, "events.jsonl")
+        self.run_engine(verbosity=VERBOSITY_SILENT, event_sink=JsonlSink(filename))
+        
+        with open(filename, 'r') as f:
+            events = [json.loads(line) for line in f]
+        
+        self.assertEqual(events[0]["kind"], "backtest_started")
+        self.assertIn("position_opened", [event["kind"] for event in events])
+        self.assertEqual(events[-1]["kind"], "day_completed")
+
+
+def run_event_log_tests():
+    """Run event log tests"""
+    print("Running Event Log Tests")
+    print("=" * 50)
+    
+    suite = unittest.TestSuite()
+    suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestEventLog))
+    suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestEngineEvents))
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+    
+    success = len(result.failures) == 0 and len(result.errors) == 0
+    print(f"\nEvent Log Tests: {'PASSED' if success else 'FAILED'}")
+    
+    return success
+
+
+if __name__ == "__main__":
+    run_event_log_tests()
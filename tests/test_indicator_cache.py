@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared per-day indicator cache
+"""
+
+import sys
+import os
+import copy
+import math
+import pickle
+import shutil
+import tempfile
+import unittest
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from backtesting_engine.models import MarketData
+from backtesting_engine.backtest_engine import BacktestEngine
+from backtesting_engine.data_loader import DataLoader
+from backtesting_engine.market_regime_detector import MarketRegimeDetector
+from backtesting_engine.strategies import MomentumReversalSetup, VolatilitySkewSetup
+from backtesting_engine.indicator_cache import DayIndicators, IndicatorCache, shared_indicator_cache, INDICATOR_FORMAT_VERSION
+from backtesting_engine.day_cache import shared_day_cache
+from helpers import write_wavy_day
+
+
+def make_tick(index, symbol="QQQ"):
+    """A tick with a swinging spot price and three strikes of each option type"""
+    spot_price = 580.0 + 2.0 * math.sin(index / 3.0) + 0.05 * index
+    return MarketData(
+        timestamp=1000 + 5 * index,
+        symbol=symbol,
+        spot_price=spot_price,
+        option_prices={
+            "CE": {575.0: 6.0 + 0.01 * index, 580.0: 2.5 + 0.02 * index, 585.0: 0.8},
+            "PE": {575.0: 0.7, 580.0: 2.4 - 0.01 * index, 585.0: 5.5}
+        },
+        available_strikes=[575.0, 580.0, 585.0]
+    )
+
+
+def reference_velocities(prices, lookback):
+    """Velocity history as MomentumReversalSetup kept it in its own lists"""
+    history, velocities = [], []
+    for price in prices:
+        history.append(price)
+        if len(history) > lookback * 2:
+            history = history[-lookback:]
+        velocities.append((history[-1] - history[-2]) / history[-2] if len(history) >= 2 and history[-2] != 0 else 0.0)
+        velocities = velocities[-lookback:]
+    return velocities
+
+
+class TestDayIndicators(unittest.TestCase):
+    """Test the per-day series and their slices"""
+    
+    def test_repeated_updates_share_ticks_without_look_ahead(self):
+        """Updating a view with a stored tick only moves its cursor back to it"""
+        indicators = DayIndicators("QQQ", "2025-08-11")
+        view = indicators.view()
+        ticks = [make_tick(index) for index in range(30)]
+        for tick in ticks:
+            view.update(tick)
+        self.assertEqual(len(indicators), 30)
+        
+        self.assertEqual(view.update(ticks[9]), 9)
+        self.assertEqual(len(indicators), 30)
+        self.assertEqual(view.recent_spot(3), [tick.spot_price for tick in ticks[7:10]])
+        self.assertEqual(view.recent_option_prices(20)["CE_580.0"],
+                         [tick.option_prices["CE"][580.0] for tick in ticks[:10]])
+        
+        self.assertEqual(view.update(ticks[29]), 29)
+        self.assertEqual(view.recent_spot(2), [ticks[28].spot_price, ticks[29].spot_price])
+    
+    def test_views_keep_separate_cursors(self):
+        """A consumer behind another one never reads the other's later ticks"""
+        indicators = DayIndicators("QQQ", "2025-08-11")
+        ahead, behind = indicators.view(), indicators.view()
+        ticks = [make_tick(index) for index in range(30)]
+        for tick in ticks:
+            ahead.update(tick)
+        for tick in ticks[:10]:
+            behind.update(tick)
+        
+        self.assertEqual(behind.recent_spot(100), [tick.spot_price for tick in ticks[:10]])
+        self.assertNotIn("CE_580.0", indicators.view().recent_option_prices(20))
+        self.assertEqual(ahead.recent_spot(1), [ticks[29].spot_price])
+    
+    def test_momentum_history_matches_private_lists(self):
+        """Velocities read from the shared series match the setup's former private bookkeeping"""
+        setup = MomentumReversalSetup("momentum", 50.0, 100.0, 1000, reversion_lookback=8)
+        ticks = [make_tick(index) for index in range(40)]
+        for count, tick in enumerate(ticks, start=1):
+            setup.update_price_data(tick)
+            expected = reference_velocities([t.spot_price for t in ticks[:count]], 8)
+            self.assertEqual(len(setup.velocity_history), len(expected))
+            for actual, wanted in zip(setup.velocity_history, expected):
+                self.assertAlmostEqual(actual, wanted, places=15)
+            self.assertEqual(setup.price_history[-1], tick.spot_price)
+        
+        setup.reset_daily_state()
+        self.assertEqual(setup.price_history, [])
+        self.assertEqual(setup.velocity_history, [])
+    
+    def test_private_momentum_series_is_spot_only(self):
+        """An unbound momentum setup records no option series"""
+        setup = MomentumReversalSetup("momentum", 50.0, 100.0, 1000)
+        for index in range(5):
+            setup.update_price_data(make_tick(index))
+        
+        self.assertFalse(setup.indicators_bound)
+        self.assertEqual(setup.indicators.indicators.options, {})
+        self.assertEqual(len(setup.indicators.indicators.spot_prices), 5)
+    
+    def test_binding_survives_daily_reset(self):
+        """A daily reset rewinds a bound view instead of dropping the binding"""
+        indicators = DayIndicators("QQQ", "2025-08-11")
+        setup = MomentumReversalSetup("momentum", 50.0, 100.0, 1000, reversion_lookback=5)
+        setup.bind_indicators(indicators)
+        ticks = [make_tick(index) for index in range(12)]
+        for tick in ticks:
+            setup.update_price_data(tick)
+        
+        setup.reset_daily_state()
+        self.assertTrue(setup.indicators_bound)
+        self.assertIs(setup.indicators.indicators, indicators)
+        self.assertEqual(setup.price_history, [])
+        
+        # Replaying the day reads the stored ticks
+        setup.update_price_data(ticks[3])
+        self.assertEqual(len(indicators), 12)
+        self.assertEqual(setup.price_history, [tick.spot_price for tick in ticks[:4]])
+        
+        next_day = DayIndicators("QQQ", "2025-08-12")
+        setup.bind_indicators(next_day)
+        setup.update_price_data(ticks[0])
+        self.assertEqual(len(next_day), 1)
+    
+    def test_setups_share_one_series(self):
+        """Twenty bound setups read one series fed once per tick"""
+        indicators = DayIndicators("QQQ", "2025-08-11")
+        setups = [MomentumReversalSetup(f"momentum_{index}", 50.0, 100.0, 1000, reversion_lookback=5 + index)
+                  for index in range(20)]
+        skew = VolatilitySkewSetup("skew", 50.0, 100.0, 1000)
+        for setup in setups + [skew]:
+            setup.bind_indicators(indicators)
+        
+        for index in range(25):
+            tick = make_tick(index)
+            for setup in setups:
+                setup.update_price_data(tick)  # Stored by the first setup; the rest only move their cursor
+            skew.update_iv_data(tick)
+        
+        self.assertEqual(len(indicators), 25)
+        for setup in setups:
+            self.assertIs(setup.indicators.indicators, indicators)
+            self.assertEqual(len(setup.velocity_history), setup.reversion_lookback)
+        setup_copy = copy.deepcopy(setups[0])
+        self.assertIs(setup_copy.indicators.indicators, indicators)
+        self.assertIsNot(setup_copy.indicators, setups[0].indicators)
+        self.assertEqual(setup_copy.indicators.cursor, setups[0].indicators.cursor)
+        self.assertEqual(set(skew.price_history), {"CE_575.0", "CE_580.0", "CE_585.0",
+                                                   "PE_575.0", "PE_580.0", "PE_585.0"})
+        self.assertEqual(len(skew.price_history["PE_580.0"]), 20)
+    
+    def test_regime_series_matches_detector(self):
+        """The day's regime series equals classifying the stored ticks directly"""
+        indicators = DayIndicators("QQQ", "2025-08-11")
+        detector = MarketRegimeDetector(lookback_periods=10)
+        for index in range(80):
+            tick = make_tick(index)
+            indicators.add(tick)
+            detector.update_market_data(tick)
+        
+        series = indicators.regime_series(10)
+        self.assertIs(indicators.regime_series(10), series)
+        self.assertEqual(len(series), 80)
+        self.assertEqual(series.regimes[-1], detector.current_regime)
+        self.assertAlmostEqual(series.estimated_volatility[-1], detector.estimated_volatility, places=12)
+    
+    def test_cache_evicts_least_recently_used(self):
+        """The LRU keeps at most max_days entries"""
+        cache = IndicatorCache(max_days=2)
+        for date in ["a", "b", "c"]:
+            cache.put(("QQQ", date), DayIndicators("QQQ", date))
+        self.assertIsNone(cache.get(("QQQ", "a")))
+        self.assertEqual(cache.get(("QQQ", "c")).date, "c")
+        self.assertEqual(cache.get_stats()["entries"], 2)
+
+
+class TestIndicatorPersistence(unittest.TestCase):
+    """Test loading and saving day indicators through DataLoader and the engine"""
+    
+    def setUp(self):
+        """Create two oscillating QQQ days"""
+        shared_day_cache.clear()
+        shared_indicator_cache.clear()
+        self.test_dir = tempfile.mkdtemp()
+        for index, date in enumerate(["2025-08-11", "2025-08-12"]):
+            write_wavy_day(self.test_dir, date, phase=index * 1.3)
+    
+    def tearDown(self):
+        """Leave the shared caches empty for other tests"""
+        shared_day_cache.clear()
+        shared_indicator_cache.clear()
+        shutil.rmtree(self.test_dir)
+    
+    def test_saved_indicators_reload_from_disk(self):
+        """A saved day is read back with the same series"""
+        loader = DataLoader(self.test_dir)
+        indicators = loader.get_day_indicators("QQQ", "2025-08-11")
+        self.assertIs(loader.get_day_indicators("QQQ", "2025-08-11"), indicators)
+        for index in range(12):
+            indicators.add(make_tick(index))
+        loader.save_day_indicators(indicators)
+        self.assertTrue(os.path.exists(loader.get_indicator_file("QQQ", "2025-08-11")))
+        
+        shared_indicator_cache.clear()
+        reloaded = DataLoader(self.test_dir).get_day_indicators("QQQ", "2025-08-11")
+        self.assertIsNot(reloaded, indicators)
+        self.assertEqual(reloaded.spot_prices, indicators.spot_prices)
+        self.assertEqual(reloaded.options["CE_580.0"].prices, indicators.options["CE_580.0"].prices)
+        self.assertEqual(reloaded.stored_ticks, 12)
+    
+    def test_other_format_versions_are_rejected(self):
+        """An indicator file written in another format version is ignored and rebuilt"""
+        loader = DataLoader(self.test_dir)
+        stale = DayIndicators("QQQ", "2025-08-11")
+        stale.add(make_tick(0))
+        indicator_file = loader.get_indicator_file("QQQ", "2025-08-11")
+        os.makedirs(os.path.dirname(indicator_file), exist_ok=True)
+        with open(indicator_file, 'wb') as file:
+            pickle.dump((INDICATOR_FORMAT_VERSION + 1, stale), file)
+        
+        self.assertEqual(len(loader.get_day_indicators("QQQ", "2025-08-11")), 0)
+    
+    def test_engine_does_not_feed_pattern_setups(self):
+        """The cache leaves the engine's feeding as it was: pattern setups get no history"""
+        setups = [MomentumReversalSetup(f"momentum_{index}", 50.0, 0.01, 1000, momentum_threshold=0.0)
+                  for index in range(3)]
+        engine = BacktestEngine(self.test_dir, setups, enable_dynamic_management=False, verbosity=0)
+        results = engine.run_backtest("QQQ", "2025-08-11", "2025-08-12")
+        
+        self.assertEqual(results.total_trades, 0)
+        self.assertTrue(all(setup.indicators is None for setup in setups))
+        self.assertFalse(os.path.exists(engine.data_loader.get_indicator_file("QQQ", "2025-08-11")))
+
+
+def run_indicator_cache_tests():
+    """Run indicator cache tests"""
+    print("Running Indicator Cache Tests")
+    print("=" * 50)
+    
+    suite = unittest.TestSuite()
+    suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestDayIndicators))
+    suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestIndicatorPersistence))
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+    
+    success = len(result.failures) == 0 and len(result.errors) == 0
+    print(f"\nIndicator Cache Tests: {'PASSED' if success else 'FAILED'}")
+    
+    return success
+
+
+if __name__ == "__main__":
+    run_indicator_cache_tests()
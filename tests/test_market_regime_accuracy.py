@@ -11,7 +11,7 @@ from typing import List, Tuple
 
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from backtesting_engine.market_regime_detector import MarketRegimeDetector
+from backtesting_engine.market_regime_detector import MarketRegimeDetector, average_option_price
 from backtesting_engine.models import MarketData
 
 
@@ -412,6 +412,33 @@ class TestMarketRegimeAccuracy(unittest.TestCase):
         
         self.assertGreater(accuracy, 0.8, f"Accuracy {accuracy:.2f} too low")
         print(f"\nOverall accuracy: {accuracy:.2f} ({correct_detections}/{len(results)})")
+    
+    def test_batch_classification_matches_streaming(self):
+        """classify_day should reproduce every tick of the streaming path exactly"""
+        day_data = []
+        for pattern in ["tight_range", "strong_uptrend", "high_volatility", "strong_downtrend", "low_volatility"]:
+            day_data.extend(self.create_synthetic_market_data(pattern, 80))
+        for index, data_point in enumerate(day_data):
+            data_point.timestamp = 1000 + index * 5
+            if index % 4 == 3:
+                data_point.option_prices = {}  # Ticks without option quotes
+        
+        spot_prices = [data_point.spot_price for data_point in day_data]
+        avg_option_prices = [average_option_price(data_point.option_prices) if data_point.option_prices else None
+                             for data_point in day_data]
+        series = self.detector.classify_day(spot_prices, avg_option_prices)
+        
+        self.assertEqual(len(self.detector.price_history), 0, "classify_day should not change the detector")
+        self.assertEqual(len(series), len(day_data))
+        
+        for data_point in day_data:
+            self.detector.update_market_data(data_point)
+        
+        self.assertEqual(list(series.price_velocity), [data_point.price_velocity for data_point in day_data])
+        self.assertEqual(list(series.trend_strength), [data_point.trend_strength for data_point in day_data])
+        self.assertEqual(list(series.estimated_volatility), [data_point.estimated_volatility for data_point in day_data])
+        self.assertEqual(series.regimes, [data_point.regime_classification for data_point in day_data])
+        self.assertGreater(len(set(series.regimes)), 2)
 
 
 def run_regime_accuracy_tests():
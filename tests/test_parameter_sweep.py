@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Tests for the parallel parameter sweep API
+"""
+
+import sys
+import os
+import math
+import io
+import tempfile
+import contextlib
+import unittest
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from backtesting_engine.parameter_sweep import ParameterSweep, StraddleGridSweep, SweepResult, calculate_profit_factor
+from backtesting_engine.backtest_engine import BacktestEngine
+from backtesting_engine.strategies import StraddleSetup
+from backtesting_engine.day_cache import shared_day_cache
+from helpers import write_trading_day, write_wavy_day
+
+
+class TestParameterSweep(unittest.TestCase):
+    """Test grid expansion, parallel evaluation and result tables"""
+    
+    def setUp(self):
+        """Create three QQQ days with different drifts"""
+        shared_day_cache.clear()
+        self.test_dir = tempfile.mkdtemp()
+        for index, date in enumerate(["2025-08-11", "2025-08-12", "2025-08-13"]):
+            write_trading_day(self.test_dir, "QQQ", date, drift=0.05 * (index - 1))
+        
+        self.grid = {'target_pct': [20.0, 60.0], 'stop_loss_pct': [30.0, 100.0]}
+        self.fixed = {'entry_timeindex': 1010, 'scalping_price': 0.40}
+    
+    def tearDown(self):
+        """Leave the shared cache empty for other tests"""
+        shared_day_cache.clear()
+    
+    def make_sweep(self, max_workers):
+        """Sweep over the test grid"""
+        return ParameterSweep(StraddleSetup, self.grid, fixed_parameters=self.fixed, data_path=self.test_dir,
+                              max_workers=max_workers, enable_dynamic_management=False)
+    
+    def test_grid_expansion_order(self):
+        """Combinations follow itertools.product order over the grid"""
+        combinations = self.make_sweep(1).expand_combinations()
+        
+        self.assertEqual(len(combinations), 4)
+        self.assertEqual(combinations[0], {'target_pct': 20.0, 'stop_loss_pct': 30.0})
+        self.assertEqual(combinations[1], {'target_pct': 20.0, 'stop_loss_pct': 100.0})
+        self.assertEqual(combinations[3], {'target_pct': 60.0, 'stop_loss_pct': 100.0})
+    
+    def test_metrics_match_direct_backtest(self):
+        """Each result should equal a hand-built engine run with the same parameters"""
+        results = self.make_sweep(1).run("QQQ", "2025-08-01", "2025-08-31")
+        
+        for result in results:
+            setup = StraddleSetup(setup_id="direct", **self.fixed, **result.parameters)
+            direct = BacktestEngine(self.test_dir, [setup], enable_dynamic_management=False).run_backtest(
+                "QQQ", "2025-08-01", "2025-08-31")
+            
+            self.assertAlmostEqual(result.total_pnl, direct.total_pnl)
+            self.assertEqual(result.total_trades, direct.total_trades)
+            self.assertAlmostEqual(result.max_drawdown, direct.max_drawdown)
+            profit_factor = calculate_profit_factor(direct)
+            self.assertTrue(result.profit_factor == profit_factor or
+                            (math.isinf(result.profit_factor) and math.isinf(profit_factor)))
+        
+        self.assertGreater(sum(result.total_trades for result in results), 0)
+    
+    def test_worker_pool_matches_in_process_run(self):
+        """Results from the process pool should be identical and in combination order"""
+        serial = self.make_sweep(1).run("QQQ", "2025-08-01", "2025-08-31")
+        parallel = self.make_sweep(2).run("QQQ", "2025-08-01", "2025-08-31")
+        
+        self.assertEqual([result.to_row() for result in parallel], [result.to_row() for result in serial])
+    
+    def test_sweep_converts_days_to_cache(self):
+        """Running a sweep should leave binary day files for workers to map"""
+        self.make_sweep(1).run("QQQ", "2025-08-01", "2025-08-31")
+        
+        cache_dir = os.path.join(self.test_dir, ".cache", "QQQ")
+        self.assertEqual(len(os.listdir(cache_dir)), 3)
+    
+    def test_quiet_sweep_prints_nothing(self):
+        """The progress line is only printed when quiet is off"""
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            self.make_sweep(1).run("QQQ", "2025-08-01", "2025-08-31")
+        self.assertEqual(output.getvalue(), "")
+        
+        sweep = ParameterSweep(StraddleSetup, self.grid, fixed_parameters=self.fixed, data_path=self.test_dir,
+                               max_workers=1, quiet=False, enable_dynamic_management=False, verbosity=0)
+        with contextlib.redirect_stdout(output):
+            sweep.run("QQQ", "2025-08-01", "2025-08-31")
+        self.assertIn("Sweeping 4 StraddleSetup combinations", output.getvalue())
+    
+    def test_format_table_sorts_by_metric(self):
+        """The text table should list the best combination first"""
+        results = [
+            SweepResult({'target_pct': 1.0}, 10.0, 2, 0.5, 3.0, 1.2, 2.0),
+            SweepResult({'target_pct': 2.0}, 25.0, 3, 0.6, 1.0, 1.5, 3.0),
+        ]
+        table = ParameterSweep.format_table(results, sort_by="total_pnl").splitlines()
+        
+        self.assertIn("target_pct", table[0])
+        self.assertIn("sharpe_ratio", table[0])
+        self.assertTrue(table[2].startswith("2 "))
+        self.assertEqual(len(table), 4)
+
+
+class TestStraddleGridSweep(unittest.TestCase):
+    """Test shared-path evaluation of straddle exit grids against full engine runs"""
+    
+    def setUp(self):
+        """Create four oscillating QQQ days"""
+        shared_day_cache.clear()
+        self.test_dir = tempfile.mkdtemp()
+        for index, date in enumerate(["2025-08-11", "2025-08-12", "2025-08-13", "2025-08-14"]):
+            write_wavy_day(self.test_dir, date, phase=index * 1.3)
+        
+        self.grid = {
+            'entry_timeindex': [1010, 1100],
+            'scalping_price': [0.40, 3.0],
+            'target_pct': [0.0, 50.0, 150.0, 400.0],
+            'stop_loss_pct': [0.0, 40.0, 120.0, 600.0],
+            'close_timeindex': [1200, 4650]
+        }
+    
+    def tearDown(self):
+        """Leave the shared cache empty for other tests"""
+        shared_day_cache.clear()
+    
+    def test_matches_engine_for_every_combination(self):
+        """Every exit variant should reproduce an independent engine run exactly"""
+        for daily_max_loss in [250.0, 1000.0]:
+            fast = StraddleGridSweep(self.grid, data_path=self.test_dir, daily_max_loss=daily_max_loss)
+            full = ParameterSweep(StraddleSetup, self.grid, data_path=self.test_dir, max_workers=1,
+                                  daily_max_loss=daily_max_loss, enable_dynamic_management=False)
+            
+            fast_rows = [result.to_row() for result in fast.run("QQQ", "2025-08-01", "2025-08-31")]
+            full_rows = [result.to_row() for result in full.run("QQQ", "2025-08-01", "2025-08-31")]
+            
+            self.assertEqual(len(fast_rows), 128)
+            self.assertEqual(fast_rows, full_rows)
+            self.assertGreater(len({row['total_pnl'] for row in fast_rows}), 10)
+    
+    def test_quiet_by_default_without_engine_arguments(self):
+        """No engines are built, so no engine arguments are kept, and the progress line needs quiet=False"""
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            StraddleGridSweep(self.grid, data_path=self.test_dir).run("QQQ", "2025-08-11", "2025-08-11")
+            self.assertEqual(output.getvalue(), "")
+            sweep = StraddleGridSweep(self.grid, data_path=self.test_dir, daily_max_loss=-250.0, quiet=False)
+            sweep.run("QQQ", "2025-08-11", "2025-08-11")
+        
+        self.assertIn("Sweeping 128 StraddleSetup combinations over 4 distinct entries", output.getvalue())
+        self.assertEqual(sweep.engine_kwargs, {})
+        self.assertEqual(sweep.daily_max_loss, 250.0)
+    
+    def test_rejects_multiple_symbols(self):
+        """Paths are per symbol, so only one symbol can be swept at a time"""
+        with self.assertRaises(ValueError):
+            StraddleGridSweep(self.grid, data_path=self.test_dir).run(["QQQ", "SPY"], "2025-08-01", "2025-08-31")
+
+
+def run_parameter_sweep_tests():
+    """Run parameter sweep tests"""
+    print("Running Parameter Sweep Tests")
+    print("=" * 50)
+    
+    suite = unittest.TestSuite()
+    suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestParameterSweep))
+    suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestStraddleGridSweep))
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+    
+    success = len(result.failures) == 0 and len(result.errors) == 0
+    print(f"\nParameter Sweep Tests: {'PASSED' if success else 'FAILED'}")
+    
+    return success
+
+
+if __name__ == "__main__":
+    run_parameter_sweep_tests()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Tests for sliding-window accumulators and the streaming regime indicators built on them
+"""
+
+import sys
+import os
+import math
+import unittest
+from collections import deque
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from backtesting_engine.rolling_stats import RollingVariance, RollingSlope, RollingLogReturns
+from backtesting_engine.market_regime_detector import MarketRegimeDetector
+from backtesting_engine.models import MarketData
+from helpers import random_walk
+
+
+def least_squares_slope(values):
+    """Slope of values against positions 0..n-1, recomputed from scratch"""
+    n = len(values)
+    x_mean = (n - 1) / 2
+    y_mean = sum(values) / n
+    return (sum((i - x_mean) * (value - y_mean) for i, value in enumerate(values))
+            / sum((i - x_mean) ** 2 for i in range(n)))
+
+
+def population_std_of_log_returns(values):
+    """Standard deviation of log returns over positive consecutive pairs"""
+    returns = [math.log(values[i] / values[i - 1]) for i in range(1, len(values))
+               if values[i - 1] > 0 and values[i] > 0]
+    if not returns:
+        return 0.0
+    mean = sum(returns) / len(returns)
+    return math.sqrt(sum((ret - mean) ** 2 for ret in returns) / len(returns))
+
+
+class TestRollingAccumulators(unittest.TestCase):
+    """Compare each accumulator with a full recomputation of its window"""
+    
+    def test_variance_matches_window(self):
+        """Adding and removing values tracks the window's population variance"""
+        stats = RollingVariance()
+        window = deque()
+        for value in random_walk(500, seed=1, start=1.0, step=0.01):
+            window.append(value)
+            stats.add(value)
+            if len(window) > 30:
+                stats.remove(window.popleft())
+            
+            mean = sum(window) / len(window)
+            self.assertAlmostEqual(stats.mean, mean, places=12)
+            self.assertAlmostEqual(stats.variance, sum((v - mean) ** 2 for v in window) / len(window), places=12)
+        
+        for value in list(window):
+            stats.remove(value)
+        self.assertEqual((stats.count, stats.mean, stats.variance), (0, 0.0, 0.0))
+    
+    def test_slope_matches_least_squares(self):
+        """The slope stays exact to float tolerance across many evictions"""
+        values = deque(maxlen=60)
+        trend = RollingSlope(values)
+        for price in random_walk(5000, seed=2):
+            evicted = values[0] if len(values) == values.maxlen else None
+            values.append(price)
+            trend.update(price, evicted)
+            
+            if len(values) >= 2:
+                self.assertAlmostEqual(trend.slope(), least_squares_slope(list(values)), places=9)
+                self.assertAlmostEqual(trend.mean(), sum(values) / len(values), places=9)
+    
+    def test_log_returns_skip_non_positive_values(self):
+        """Pairs touching a non-positive value have no return and leave the window in step"""
+        series = RollingLogReturns(window=4)
+        for value in [1.0, 1.1, 0.0, 1.2, 1.3, 1.25, 1.4, 1.35]:
+            series.push(value)
+            self.assertEqual(len(series.returns), len(series.values) - 1)
+            self.assertAlmostEqual(series.std(), population_std_of_log_returns(list(series.values)), places=12)
+        
+        self.assertEqual(list(series.values), [1.3, 1.25, 1.4, 1.35])
+        self.assertEqual(series.push(1.5), 1.3)
+
+
+class TestStreamingRegimeIndicators(unittest.TestCase):
+    """The detector's O(1) indicators should equal full-window recomputation"""
+    
+    def feed(self, detector, prices):
+        """Update the detector tick by tick, checking indicators against the stored history"""
+        for index, price in enumerate(prices):
+            option_price = 5.0 + math.sin(index / 20.0)
+            detector.update_market_data(MarketData(
+                timestamp=1000 + 5 * index, symbol="QQQ", spot_price=price,
+                option_prices={"CE": {580.0: option_price}, "PE": {580.0: 10.0 - option_price}},
+                available_strikes=[580.0]))
+            
+            history = list(detector.price_history)
+            if len(history) >= 10:
+                expected_trend = max(-1.0, min(1.0, least_squares_slope(history) / (sum(history) / len(history)) * 1000))
+                self.assertAlmostEqual(detector.trend_strength, expected_trend, places=9)
+            if len(history) >= 5:
+                realized = population_std_of_log_returns(history) * math.sqrt(252 * 78)
+                implied = population_std_of_log_returns(list(detector.option_price_history)) * math.sqrt(252 * 78) * 0.5
+                self.assertAlmostEqual(detector.estimated_volatility, 0.7 * realized + 0.3 * implied, places=9)
+    
+    def test_default_lookback(self):
+        self.feed(MarketRegimeDetector(lookback_periods=60), random_walk(400, seed=3))
+    
+    def test_long_lookback(self):
+        """An hour-long window fills and then slides"""
+        detector = MarketRegimeDetector(lookback_periods=720)
+        self.feed(detector, random_walk(900, seed=4))
+        self.assertEqual(len(detector.price_history), 720)
+
+
+def run_rolling_stats_tests():
+    """Run rolling statistics tests"""
+    print("Running Rolling Statistics Tests")
+    print("=" * 50)
+    
+    suite = unittest.TestSuite()
+    suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestRollingAccumulators))
+    suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestStreamingRegimeIndicators))
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+    
+    success = len(result.failures) == 0 and len(result.errors) == 0
+    print(f"\nRolling Statistics Tests: {'PASSED' if success else 'FAILED'}")
+    
+    return success
+
+
+if __name__ == "__main__":
+    run_rolling_stats_tests()
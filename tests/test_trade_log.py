@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Tests for the columnar trade log
+"""
+
+import sys
+import os
+import pickle
+import tempfile
+import tracemalloc
+import unittest
+from unittest.mock import patch
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from backtesting_engine.backtest_engine import BacktestEngine
+from backtesting_engine.models import BacktestResults
+from backtesting_engine.reporting import BacktestReporter
+from backtesting_engine.strategies import CEScalpingSetup, StraddleSetup
+from backtesting_engine.trade_log import TradeLog
+from backtesting_engine.day_cache import shared_day_cache
+from helpers import make_trade, write_wavy_day
+
+
+class TestTradeLog(unittest.TestCase):
+    """Test that the log reads back exactly what was appended"""
+    
+    def setUp(self):
+        self.trades = [make_trade(index) for index in range(10)]
+        self.trades.append(make_trade(10, strikes={"CE": 580, "label": "ATM"}, gamma_pnl=3.5, rebalance_count=2))
+        self.log = TradeLog(self.trades)
+    
+    def test_round_trip(self):
+        """Iteration, indexing and slicing return equal Trade objects"""
+        self.assertEqual(len(self.log), len(self.trades))
+        self.assertEqual(list(self.log), self.trades)
+        self.assertEqual(self.log[-1], self.trades[-1])
+        self.assertEqual(self.log[-3:], self.trades[-3:])
+        self.assertEqual(self.log, self.trades)
+        with self.assertRaises(IndexError):
+            self.log[len(self.trades)]
+    
+    def test_irregular_dicts_keep_types(self):
+        """Dicts with non-float values are stored as-is"""
+        strikes = self.log[-1].strikes
+        self.assertIs(type(strikes["CE"]), int)
+        self.assertEqual(strikes["label"], "ATM")
+    
+    def test_trades_are_copies(self):
+        """Changing a returned Trade does not change the log"""
+        trade = self.log[0]
+        trade.pnl = 999.0
+        trade.entry_prices["CE"] = 0.0
+        self.assertEqual(self.log[0], self.trades[0])
+    
+    def test_select_filters_on_ids(self):
+        """select() matches a list comprehension over the trades"""
+        self.assertEqual(self.log.select(setup_id="setup1", symbol="QQQ"),
+                         [trade for trade in self.trades if trade.setup_id == "setup1" and trade.symbol == "QQQ"])
+        self.assertEqual(self.log.select(setup_id="missing"), [])
+    
+    def test_log_is_smaller_than_trade_list(self):
+        """The columnar log allocates a fraction of the equivalent Trade objects and pickles back equal"""
+        def allocated(build):
+            tracemalloc.start()
+            kept = build()
+            size = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            return kept, size
+        
+        trades, list_size = allocated(lambda: [make_trade(index) for index in range(2000)])
+        log, log_size = allocated(lambda: TradeLog(make_trade(index) for index in range(2000)))
+        
+        self.assertLess(log_size * 3, list_size)
+        self.assertEqual(pickle.loads(pickle.dumps(log)), trades)
+    
+    def test_trade_has_slots(self):
+        """Trade records carry no per-instance __dict__"""
+        self.assertFalse(hasattr(self.trades[0], "__dict__"))
+    
+    def test_reporter_builds_trades_once(self):
+        """A report's several passes over the trades share one set of Trade objects"""
+        results = BacktestResults(total_pnl=sum(trade.pnl for trade in self.trades), daily_results=[],
+                                  trade_log=self.log, setup_performance={}, total_trades=len(self.trades))
+        with patch.object(BacktestReporter, "_ensure_report_dir"):
+            reporter = BacktestReporter(results)
+        with patch.object(TradeLog, "get_trade", autospec=True, side_effect=TradeLog.get_trade) as get_trade:
+            reporter._discover_trading_patterns()
+            reporter._get_trade_stats()
+        
+        self.assertEqual(get_trade.call_count, len(self.trades))
+        self.assertEqual(reporter._get_trades(), self.trades)
+
+
+class TestEngineTradeLog(unittest.TestCase):
+    """Test that engine results come back through the trade log"""
+    
+    def test_results_use_trade_log(self):
+        """Totals computed from the columns match the Trade objects"""
+        shared_day_cache.clear()
+        test_dir = tempfile.mkdtemp()
+        for index, date in enumerate(["2025-08-11", "2025-08-12"]):
+            write_wavy_day(test_dir, date, phase=index * 1.3)
+        
+        setups = [CEScalpingSetup("ce", target_pct=30.0, stop_loss_pct=60.0, entry_timeindex=1010, reentry_gap=20),
+                  StraddleSetup("straddle", target_pct=50.0, stop_loss_pct=100.0, entry_timeindex=1010)]
+        engine = BacktestEngine(test_dir, setups, enable_dynamic_management=False, verbosity=0)
+        results = engine.run_backtest("QQQ", "2025-08-01", "2025-08-31")
+        shared_day_cache.clear()
+        
+        self.assertIsInstance(results.trade_log, TradeLog)
+        trades = list(results.trade_log)
+        self.assertGreater(len(trades), 5)
+        self.assertEqual(results.total_pnl, sum(trade.pnl for trade in trades))
+        self.assertEqual(results.setup_performance["ce"].total_trades,
+                         len([trade for trade in trades if trade.setup_id == "ce"]))
+
+
+def run_trade_log_tests():
+    """Run trade log tests"""
+    print("Running Trade Log Tests")
+    print("=" * 50)
+    
+    suite = unittest.TestSuite()
+    suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestTradeLog))
+    suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestEngineTradeLog))
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+    
+    success = len(result.failures) == 0 and len(result.errors) == 0
+    print(f"\nTrade Log Tests: {'PASSED' if success else 'FAILED'}")
+    
+    return success
+
+
+if __name__ == "__main__":
+    run_trade_log_tests()
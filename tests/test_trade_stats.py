@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Tests for one-pass grouped trade statistics
+"""
+
+import sys
+import os
+import io
+import tempfile
+import contextlib
+import unittest
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from backtesting_engine.backtest_engine import BacktestEngine
+from backtesting_engine.parallel_runner import ParallelBacktestRunner
+from backtesting_engine.strategies import CEScalpingSetup, PEScalpingSetup, StraddleSetup
+from backtesting_engine.trade_stats import TradeAggregator
+from backtesting_engine.day_cache import shared_day_cache
+from helpers import make_trade, write_wavy_day
+
+
+def max_drawdown(pnls):
+    """Reference drawdown of cumulative P&L from its running peak"""
+    cumulative = peak = drawdown = 0.0
+    for pnl in pnls:
+        cumulative += pnl
+        peak = max(peak, cumulative)
+        drawdown = max(drawdown, peak - cumulative)
+    return drawdown
+
+
+class TestTradeAggregator(unittest.TestCase):
+    """Test grouped statistics against direct computation"""
+    
+    def setUp(self):
+        self.trades = [make_trade(index, pnl=pnl) for index, pnl in enumerate([12.5, -30.0, 7.25, 0.0, -4.5, 22.0, -18.0, 3.0])]
+        self.regimes = ["RANGING", "HIGH_VOL"] * 4
+        self.aggregator = TradeAggregator()
+        for trade, regime in zip(self.trades, self.regimes):
+            self.aggregator.add(trade, regime, trade.date)
+    
+    def test_groups_match_filtered_sums(self):
+        """Every rollup equals a filter over the trades in close order"""
+        for setup_id in ("setup0", "setup1", None):
+            for regime in ("RANGING", None):
+                selected = [trade.pnl for trade, trade_regime in zip(self.trades, self.regimes)
+                            if setup_id in (None, trade.setup_id) and regime in (None, trade_regime)]
+                stats = self.aggregator.stats(setup_id=setup_id, regime=regime)
+                
+                self.assertEqual(stats.total_pnl, sum(selected))
+                self.assertEqual(stats.trades, len(selected))
+                self.assertEqual(stats.wins, len([pnl for pnl in selected if pnl > 0]))
+                self.assertEqual(stats.losses, len([pnl for pnl in selected if pnl < 0]))
+                self.assertEqual(stats.max_drawdown, max_drawdown(selected))
+    
+    def test_win_loss_summary(self):
+        """Averages, extremes and exit reasons cover the whole log"""
+        overall = self.aggregator.stats()
+        
+        self.assertEqual(overall.avg_win, (12.5 + 7.25 + 22.0 + 3.0) / 4)
+        self.assertEqual(overall.avg_loss, (-30.0 - 4.5 - 18.0) / 3)
+        self.assertEqual(overall.best_pnl, 22.0)
+        self.assertEqual(overall.worst_pnl, -30.0)
+        self.assertEqual(self.aggregator.exit_reasons, {"TARGET": 8})
+        self.assertEqual(self.aggregator.values("regime"), ["RANGING", "HIGH_VOL"])
+    
+    def test_unseen_group_is_empty(self):
+        """Groups without trades read as zeros"""
+        stats = self.aggregator.stats(setup_id="missing")
+        
+        self.assertEqual((stats.total_pnl, stats.trades, stats.win_rate), (0.0, 0, 0.0))
+
+
+class TestEngineTradeStats(unittest.TestCase):
+    """Test that engine results read from the running aggregates"""
+    
+    def setUp(self):
+        """Create four oscillating QQQ days"""
+        shared_day_cache.clear()
+        self.test_dir = tempfile.mkdtemp()
+        for index, date in enumerate(["2025-08-11", "2025-08-12", "2025-08-13", "2025-08-14"]):
+            write_wavy_day(self.test_dir, date, phase=index * 1.3)
+    
+    def tearDown(self):
+        """Leave the shared cache empty for other tests"""
+        shared_day_cache.clear()
+    
+    def make_setups(self):
+        """Fresh setups for each run"""
+        return [CEScalpingSetup("ce", target_pct=30.0, stop_loss_pct=60.0, entry_timeindex=1010, reentry_gap=20),
+                PEScalpingSetup("pe", target_pct=30.0, stop_loss_pct=60.0, entry_timeindex=1010, reentry_gap=20),
+                StraddleSetup("straddle", target_pct=50.0, stop_loss_pct=100.0, entry_timeindex=1010)]
+    
+    def run_engine(self, **engine_kwargs):
+        """Backtest the test days"""
+        engine = BacktestEngine(self.test_dir, self.make_setups(), enable_dynamic_management=False, verbosity=0,
+                                **engine_kwargs)
+        return engine.run_backtest("QQQ", "2025-08-01", "2025-08-31")
+    
+    def test_results_match_trade_log(self):
+        """Setup, daily and overall figures equal direct passes over the trade log"""
+        results = self.run_engine()
+        
+        trades = list(results.trade_log)
+        self.assertGreater(len(trades), 5)
+        self.assertEqual(results.total_pnl, sum(trade.pnl for trade in trades))
+        self.assertEqual(results.max_drawdown, max_drawdown([trade.pnl for trade in trades]))
+        
+        for setup_id, performance in results.setup_performance.items():
+            setup_trades = [trade for trade in trades if trade.setup_id == setup_id]
+            self.assertEqual(performance.total_pnl, sum(trade.pnl for trade in setup_trades))
+            self.assertEqual(performance.total_trades, len(setup_trades))
+            self.assertEqual(performance.max_drawdown, max_drawdown([trade.pnl for trade in setup_trades]))
+        
+        for daily in results.daily_results:
+            day_trades = [trade for trade in trades if trade.date == daily.date]
+            self.assertEqual(daily.daily_pnl, sum(trade.pnl for trade in day_trades))
+            for setup_id, setup_pnl in daily.setup_pnls.items():
+                self.assertEqual(setup_pnl, sum(trade.pnl for trade in day_trades if trade.setup_id == setup_id))
+    
+    def test_reprocessed_day_reports_its_own_trades(self):
+        """Processing the same date twice gives the same daily figures both times"""
+        engine = BacktestEngine(self.test_dir, self.make_setups(), enable_dynamic_management=False, verbosity=0)
+        first = engine.process_trading_day("QQQ", "2025-08-12")
+        second = engine.process_trading_day("QQQ", "2025-08-12")
+        
+        self.assertGreater(first.trades_count, 0)
+        self.assertNotEqual(first.daily_pnl, 0.0)
+        self.assertEqual(second.daily_pnl, first.daily_pnl)
+        self.assertEqual(second.setup_pnls, first.setup_pnls)
+        self.assertAlmostEqual(engine.trade_stats.stats(date="2025-08-12").total_pnl, 2 * first.daily_pnl, places=9)
+    
+    def test_equity_curves(self):
+        """Curves hold cumulative closed P&L after each of the group's trades"""
+        results = self.run_engine()
+        trades = list(results.trade_log)
+        
+        overall = results.trade_stats.equity_curve()
+        self.assertEqual(list(overall.trade_indices), list(range(len(trades))))
+        self.assertEqual(overall.equity[-1], results.total_pnl)
+        
+        curve = results.trade_stats.equity_curve(setup_id="ce")
+        ce_indices = [index for index, trade in enumerate(trades) if trade.setup_id == "ce"]
+        self.assertEqual(list(curve.trade_indices), ce_indices)
+        self.assertEqual(curve.equity[-1], results.setup_performance["ce"].total_pnl)
+    
+    def test_mtm_drawdown(self):
+        """Tick-level tracking leaves trades unchanged and survives sharding across workers"""
+        plain = self.run_engine()
+        tracked = self.run_engine(track_mtm_drawdown=True)
+        
+        self.assertEqual(plain.mtm_max_drawdown, 0.0)
+        self.assertEqual(list(tracked.trade_log), list(plain.trade_log))
+        self.assertGreater(tracked.mtm_max_drawdown, 0.0)
+        self.assertGreater(tracked.setup_performance["straddle"].mtm_max_drawdown, 0.0)
+        
+        runner = ParallelBacktestRunner(self.test_dir, self.make_setups(), max_workers=2, verbosity=0,
+                                        enable_dynamic_management=False, track_mtm_drawdown=True)
+        with contextlib.redirect_stdout(io.StringIO()):
+            parallel = runner.run_backtest("QQQ", "2025-08-01", "2025-08-31")
+        
+        self.assertAlmostEqual(parallel.mtm_max_drawdown, tracked.mtm_max_drawdown)
+        for setup_id, performance in tracked.setup_performance.items():
+            self.assertAlmostEqual(parallel.setup_performance[setup_id].mtm_max_drawdown, performance.mtm_max_drawdown)
+            self.assertEqual(parallel.setup_performance[setup_id].max_drawdown, performance.max_drawdown)
+
+
+def run_trade_stats_tests():
+    """Run trade statistics tests"""
+    print("Running Trade Statistics Tests")
+    print("=" * 50)
+    
+    suite = unittest.TestSuite()
+    suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestTradeAggregator))
+    suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestEngineTradeStats))
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+    
+    success = len(result.failures) == 0 and len(result.errors) == 0
+    print(f"\nTrade Statistics Tests: {'PASSED' if success else 'FAILED'}")
+    
+    return success
+
+
+if __name__ == "__main__":
+    run_trade_stats_tests()